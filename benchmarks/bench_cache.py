@@ -0,0 +1,87 @@
+"""Benchmark write/read time and archive size of the cache for all compression settings.
+
+Usage:
+
+```bash
+$ poetry run python benchmarks/bench_cache.py
+```
+"""
+import tempfile
+import time
+from configparser import ConfigParser
+from pathlib import Path
+from unittest import mock
+
+from pystatis.cache import _build_file_path, cache_data, read_from_cache
+
+SETTINGS = [
+    ("stored", "0"),
+    ("deflate", "1"),
+    ("deflate", "6"),
+    ("deflate", "9"),
+    ("bzip2", "9"),
+    ("lzma", "9"),
+]
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_ffcsv(n_rows: int) -> str:
+    """Create synthetic data that resembles a GENESIS ffcsv table file."""
+    header = "statistics_code;time;1_variable_attribute_code;value\n"
+    rows = (
+        f"12411;{2000 + i % 20};DG{i % 400:03d};{i * 37 % 100_000}\n"
+        for i in range(n_rows)
+    )
+    return header + "".join(rows)
+
+
+def bench(data: str, compression: str, compresslevel: str) -> tuple:
+    """Return write time, read time and archive size for one setting."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = Path(tmp_dir)
+        config = ConfigParser()
+        config["DATA"] = {
+            "cache_dir": tmp_dir,
+            "compression": compression,
+            "compresslevel": compresslevel,
+        }
+        params = {"name": "bench", "area": "all"}
+
+        with mock.patch("pystatis.cache.load_config", return_value=config):
+            # bypass the in-process memory cache, so the read decompresses the archive
+            start = time.perf_counter()
+            cache_data(cache_dir, "bench", params, data, keep_in_memory=False)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            read_from_cache(cache_dir, "bench", params, keep_in_memory=False)
+            read_time = time.perf_counter() - start
+
+        data_dir = _build_file_path(cache_dir, "bench", params)
+        size = sum(path.stat().st_size for path in data_dir.glob("*.zip"))
+
+    return write_time, read_time, size
+
+
+def main() -> None:
+    """Run the benchmark and print a table of the results."""
+    print(
+        f"{'rows':>10} {'raw MB':>8} {'codec':>8} {'level':>5} "
+        f"{'write s':>8} {'read s':>8} {'size MB':>8} {'ratio':>6}"
+    )
+    for n_rows in SIZES:
+        data = make_ffcsv(n_rows)
+        raw_size = len(data.encode("utf-8"))
+        for compression, compresslevel in SETTINGS:
+            write_time, read_time, size = bench(
+                data, compression, compresslevel
+            )
+            print(
+                f"{n_rows:>10} {raw_size / 1e6:>8.2f} {compression:>8} "
+                f"{compresslevel:>5} {write_time:>8.3f} {read_time:>8.3f} "
+                f"{size / 1e6:>8.2f} {raw_size / size:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark time and peak memory of all engines of `parse_cube()`.
+
+Usage:
+
+```bash
+$ poetry run python benchmarks/bench_parse_cube.py
+```
+"""
+import time
+import tracemalloc
+from io import StringIO
+
+from pystatis.cube import CUBE_ENGINES, parse_cube
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_cubefile(n_rows: int) -> str:
+    """Create synthetic data that resembles a GENESIS cubefile with two variables."""
+    header = "\n".join(
+        [
+            "* Synthetic cubefile for benchmarking.",
+            'K;DQ;FACH-SCHL;GHH-ART;GHM-WERTE-JN;GENESIS-VBD;REGIOSTAT;EU-VBD;"mit Werten"',
+            "D;99999BJ001;;N;N;N;N",
+            "K;DQ-ERH;FACH-SCHL",
+            "D;99999",
+            "K;DQA;NAME;RHF-BSR;RHF-ACHSE",
+            "D;KREISE;1;1",
+            "D;GES;2;2",
+            "K;DQZ;NAME;ZI-RHF-BSR;ZI-RHF-ACHSE",
+            "D;JAHR;3;3",
+            "K;DQI;NAME;ME-NAME;DST;TYP;NKM-STELLEN;GHH-ART;GHM-WERTE-JN",
+            "D;VAR001;Anzahl;GANZ;FALL;0;;N",
+            "D;VAR002;EUR;FEST;DURCH;2;;N",
+            "K;QEI;FACH-SCHL;FACH-SCHL;ZI-WERT;WERT;QUALITAET;GESPERRT;WERT-VERFAELSCHT",
+        ]
+    )
+    rows = (
+        f"D;{i % 400:05d};GES{i % 3};{2000 + i % 20};"
+        f"{i * 37 % 100_000};e;;0;{i * 0.25:.2f};e;;0"
+        for i in range(n_rows)
+    )
+    return header + "\n" + "\n".join(rows) + "\n"
+
+
+def bench(data: str, engine: str) -> tuple:
+    """Return time and peak memory of parsing the data with the given engine."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    parse_cube(StringIO(data), engine=engine)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return duration, peak
+
+
+def main() -> None:
+    """Run the benchmark and print a table of the results."""
+    print(
+        f"{'rows':>10} {'raw MB':>8} {'engine':>8} {'time s':>8} {'peak MB':>8}"
+    )
+    for n_rows in SIZES:
+        data = make_cubefile(n_rows)
+        raw_size = len(data.encode("utf-8"))
+        for engine in CUBE_ENGINES:
+            duration, peak = bench(data, engine)
+            print(
+                f"{n_rows:>10} {raw_size / 1e6:>8.2f} {engine:>8} "
+                f"{duration:>8.3f} {peak / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
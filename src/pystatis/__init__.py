@@ -7,11 +7,13 @@ import pystatis as pstat
 print("Version:", pstat.__version__)
 ```
 """
-from pystatis.cache import clear_cache
+from pystatis.bulk import download_many
+from pystatis.cache import clear_cache, prune_cache
 from pystatis.config import init_config
 from pystatis.cube import Cube
 from pystatis.find import Find
 from pystatis.helloworld import logincheck, whoami
+from pystatis.http_helper import close_session, create_session, set_session
 from pystatis.profile import change_password, remove_result
 from pystatis.table import Table
 
@@ -20,11 +22,16 @@ __version__ = "0.1.0"
 __all__ = [
     "change_password",
     "clear_cache",
+    "close_session",
+    "create_session",
     "Cube",
+    "download_many",
     "Find",
     "init_config",
     "logincheck",
+    "prune_cache",
     "remove_result",
+    "set_session",
     "Table",
     "whoami",
 ]
@@ -0,0 +1,225 @@
+"""Asyncio counterparts of the wrapper functions for the data endpoint.
+
+The functions in this module mirror `pystatis.http_helper` so that many downloads
+can run concurrently within a single event loop. They use the same cache layout
+and the same status handling as their synchronous counterparts.
+The blocking network and disk I/O is run in worker threads, while the number of
+concurrent requests to GENESIS-Online is bounded by a semaphore.
+"""
+import asyncio
+import json
+import logging
+import weakref
+from typing import Optional, Union
+
+import requests
+
+from pystatis import http_helper
+from pystatis.config import load_config
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = 10
+
+# asyncio primitives are bound to an event loop, so we keep one semaphore per loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_max_concurrency: Optional[int] = None
+
+
+def set_max_concurrency(max_concurrency: Optional[int]) -> None:
+    """Set the maximum number of concurrent requests to GENESIS-Online.
+
+    The limit applies to event loops that have not yet sent a request.
+    Passing None restores the default, which is read from the `[HTTP]` section
+    of the config.ini (`max_concurrency`).
+
+    Args:
+        max_concurrency (int, optional): Maximum number of concurrent requests.
+    """
+    global _max_concurrency  # pylint: disable=global-statement
+
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError("max_concurrency must be a positive integer.")
+
+    _max_concurrency = max_concurrency
+    _semaphores.clear()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore bounding the requests of the running event loop."""
+    loop = asyncio.get_running_loop()
+
+    if loop not in _semaphores:
+        max_concurrency = _max_concurrency
+        if max_concurrency is None:
+            max_concurrency = load_config().getint(
+                "HTTP", "max_concurrency", fallback=MAX_CONCURRENCY
+            )
+        _semaphores[loop] = asyncio.Semaphore(max_concurrency)
+
+    return _semaphores[loop]
+
+
+async def load_data(
+    endpoint: str, method: str, params: dict, as_json: bool = False
+) -> Union[str, dict]:
+    """Load data identified by endpoint, method and params.
+
+    Asynchronous version of `pystatis.http_helper.load_data()`.
+    Either load data from cache (previous download) or from Destatis.
+    If Destatis has to prepare the data in a background job, wait for it.
+
+    Args:
+        endpoint (str): The endpoint for this data request.
+        method (str): The method for this data request.
+        params (dict): The dictionary holding the params for this data request.
+        as_json (bool, optional): If True, result will be parsed as JSON. Defaults to False.
+
+    Raises:
+        JobTimeoutError: If the background job is not finished in time.
+
+    Returns:
+        Union[str, dict]: The data as raw text or JSON dict.
+    """
+    data: str
+    if endpoint == "data":
+        job = await submit_data(endpoint, method, params)
+        data = await job
+    else:
+        # responses of other endpoints might be served from cache, see `_get_cache_ttl()`
+        async with _get_semaphore():
+            data = str(
+                await asyncio.to_thread(
+                    http_helper.load_data, endpoint, method, params
+                )
+            )
+
+    if as_json:
+        parsed_data: dict = json.loads(data)
+        return parsed_data
+    else:
+        return data
+
+
+async def submit_data(
+    endpoint: str,
+    method: str,
+    params: dict,
+    timeout: Optional[float] = None,
+    poll_interval: Optional[float] = None,
+    revalidate: Optional[bool] = None,
+    keep_in_memory: bool = True,
+) -> http_helper.Job:
+    """Request data identified by endpoint, method and params and wait for background jobs.
+
+    Asynchronous version of `pystatis.http_helper.submit_data()`, but the returned
+    handle is always done. Its data is not read, so parsed data can be taken from
+    the cache instead, see `pystatis.http_helper.Job.read_frames()`.
+
+    Args:
+        endpoint (str): The endpoint for this data request.
+        method (str): The method for this data request.
+        params (dict): The dictionary holding the params for this data request.
+        timeout (float, optional): Maximum time in seconds to wait for a background job.
+        poll_interval (float, optional): Time in seconds between two polls of a background job.
+        revalidate (bool, optional): If True, cached data is only used if the object was not
+            updated in GENESIS-Online since it was cached. Defaults to `revalidate`
+            in the `[DATA]` section of the config.ini.
+        keep_in_memory (bool, optional): If True, the raw data is kept in the in-process
+            memory cache. Defaults to True.
+
+    Raises:
+        JobTimeoutError: If the background job is not finished in time.
+
+    Returns:
+        http_helper.Job: The finished handle providing the raw data.
+    """
+    # pylint: disable=too-many-arguments
+    async with _get_semaphore():
+        job = await asyncio.to_thread(
+            http_helper.submit_data,
+            endpoint,
+            method,
+            params,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            revalidate=revalidate,
+            keep_in_memory=keep_in_memory,
+        )
+
+    # poll and download under the semaphore as well, not only the submission
+    await job.wait_async(limiter=_get_semaphore())
+
+    return job
+
+
+async def get_data_from_endpoint(
+    endpoint: str, method: str, params: dict
+) -> requests.Response:
+    """Send a GET request to Destatis without blocking the event loop.
+
+    Asynchronous version of `pystatis.http_helper.get_data_from_endpoint()`.
+    At most `max_concurrency` requests are sent at the same time.
+
+    Args:
+        endpoint (str): Destatis endpoint (eg. data, catalogue, ..)
+        method (str): Destatis method (eg. cube, tablefile, ...)
+        params (dict): dictionary of query parameters
+
+    Returns:
+        requests.Response: the response object holding the response from calling the Destatis endpoint.
+    """
+    async with _get_semaphore():
+        return await asyncio.to_thread(
+            http_helper.get_data_from_endpoint, endpoint, method, params
+        )
+
+
+async def start_job(
+    endpoint: str, method: str, params: dict
+) -> requests.Response:
+    """Small helper function to start a job in the background.
+
+    Asynchronous version of `pystatis.http_helper.start_job()`.
+
+    Args:
+        endpoint (str): Destatis endpoint (eg. data, catalogue, ..)
+        method (str): Destatis method (eg. cube, tablefile, ...)
+        params (dict): dictionary of query parameters
+
+    Returns:
+        requests.Response: the response object holding the response from calling the Destatis endpoint.
+    """
+    async with _get_semaphore():
+        return await asyncio.to_thread(
+            http_helper.start_job, endpoint, method, params
+        )
+
+
+async def get_data_from_resultfile(
+    job_id: str,
+    timeout: Optional[float] = None,
+    poll_interval: Optional[float] = None,
+) -> str:
+    """Get data from a job once it is finished.
+
+    Asynchronous version of `pystatis.http_helper.get_data_from_resultfile()`.
+    The event loop is free to run other downloads while waiting for the job.
+
+    Args:
+        job_id (str): Job ID generated by Destatis API.
+        timeout (float, optional): Maximum time in seconds to wait for the job.
+            Defaults to `timeout` in the `[JOBS]` section of the config.ini.
+        poll_interval (float, optional): Time in seconds between two polls.
+            Defaults to `poll_interval` in the `[JOBS]` section of the config.ini.
+
+    Raises:
+        JobTimeoutError: If the job is not finished in time.
+
+    Returns:
+        str: The raw data of the table file as returned by Destatis.
+    """
+    job = http_helper.Job(job_id, timeout=timeout, poll_interval=poll_interval)
+    return await job.result_async(limiter=_get_semaphore())
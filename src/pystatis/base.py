@@ -0,0 +1,130 @@
+"""Module provides the common base of the wrapper classes for GENESIS data objects."""
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+import pandas as pd
+
+from pystatis.config import load_config
+from pystatis.http_helper import Job
+
+
+class DataObject(ABC):
+    """The state and lazy loading shared by `Table` and `Cube`.
+
+    Subclasses implement the requests and the parsing for their kind of object,
+    see `get_data()`, `_build_params()` and `_load_metadata()`.
+
+    Args:
+        name (str): The unique identifier of this object.
+        keep_raw_data (bool, optional): If False, `raw_data` is not kept in memory after parsing,
+            but read from the cache again on access. Defaults to `keep_raw_data`
+            in the `[DATA]` section of the config.ini.
+    """
+
+    def __init__(self, name: str, keep_raw_data: Optional[bool] = None):
+        self.name: str = name
+        self.keep_raw_data = keep_raw_data
+        self._raw_data = ""
+        self._raw_data_job: Optional[Job] = None
+        self._data: Optional[pd.DataFrame] = None
+        self._metadata: Optional[dict] = None
+        self._params: Optional[dict] = None
+        self._pending_job: Optional[Job] = None
+        self.stale = False
+
+    @property
+    def raw_data(self) -> str:
+        """The raw data, read from the cache if it is not kept in memory."""
+        if self._raw_data_job is None:
+            return self._raw_data
+
+        raw_data = self._raw_data_job.result()
+        if self._keep_raw_data():
+            self.raw_data = raw_data
+
+        return raw_data
+
+    @raw_data.setter
+    def raw_data(self, raw_data: str) -> None:
+        self._raw_data = raw_data
+        self._raw_data_job = None
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """The parsed data, downloaded by `get_data()` on first access.
+
+        The params of the last call of `get_data()` or `get_metadata()` are used, if any.
+        While a background job started with `wait=False` is pending, the data frame is empty.
+        """
+        self._ensure_data()
+        return self._data if self._data is not None else pd.DataFrame()
+
+    @data.setter
+    def data(self, data: pd.DataFrame) -> None:
+        self._data = data
+
+    @property
+    def metadata(self) -> dict:
+        """Metadata as returned by the /metadata endpoint, downloaded on first access.
+
+        The data is not downloaded for this, see `get_metadata()`.
+        """
+        if self._metadata is None:
+            self._load_metadata(self._params or self._build_params("all"))
+
+        assert self._metadata is not None  # nosec assert_used
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata: dict) -> None:
+        self._metadata = metadata
+
+    @abstractmethod
+    def get_data(self, area: str = "all", **kwargs) -> Optional[Job]:
+        """Downloads raw data from GENESIS-Online and parses it."""
+
+    @abstractmethod
+    def _build_params(self, area: str, **kwargs) -> dict:
+        """Build the params of the requests for this object."""
+
+    @abstractmethod
+    def _load_metadata(self, params: dict) -> None:
+        """Download the metadata of this object and set `metadata`."""
+
+    def _ensure_data(self) -> None:
+        if self._data is not None or self._pending_job is not None:
+            return
+
+        # name and area of the last request are part of the params, too
+        params = dict(self._params or self._build_params("all"))
+        del params["name"]
+        self.get_data(**params)
+
+    def _keep_raw_data(self) -> bool:
+        if self.keep_raw_data is not None:
+            return self.keep_raw_data
+
+        return load_config().getboolean("DATA", "keep_raw_data", fallback=True)
+
+    def _set_raw_data_from_job(self, job: Job, lazy: bool = False) -> None:
+        # the parsed version is read again, even if a newer version is cached by then,
+        # data without a cached version (e.g. without a name) has to be kept
+        version = (
+            job.cached_version() if lazy or not self._keep_raw_data() else None
+        )
+
+        if version is None:
+            self.raw_data = job.result()
+        else:
+            self._raw_data = ""
+            self._raw_data_job = Job(
+                name=job.name,
+                params=job.params,
+                cached=True,
+                version=version,
+                keep_in_memory=False,
+            )
+
+    def _set_metadata(self, metadata: Union[str, dict]) -> None:
+        assert isinstance(metadata, dict)  # nosec assert_used
+        self.metadata = metadata
@@ -0,0 +1,98 @@
+"""Module provides functionality to download many tables or cubes at once."""
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, Optional, Type, Union
+
+from pystatis.cube import Cube
+from pystatis.table import Table
+
+logger = logging.getLogger(__name__)
+
+KINDS: Dict[str, Type[Union[Table, Cube]]] = {"table": Table, "cube": Cube}
+
+
+class DownloadResult:
+    """The outcome of a single download started by `download_many()`.
+
+    Attributes:
+        name (str): The unique identifier of the requested object.
+        obj (Table or Cube, optional): The object holding the data, None if the download failed.
+        error (Exception, optional): The exception raised by the download, None if it succeeded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        obj: Optional[Union[Table, Cube]] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.name = name
+        self.obj = obj
+        self.error = error
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"failed: {self.error!r}"
+        return f"DownloadResult({self.name!r}, {status})"
+
+    @property
+    def ok(self) -> bool:
+        """True, if the download succeeded."""
+        return self.error is None
+
+
+def download_many(
+    names: Iterable[str],
+    kind: str = "table",
+    max_workers: int = 8,
+    area: str = "all",
+    **kwargs,
+) -> Iterator[DownloadResult]:
+    """Download many tables or cubes concurrently with a bounded pool of worker threads.
+
+    Each object is downloaded with its regular `get_data()` method, so cached data is
+    loaded from cache and new data is cached as usual.
+    Results are yielded as soon as they are complete, not in the order of `names`.
+    A failing download does not abort the batch, instead its exception is reported
+    via `DownloadResult.error`.
+
+    Additional keyword arguments are passed on to `get_data()` of every object.
+
+    Args:
+        names (Iterable[str]): The unique identifiers of the objects to download.
+        kind (str, optional): Either "table" or "cube". Defaults to "table".
+        max_workers (int, optional): Maximum number of concurrent downloads. Defaults to 8.
+        area (str, optional): Area to search for the objects in GENESIS-Online. Defaults to "all".
+
+    Yields:
+        DownloadResult: The outcome of each download in order of completion.
+    """
+    if kind not in KINDS:
+        raise ValueError(
+            f"Unknown kind {kind!r}, must be one of {list(KINDS)}."
+        )
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [
+            executor.submit(_download, KINDS[kind](name), area, kwargs)
+            for name in names
+        ]
+
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # do not start any pending downloads if the caller stops iterating early
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _download(
+    obj: Union[Table, Cube], area: str, kwargs: dict
+) -> DownloadResult:
+    """Download a single object and catch all errors."""
+    try:
+        obj.get_data(area=area, **kwargs)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.error("Download of %s failed. Reason: %s", obj.name, e)
+        return DownloadResult(obj.name, error=e)
+
+    return DownloadResult(obj.name, obj=obj)
@@ -1,18 +1,60 @@
 """Module provides functions/decorators to cache downloaded data as well as remove cached data."""
 import hashlib
+import importlib.util
 import json
 import logging
+import os
 import re
 import shutil
+import tempfile
+import time
 import zipfile
-from datetime import date
+from datetime import date, datetime
+from io import StringIO, TextIOWrapper
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO, Tuple
 
+import pandas as pd
+
+from pystatis.cache_index import (
+    CacheEntry,
+    add_entry,
+    discard_entries,
+    get_key_version,
+    get_latest_entry,
+    list_entries,
+    rekey_entry,
+    remove_entries,
+    set_key_version,
+    update_frames_size,
+)
 from pystatis.config import load_config
+from pystatis.memory_cache import get_memory_cache
 
 logger = logging.getLogger(__name__)
+_migrated_cache_dirs: Set[Path] = set()
 JOB_ID_PATTERN = r"\d+"
+JOBS_DIR = ".jobs"
+# params that do not change the returned data
+IGNORED_PARAMS = {"job", "username", "password"}
+# params that are equivalent to omitting them
+DEFAULT_PARAMS = {
+    "area": "all",
+    "language": "de",
+    "compress": "false",
+    "transpose": "false",
+}
+# file formats of cached parsed data, all of them require pyarrow
+# "arrow" is uncompressed Arrow IPC, which is read via memory mapping
+FRAME_FORMATS = ["parquet", "feather", "arrow"]
+# version of the cache keys, increase when changing build_cache_key()
+KEY_VERSION = 1
+COMPRESSION_METHODS = {
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+    "stored": zipfile.ZIP_STORED,
+}
 
 
 def cache_data(
@@ -20,12 +62,15 @@ def cache_data(
     name: Optional[str],
     params: dict,
     data: str,
+    keep_in_memory: bool = True,
 ) -> None:
     """Compress and archive data within the configured cache directory.
 
     Data will be stored in a zip file within the cache directory.
     The folder structure will be `<name>/<endpoint>/<method>/<hash(params)>.
     This allows to cache different results for different params.
+    The compression method and level are configured in the `[DATA]` section
+    of the config.ini (`compression` and `compresslevel`).
 
     Args:
         cache_dir (Path): The cash directory as configured in the config.
@@ -34,70 +79,450 @@ def cache_data(
         method (str): The method for this data request.
         params (dict): The dictionary holding the params for this data request.
         data (str): The actual raw text data as returned by GENESIS-Online.
+        keep_in_memory (bool, optional): If True, the data is also kept in the in-process
+            memory cache. Defaults to True.
     """
     # pylint: disable=too-many-arguments
+    # the archive member is written directly from memory, without a temporary text file
+    cache_data_stream(cache_dir, name, params, [data.encode("utf-8")])
+
+    if name is not None and keep_in_memory:
+        get_memory_cache().put(_build_file_path(cache_dir, name, params), data)
+
+
+def cache_data_stream(
+    cache_dir: Path,
+    name: Optional[str],
+    params: dict,
+    chunks: Iterable[bytes],
+) -> None:
+    """Compress and archive streamed data within the configured cache directory.
+
+    Same as `cache_data()`, but the data is written to the archive chunk by chunk,
+    so it never has to be held in memory as a whole. The archive is first written
+    to a temporary file, so an interrupted download never results in a cache hit.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+        chunks (Iterable[bytes]): The UTF-8 encoded raw data as returned by GENESIS-Online.
+    """
     if name is None:
         return
 
+    _ensure_migrated(cache_dir)
+
     data_dir = _build_file_path(cache_dir, name, params)
     file_name = f"{str(date.today()).replace('-', '')}.txt"
+    file_path = data_dir / file_name.replace(".txt", ".zip")
 
-    # create parent dirs, if necessary
-    file_path = data_dir / file_name
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+    # the temporary file must not be placed within data_dir, see hit_in_cash(),
+    # and is unique per writer, so concurrent downloads of the same data do not collide
+    data_dir.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=data_dir.parent, prefix=f"{data_dir.name}.", suffix=".part"
+    )
+    os.close(fd)
+    tmp_path = Path(tmp_name)
 
-    # we have to first save the content to a text file, before we can add it to a
-    #   compressed archive, and finally have to delete the file so only the archive remains
-    with open(file_path, "w", encoding="utf-8") as file:
-        file.write(data)
+    try:
+        compression, compresslevel = _get_compression()
+        with zipfile.ZipFile(
+            tmp_path,
+            "w",
+            compression=compression,
+            compresslevel=compresslevel,
+        ) as myzip:
+            with myzip.open(file_name, "w", force_zip64=True) as file:
+                for chunk in chunks:
+                    file.write(chunk)
 
-    with zipfile.ZipFile(
-        str(file_path).replace(".txt", ".zip"),
-        "w",
-        compression=zipfile.ZIP_DEFLATED,
-        compresslevel=9,
-    ) as myzip:
-        myzip.write(file_path, arcname=file_name)
+        data_dir.mkdir(exist_ok=True)
+        # parsed data of a replaced version is outdated
+        _remove_frames(file_path)
+        os.replace(tmp_path, file_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    params_hash, params_json = _hash_params(params)
+    entry = add_entry(cache_dir, name, params_hash, params_json, file_path)
+    # a previous version might still be held in memory
+    get_memory_cache().invalidate(data_dir)
 
-    file_path.unlink()
     logger.info("Data was successfully cached under %s.", file_path)
 
+    if load_config().getboolean("DATA", "auto_prune", fallback=True):
+        _prune_cache(cache_dir, *_get_eviction_policy(), protected=entry)
+
+
+def _get_compression() -> Tuple[int, Optional[int]]:
+    """Return the zip compression method and level as configured in the config.ini."""
+    config = load_config()
+    method = config.get("DATA", "compression", fallback="deflate").lower()
+
+    if method not in COMPRESSION_METHODS:
+        raise ValueError(
+            f"Unknown compression {method!r} in config.ini, "
+            f"must be one of {list(COMPRESSION_METHODS)}."
+        )
+
+    compresslevel: Optional[int] = config.getint(
+        "DATA", "compresslevel", fallback=6
+    )
+    if method == "stored":
+        compresslevel = None
+
+    return COMPRESSION_METHODS[method], compresslevel
+
+
+def _get_frame_format() -> Optional[str]:
+    """Return the file format of cached parsed data as configured in the config.ini.
+
+    Returns:
+        str, optional: The file format, None if parsed data is not cached.
+    """
+    frame_format = (
+        load_config().get("DATA", "frame_cache", fallback="auto").lower()
+    )
+
+    if frame_format == "none":
+        return None
+
+    if frame_format != "auto" and frame_format not in FRAME_FORMATS:
+        raise ValueError(
+            f"Unknown frame_cache {frame_format!r} in config.ini, "
+            f"must be one of {['auto', 'none'] + FRAME_FORMATS}."
+        )
+
+    if importlib.util.find_spec("pyarrow") is None:
+        if frame_format != "auto":
+            logger.warning(
+                "Caching parsed data as %s requires pyarrow, "
+                "install it with `pip install pyarrow`.",
+                frame_format,
+            )
+        return None
+
+    return "parquet" if frame_format == "auto" else frame_format
+
+
+def cache_frames(
+    cache_dir: Path,
+    name: Optional[str],
+    params: dict,
+    frames: Dict[str, pd.DataFrame],
+    variant: str,
+) -> None:
+    """Store parsed data next to the most recent cached version of the raw data.
+
+    The data frames are written to `<name>/<hash(params)>/<version>-<variant>/`
+    in the format configured in the `[DATA]` section of the config.ini (`frame_cache`).
+    They are valid as long as the raw data is not replaced by a new version
+    and count towards the size of this version in the eviction policy.
+    Failing to cache parsed data is logged, but never raised.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+        frames (Dict[str, pd.DataFrame]): The parsed data frames by key.
+        variant (str): Identifies the parser, e.g. "table-1", so parsed data
+            from different parsers or parser versions is kept apart.
+    """
+    frame_format = _get_frame_format()
+
+    if name is None or frame_format is None or not frames:
+        return
+
+    entry = _get_entry(cache_dir, name, params)
+    if entry is None:
+        return
+
+    file_path = cache_dir / entry.path
+    frames_dir = _build_frames_dir(file_path, variant)
+    # unique per writer, so concurrent parsers of the same data do not collide
+    tmp_dir = Path(
+        tempfile.mkdtemp(
+            dir=frames_dir.parent, prefix=f"{frames_dir.name}.", suffix=".part"
+        )
+    )
+
+    try:
+        # the file names keep the order of the frames
+        for i, (key, frame) in enumerate(frames.items()):
+            _write_frame(
+                frame, tmp_dir / f"{i:03d}_{key}.{frame_format}", frame_format
+            )
+
+        shutil.rmtree(frames_dir, ignore_errors=True)
+        tmp_dir.replace(frames_dir)
+        update_frames_size(cache_dir, file_path)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning("Failed to cache parsed data of %s. Reason: %s", name, e)
+        return
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if load_config().getboolean("DATA", "auto_prune", fallback=True):
+        _prune_cache(cache_dir, *_get_eviction_policy(), protected=entry)
+
+
+def read_frames_from_cache(
+    cache_dir: Path,
+    name: Optional[str],
+    params: dict,
+    variant: str,
+) -> Optional[Dict[str, pd.DataFrame]]:
+    """Read parsed data of the most recent cached version of the raw data.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+        variant (str): Identifies the parser, see `cache_frames()`.
+
+    Returns:
+        Dict[str, pd.DataFrame], optional: The parsed data frames by key,
+            None if there is no parsed data for the most recent version.
+    """
+    if name is None or _get_frame_format() is None:
+        return None
+
+    try:
+        frames_dir = _build_frames_dir(
+            _get_latest_version(cache_dir, name, params), variant
+        )
+    except FileNotFoundError:
+        return None
+
+    if not frames_dir.is_dir():
+        return None
+
+    frames = {}
+    try:
+        for file_path in sorted(frames_dir.iterdir()):
+            key = file_path.stem.split("_", maxsplit=1)[1]
+            frames[key] = _read_frame(file_path)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning(
+            "Failed to read cached parsed data of %s. Reason: %s", name, e
+        )
+        return None
+
+    logger.info("Parsed data was read from cache under %s.", frames_dir)
+
+    return frames
+
+
+def _write_frame(
+    frame: pd.DataFrame, file_path: Path, frame_format: str
+) -> None:
+    """Write a single data frame of parsed data in the given format."""
+    frame = frame.reset_index(drop=True)
+
+    if frame_format == "parquet":
+        frame.to_parquet(file_path, index=False)
+    elif frame_format == "feather":
+        frame.to_feather(file_path)
+    else:
+        # pylint: disable=import-outside-toplevel
+        from pyarrow import feather
+
+        # without compression and chunks, columns can be memory mapped as they are
+        feather.write_feather(
+            frame,
+            file_path,
+            compression="uncompressed",
+            chunksize=max(len(frame), 1),
+        )
+
+
+def _read_frame(file_path: Path) -> pd.DataFrame:
+    """Read a single data frame of parsed data, the format is given by the file suffix."""
+    if file_path.suffix == ".parquet":
+        return pd.read_parquet(file_path)
+
+    if file_path.suffix == ".feather":
+        return pd.read_feather(file_path)
+
+    # pylint: disable=import-outside-toplevel
+    import pyarrow as pa
+    from pyarrow import feather
+
+    table = feather.read_table(file_path, memory_map=True)
+
+    # nullable pandas types like Int64 have to be restored by pyarrow from the pandas metadata
+    extension_columns = {
+        column["name"]
+        for column in (table.schema.pandas_metadata or {}).get("columns", [])
+        if column["numpy_type"] != column["pandas_type"]
+    }
+
+    # numeric columns without missing values remain read-only views into the memory mapped
+    # file, so processes reading the same file share the OS page cache instead of private copies
+    zero_copy_columns = [
+        name
+        for name, column in zip(table.column_names, table.columns)
+        if name not in extension_columns
+        and column.num_chunks == 1
+        and column.null_count == 0
+        and (
+            pa.types.is_integer(column.type)
+            or pa.types.is_floating(column.type)
+        )
+    ]
+    other_columns = [
+        name for name in table.column_names if name not in zero_copy_columns
+    ]
+    other_frame = (
+        table.select(other_columns).to_pandas(split_blocks=True)
+        if other_columns
+        else pd.DataFrame()
+    )
+
+    columns = {
+        name: (
+            table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+            if name in zero_copy_columns
+            else other_frame[name]
+        )
+        for name in table.column_names
+    }
+
+    # without copy, pandas does not consolidate the columns into new blocks
+    return pd.DataFrame(
+        columns, index=pd.RangeIndex(table.num_rows), copy=False
+    )
+
+
+def _build_frames_dir(file_path: Path, variant: str) -> Path:
+    """Build the directory of parsed data for a cached version of the raw data."""
+    return file_path.with_name(f"{file_path.stem}-{variant}")
+
+
+def _remove_frames(file_path: Path) -> None:
+    """Delete all parsed data of a cached version of the raw data."""
+    for frames_dir in file_path.parent.glob(f"{file_path.stem}-*"):
+        shutil.rmtree(frames_dir, ignore_errors=True)
+
+
+def open_from_cache(
+    cache_dir: Path,
+    name: Optional[str],
+    params: dict,
+) -> TextIO:
+    """Open compressed data from cache for incremental reading.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+
+    Returns:
+        TextIO: A text stream of the uncompressed raw text data, to be closed by the caller.
+    """
+    if name is None:
+        return StringIO()
+
+    data = get_memory_cache().get(_build_file_path(cache_dir, name, params))
+    if data is not None:
+        return StringIO(data)
+
+    file_path = _get_latest_version(cache_dir, name, params)
+
+    # the member stays readable after closing the archive, the file is closed with the member
+    with zipfile.ZipFile(file_path, "r") as myzip:
+        file = myzip.open(file_path.name.replace(".zip", ".txt"))
+
+    return TextIOWrapper(file, encoding="utf-8")
+
 
 def read_from_cache(
     cache_dir: Path,
     name: Optional[str],
     params: dict,
+    version: Optional[str] = None,
+    keep_in_memory: bool = True,
 ) -> str:
     """Read and return compressed data from cache.
 
+    Recently read data is served from the in-process memory cache,
+    which only holds the most recent version.
+
     Args:
         cache_dir (Path): The cash directory as configured in the config.
         name (str): The unique identifier in GENESIS-Online.
         endpoint (str): The endpoint for this data request.
         method (str): The method for this data request.
         params (dict): The dictionary holding the params for this data request.
+        version (str, optional): The version to read, see `get_cached_version()`.
+            Defaults to the most recent version.
+        keep_in_memory (bool, optional): If True, the data is kept in the in-process
+            memory cache. Defaults to True.
+
+    Raises:
+        FileNotFoundError: If the data or the given version is not cached.
 
     Returns:
         str: The uncompressed raw text data.
     """
+    # pylint: disable=too-many-arguments
     if name is None:
         return ""
 
     data_dir = _build_file_path(cache_dir, name, params)
+    memory_cache = get_memory_cache()
+
+    if version is None:
+        data = memory_cache.get(data_dir)
+        if data is not None:
+            return data
+
+        file_path = _get_latest_version(cache_dir, name, params)
+    else:
+        file_path = data_dir / f"{version}.zip"
+        if not file_path.exists():
+            raise FileNotFoundError(
+                f"Version {version} of the cached data for {name} "
+                "was removed from the cache."
+            )
 
-    versions = sorted(
-        data_dir.glob("*"),
-        key=lambda path: int(path.stem),
-    )
-    file_name = versions[-1].name
-    file_path = data_dir / file_name
     with zipfile.ZipFile(file_path, "r") as myzip:
-        with myzip.open(file_name.replace(".zip", ".txt")) as file:
+        with myzip.open(file_path.name.replace(".zip", ".txt")) as file:
             data = file.read().decode()
 
+    if version is None and keep_in_memory:
+        memory_cache.put(data_dir, data)
+
     return data
 
 
+def _get_latest_version(cache_dir: Path, name: str, params: dict) -> Path:
+    """Return the path of the most recent cached version."""
+    entry = _get_entry(cache_dir, name, params, touch=True)
+
+    if entry is None:
+        raise FileNotFoundError(f"No cached data found for {name}.")
+
+    return cache_dir / entry.path
+
+
+def _get_entry(
+    cache_dir: Path, name: str, params: dict, touch: bool = False
+) -> Optional[CacheEntry]:
+    """Return the index entry of the most recent cached version, see `get_latest_entry()`."""
+    _ensure_migrated(cache_dir)
+
+    params_hash, _ = _hash_params(params)
+    entry = get_latest_entry(cache_dir, name, params_hash, touch=touch)
+
+    if entry is None and _migrate_legacy_key(cache_dir, name, params):
+        entry = get_latest_entry(cache_dir, name, params_hash, touch=touch)
+
+    return entry
+
+
 def _build_file_path(cache_dir: Path, name: str, params: dict) -> Path:
     """Builds a unique cache directory name from name and hashed params dictionary.
 
@@ -113,16 +538,196 @@ def _build_file_path(cache_dir: Path, name: str, params: dict) -> Path:
     Returns:
         Path: The path object to the directory where the data will be downloaded/cached.
     """
-    params_ = params.copy()
-    # we have to delete the job key here because otherwise we will not have a cache hit
+    params_hash, _ = _hash_params(params)
+    data_dir = cache_dir / name / params_hash
+
+    return data_dir
+
+
+def _hash_params(params: dict) -> Tuple[str, str]:
+    """Return the hash of the canonical cache key together with its JSON representation."""
     # we use 10 digits because this is enough security to avoid hash collisions
-    if "job" in params_:
-        del params_["job"]
+    params_json = json.dumps(build_cache_key(params), sort_keys=True)
     params_hash = hashlib.blake2s(digest_size=10, usedforsecurity=False)
-    params_hash.update(json.dumps(params_).encode("UTF-8"))
-    data_dir = cache_dir / name / params_hash.hexdigest()
+    params_hash.update(params_json.encode("UTF-8"))
 
-    return data_dir
+    return params_hash.hexdigest(), params_json
+
+
+def build_cache_key(params: dict) -> dict:
+    """Build the canonical cache key of the params of a request.
+
+    Requests that return the same data share the same key: params are sorted,
+    values are normalized to strings (e.g. `2010` and `"2010"` or `True` and `"true"`),
+    params that equal their default (e.g. `area="all"`) or are empty are omitted,
+    and params that do not change the data (job and credentials) are removed.
+
+    Args:
+        params (dict): The dictionary holding the params for a request.
+
+    Returns:
+        dict: The canonical cache key.
+    """
+    key = {}
+    for param, value in params.items():
+        param = str(param).lower()
+        value = _normalize_param_value(value)
+
+        if param in IGNORED_PARAMS or value in ("", DEFAULT_PARAMS.get(param)):
+            continue
+
+        key[param] = value
+
+    if "name" in key:
+        key["name"] = normalize_name(key["name"])
+
+    return dict(sorted(key.items()))
+
+
+def _normalize_param_value(value: Any) -> str:
+    """Return the string representation of a param value as sent to Destatis."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (list, tuple)):
+        return ",".join(_normalize_param_value(item) for item in value)
+
+    text: str = str(value).strip()
+    if text.lower() in ("true", "false"):
+        return text.lower()
+
+    return text
+
+
+def migrate_cache(cache_dir: Path) -> int:
+    """Move all cached data to its canonical cache key, see `build_cache_key()`.
+
+    Only data whose params are recorded in the cache index can be migrated here.
+    Data cached without recorded params is migrated on the first lookup instead,
+    when the params are known.
+    Versions that end up with the same key and version date are merged.
+    The migration runs automatically the first time a cache directory is used.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+
+    Returns:
+        int: The number of migrated versions.
+    """
+    migrated = 0
+
+    for entry in list_entries(cache_dir):
+        if entry.params is None:
+            continue
+
+        params_hash, params_json = _hash_params(json.loads(entry.params))
+        if params_hash == entry.params_hash and params_json == entry.params:
+            continue
+
+        file_path = cache_dir / entry.path
+        new_file_path = cache_dir / entry.name / params_hash / file_path.name
+
+        if file_path != new_file_path:
+            try:
+                _move_version(file_path, new_file_path)
+                file_path.parent.rmdir()
+            except OSError:
+                pass
+
+        rekey_entry(cache_dir, entry, params_hash, params_json, new_file_path)
+        migrated += 1
+
+    set_key_version(cache_dir, KEY_VERSION)
+    get_memory_cache().invalidate(cache_dir)
+
+    if migrated:
+        logger.info("Migrated %d cached versions to new cache keys.", migrated)
+
+    return migrated
+
+
+def _migrate_legacy_key(cache_dir: Path, name: str, params: dict) -> bool:
+    """Move data cached under the key used before `build_cache_key()` to its canonical key.
+
+    Returns:
+        bool: True, if any version was migrated.
+    """
+    legacy_hash = _hash_legacy_params(params)
+    params_hash, params_json = _hash_params(params)
+    legacy_dir = cache_dir / name / legacy_hash
+
+    if legacy_hash == params_hash or not legacy_dir.is_dir():
+        return False
+
+    entries = {
+        entry.version: entry
+        for entry in list_entries(cache_dir, name)
+        if entry.params_hash == legacy_hash
+    }
+    migrated = 0
+
+    for file_path in sorted(legacy_dir.glob("*.zip")):
+        new_file_path = cache_dir / name / params_hash / file_path.name
+        try:
+            _move_version(file_path, new_file_path)
+        except OSError:
+            continue
+
+        entry = entries.get(file_path.stem)
+        if entry is None:
+            add_entry(cache_dir, name, params_hash, params_json, new_file_path)
+        else:
+            rekey_entry(
+                cache_dir, entry, params_hash, params_json, new_file_path
+            )
+        migrated += 1
+
+    try:
+        legacy_dir.rmdir()
+    except OSError:
+        pass
+
+    if migrated:
+        logger.info(
+            "Migrated %d cached versions of %s to new cache keys.",
+            migrated,
+            name,
+        )
+
+    return migrated > 0
+
+
+def _hash_legacy_params(params: dict) -> str:
+    """Return the hash of the params as used for cache keys before `build_cache_key()`."""
+    # the params were hashed in the given order, only without the job flag
+    params_json = json.dumps(
+        {param: value for param, value in params.items() if param != "job"}
+    )
+    params_hash = hashlib.blake2s(digest_size=10, usedforsecurity=False)
+    params_hash.update(params_json.encode("UTF-8"))
+
+    return params_hash.hexdigest()
+
+
+def _move_version(file_path: Path, new_file_path: Path) -> None:
+    """Move a cached version together with its parsed data."""
+    new_file_path.parent.mkdir(parents=True, exist_ok=True)
+    _remove_frames(new_file_path)
+    for frames_dir in file_path.parent.glob(f"{file_path.stem}-*"):
+        frames_dir.replace(new_file_path.parent / frames_dir.name)
+    file_path.replace(new_file_path)
+
+
+def _ensure_migrated(cache_dir: Path) -> None:
+    """Migrate the cache keys of a cache directory once per process, if necessary."""
+    if cache_dir in _migrated_cache_dirs:
+        return
+
+    if get_key_version(cache_dir) < KEY_VERSION:
+        migrate_cache(cache_dir)
+
+    _migrated_cache_dirs.add(cache_dir)
 
 
 def normalize_name(name: str) -> str:
@@ -144,6 +749,7 @@ def hit_in_cash(
     cache_dir: Path,
     name: Optional[str],
     params: dict,
+    max_age: Optional[float] = None,
 ) -> bool:
     """Check if data is already cached.
 
@@ -153,6 +759,7 @@ def hit_in_cash(
         endpoint (str): The endpoint for this data request.
         method (str): The method for this data request.
         params (dict): The dictionary holding the params for this data request.
+        max_age (float, optional): If set, only data cached less than `max_age` seconds ago is a hit.
 
     Returns:
         bool: True, if combination of name, endpoint, method and params is already cached.
@@ -160,8 +767,284 @@ def hit_in_cash(
     if name is None:
         return False
 
-    data_dir = _build_file_path(cache_dir, name, params)
-    return data_dir.exists()
+    _ensure_migrated(cache_dir)
+
+    if (
+        max_age is None
+        and _build_file_path(cache_dir, name, params) in get_memory_cache()
+    ):
+        return True
+
+    entry = _get_entry(cache_dir, name, params)
+
+    if entry is None:
+        return False
+
+    return max_age is None or time.time() - entry.created <= max_age
+
+
+def get_cache_time(
+    cache_dir: Path,
+    name: Optional[str],
+    params: dict,
+) -> Optional[float]:
+    """Return the time the most recent version of the data was cached.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+
+    Returns:
+        float, optional: The time as UNIX timestamp, None if the data is not cached.
+    """
+    if name is None:
+        return None
+
+    entry = _get_entry(cache_dir, name, params)
+
+    return entry.created if entry is not None else None
+
+
+def get_cached_version(
+    cache_dir: Path,
+    name: Optional[str],
+    params: dict,
+) -> Optional[str]:
+    """Return the most recent cached version of the data.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+
+    Returns:
+        str, optional: The version date in the format YYYYMMDD, None if the data is not cached.
+    """
+    if name is None:
+        return None
+
+    entry = _get_entry(cache_dir, name, params)
+
+    return entry.version if entry is not None else None
+
+
+def register_job(
+    cache_dir: Path, name: Optional[str], params: dict, job_id: str
+) -> None:
+    """Persist the ID of a started background job for the given data request.
+
+    This allows a restarted process to resume the pending job instead of starting a new one.
+    The registry lives under `<cache_dir>/.jobs/<name>/<hash(params)>.json`.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+        job_id (str): The job ID generated by Destatis.
+    """
+    if name is None or not job_id:
+        return
+
+    file_path = _build_job_file_path(cache_dir, name, params)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"job_id": job_id, "started": datetime.now().isoformat()}, file
+        )
+
+    logger.info("Job %s was registered under %s.", job_id, file_path)
+
+
+def get_registered_job(
+    cache_dir: Path, name: Optional[str], params: dict
+) -> Optional[str]:
+    """Return the ID of a previously started background job for the given data request.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+
+    Returns:
+        str, optional: The job ID, if a job was registered.
+    """
+    if name is None:
+        return None
+
+    file_path = _build_job_file_path(cache_dir, name, params)
+
+    # jobs registered before build_cache_key() are keyed by the legacy hash
+    legacy_file_path = (
+        cache_dir / JOBS_DIR / name / f"{_hash_legacy_params(params)}.json"
+    )
+    if not file_path.exists() and legacy_file_path.exists():
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            legacy_file_path.replace(file_path)
+        except OSError:
+            return None
+
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            job_id: str = json.load(file)["job_id"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return job_id
+
+
+def unregister_job(cache_dir: Path, name: Optional[str], params: dict) -> None:
+    """Remove a registered background job, e.g. once its result is cached.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+    """
+    if name is None:
+        return
+
+    _build_job_file_path(cache_dir, name, params).unlink(missing_ok=True)
+
+
+def _build_job_file_path(cache_dir: Path, name: str, params: dict) -> Path:
+    """Build the path of the job registry file, keyed like the cached data."""
+    return _build_file_path(cache_dir / JOBS_DIR, name, params).with_suffix(
+        ".json"
+    )
+
+
+def prune_cache(
+    max_bytes: Optional[int] = None,
+    max_age_days: Optional[float] = None,
+    keep_versions: Optional[int] = None,
+) -> List[CacheEntry]:
+    """Evict cached data according to the eviction policy.
+
+    Three rules are applied in this order, a value of 0 disables a rule:
+
+    1. Only the `keep_versions` most recent versions are kept per name and params.
+    2. Versions that were cached more than `max_age_days` ago are removed.
+    3. The least recently read versions are removed until the cache is at most `max_bytes` large.
+
+    Unless `auto_prune` is set to false, this policy is also applied after every write.
+    Cached data is never evicted while it is written, so a single download larger
+    than `max_bytes` is still cached until the next write.
+
+    Args:
+        max_bytes (int, optional): Maximum total size of the cached archives
+            and their parsed data in bytes.
+            Defaults to `max_cache_bytes` in the `[DATA]` section of the config.ini.
+        max_age_days (float, optional): Maximum age of a cached version in days.
+            Defaults to `max_age_days` in the `[DATA]` section of the config.ini.
+        keep_versions (int, optional): Number of versions to keep per name and params.
+            Defaults to `keep_versions` in the `[DATA]` section of the config.ini.
+
+    Returns:
+        List[CacheEntry]: The evicted entries.
+    """
+    config = load_config()
+    cache_dir = Path(config["DATA"]["cache_dir"])
+
+    (
+        default_max_bytes,
+        default_max_age_days,
+        default_keep_versions,
+    ) = _get_eviction_policy()
+    return _prune_cache(
+        cache_dir,
+        default_max_bytes if max_bytes is None else max_bytes,
+        default_max_age_days if max_age_days is None else max_age_days,
+        default_keep_versions if keep_versions is None else keep_versions,
+    )
+
+
+def _get_eviction_policy() -> Tuple[int, float, int]:
+    """Return max. bytes, max. age in days and versions to keep as configured in the config.ini."""
+    config = load_config()
+
+    return (
+        config.getint("DATA", "max_cache_bytes", fallback=0),
+        config.getfloat("DATA", "max_age_days", fallback=0),
+        config.getint("DATA", "keep_versions", fallback=0),
+    )
+
+
+def _prune_cache(
+    cache_dir: Path,
+    max_bytes: int,
+    max_age_days: float,
+    keep_versions: int,
+    protected: Optional[CacheEntry] = None,
+) -> List[CacheEntry]:
+    """Apply the eviction policy to the given cache directory, see `prune_cache()`."""
+    if not (max_bytes or max_age_days or keep_versions):
+        return []
+
+    evicted = []
+    entries = []
+    versions: dict = {}
+    min_created = time.time() - max_age_days * 24 * 60 * 60
+
+    def is_protected(entry: CacheEntry) -> bool:
+        return protected is not None and entry.path == protected.path
+
+    # entries are ordered by version within each name and params hash
+    for entry in reversed(list_entries(cache_dir)):
+        key = (entry.name, entry.params_hash)
+        versions[key] = versions.get(key, 0) + 1
+
+        if not is_protected(entry) and (
+            (keep_versions and versions[key] > keep_versions)
+            or (max_age_days and entry.created < min_created)
+        ):
+            evicted.append(entry)
+        else:
+            entries.append(entry)
+
+    if max_bytes:
+        total_size = sum(entry.size + entry.frames_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.last_access):
+            if total_size <= max_bytes:
+                break
+            if not is_protected(entry):
+                evicted.append(entry)
+                total_size -= entry.size + entry.frames_size
+
+    _remove_versions(cache_dir, evicted)
+
+    return evicted
+
+
+def _remove_versions(cache_dir: Path, entries: List[CacheEntry]) -> None:
+    """Delete single cached versions from disk, the index and the memory cache."""
+    if not entries:
+        return
+
+    memory_cache = get_memory_cache()
+
+    for entry in entries:
+        file_path = cache_dir / entry.path
+        _remove_frames(file_path)
+        try:
+            file_path.unlink(missing_ok=True)
+            # remove the directories of name and params, if they are empty now
+            file_path.parent.rmdir()
+            file_path.parent.parent.rmdir()
+        except OSError:
+            pass
+
+        memory_cache.discard(file_path.parent)
+
+    discard_entries(cache_dir, entries)
+
+    logger.info(
+        "Evicted %d cached versions (%d bytes).",
+        len(entries),
+        sum(entry.size + entry.frames_size for entry in entries),
+    )
 
 
 def clear_cache(name: Optional[str] = None) -> None:
@@ -175,7 +1058,11 @@ def clear_cache(name: Optional[str] = None) -> None:
 
     # remove specified file (directory) from the data cache
     # or clear complete cache (remove childs, preserve base)
-    file_paths = [cache_dir / name] if name is not None else cache_dir.iterdir()
+    file_paths = (
+        [cache_dir / name, cache_dir / JOBS_DIR / name]
+        if name is not None
+        else list(cache_dir.iterdir())
+    )
 
     for file_path in file_paths:
         # delete if file or symlink, otherwise remove complete tree
@@ -188,3 +1075,8 @@ def clear_cache(name: Optional[str] = None) -> None:
             logger.warning("Failed to delete %s. Reason: %s", file_path, e)
 
         logger.info("Removed files: %s", file_paths)
+
+    remove_entries(cache_dir, name)
+    get_memory_cache().invalidate(
+        cache_dir / name if name is not None else None
+    )
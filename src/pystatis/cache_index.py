@@ -0,0 +1,401 @@
+"""Module provides an SQLite index of all entries in the data cache.
+
+The index lives in `<cache_dir>/cache_index.sqlite` and records one row per cached version,
+so hit checks and latest-version lookups do not have to list and sort directories.
+The size of each row includes the parsed data cached next to the version.
+Caches that were created before the index existed are indexed on first use.
+"""
+import logging
+import sqlite3
+import threading
+import time
+import zipfile
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "cache_index.sqlite"
+
+CODECS = {
+    zipfile.ZIP_DEFLATED: "deflate",
+    zipfile.ZIP_BZIP2: "bzip2",
+    zipfile.ZIP_LZMA: "lzma",
+    zipfile.ZIP_STORED: "stored",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    name TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    params TEXT,
+    version TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    codec TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    frames_size INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, params_hash, version)
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+"""
+
+# index files whose schema was created or migrated by this process, see `_init_index()`
+_initialized: Set[Path] = set()
+_init_lock = threading.Lock()
+
+
+class CacheEntry(NamedTuple):
+    """A single cached version as recorded in the cache index.
+
+    Attributes:
+        name (str): The unique identifier in GENESIS-Online.
+        params_hash (str): The hash of the params, see `pystatis.cache._build_file_path()`.
+        params (str, optional): The params as JSON, None for entries indexed from disk.
+        version (str): The version date in the format YYYYMMDD.
+        path (str): The path of the archive relative to the cache directory.
+        size (int): The size of the archive in bytes.
+        codec (str): The compression method of the archive.
+        created (float): The creation time as UNIX timestamp.
+        last_access (float): The time of the last read as UNIX timestamp.
+        frames_size (int): The size of the parsed data of this version in bytes.
+    """
+
+    name: str
+    params_hash: str
+    params: Optional[str]
+    version: str
+    path: str
+    size: int
+    codec: str
+    created: float
+    last_access: float
+    frames_size: int = 0
+
+
+def add_entry(
+    cache_dir: Path,
+    name: str,
+    params_hash: str,
+    params: Optional[str],
+    file_path: Path,
+) -> CacheEntry:
+    """Record a new cached version in the index.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params_hash (str): The hash of the params.
+        params (str, optional): The params as JSON.
+        file_path (Path): The path of the archive.
+
+    Returns:
+        CacheEntry: The recorded entry.
+    """
+    now = time.time()
+    entry = CacheEntry(
+        name=name,
+        params_hash=params_hash,
+        params=params,
+        version=file_path.stem,
+        path=file_path.relative_to(cache_dir).as_posix(),
+        size=file_path.stat().st_size,
+        codec=_get_codec(file_path),
+        created=now,
+        last_access=now,
+    )
+
+    with closing(_connect(cache_dir)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            entry,
+        )
+
+    return entry
+
+
+def get_latest_entry(
+    cache_dir: Path, name: str, params_hash: str, touch: bool = False
+) -> Optional[CacheEntry]:
+    """Return the most recent cached version for the given name and params.
+
+    Versions whose archive was removed from disk are dropped from the index,
+    the next older version is returned instead.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params_hash (str): The hash of the params.
+        touch (bool, optional): If True, update the time of the last access. Defaults to False.
+
+    Returns:
+        CacheEntry, optional: The latest entry, if there is any.
+    """
+    with closing(_connect(cache_dir)) as conn, conn:
+        while True:
+            row = conn.execute(
+                "SELECT * FROM entries WHERE name = ? AND params_hash = ? "
+                "ORDER BY version DESC LIMIT 1",
+                (name, params_hash),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            entry = CacheEntry(*row)
+
+            if (cache_dir / entry.path).exists():
+                break
+
+            # only this version is gone, older versions may still be on disk
+            conn.execute(
+                "DELETE FROM entries "
+                "WHERE name = ? AND params_hash = ? AND version = ?",
+                (name, params_hash, entry.version),
+            )
+            logger.warning(
+                "Cached file %s is missing, removed it from the cache index.",
+                entry.path,
+            )
+
+        if touch:
+            entry = entry._replace(last_access=time.time())
+            conn.execute(
+                "UPDATE entries SET last_access = ? "
+                "WHERE name = ? AND params_hash = ? AND version = ?",
+                (entry.last_access, name, params_hash, entry.version),
+            )
+
+    return entry
+
+
+def list_entries(
+    cache_dir: Path, name: Optional[str] = None
+) -> List[CacheEntry]:
+    """Return all indexed entries, optionally only for a given name.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str, optional): The unique identifier in GENESIS-Online.
+
+    Returns:
+        List[CacheEntry]: The entries ordered by name, params hash and version.
+    """
+    query = "SELECT * FROM entries"
+    args: tuple = ()
+    if name is not None:
+        query += " WHERE name = ?"
+        args = (name,)
+    query += " ORDER BY name, params_hash, version"
+
+    with closing(_connect(cache_dir)) as conn:
+        return [CacheEntry(*row) for row in conn.execute(query, args)]
+
+
+def remove_entries(cache_dir: Path, name: Optional[str] = None) -> None:
+    """Remove all entries, or only the entries of a given name, from the index.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        name (str, optional): The unique identifier in GENESIS-Online.
+    """
+    if not (cache_dir / INDEX_FILE).exists():
+        return
+
+    with closing(_connect(cache_dir)) as conn, conn:
+        if name is None:
+            conn.execute("DELETE FROM entries")
+        else:
+            conn.execute("DELETE FROM entries WHERE name = ?", (name,))
+
+
+def discard_entries(cache_dir: Path, entries: Iterable[CacheEntry]) -> None:
+    """Remove single versions from the index, e.g. after they were evicted from disk.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        entries (Iterable[CacheEntry]): The entries to remove.
+    """
+    with closing(_connect(cache_dir)) as conn, conn:
+        conn.executemany(
+            "DELETE FROM entries "
+            "WHERE name = ? AND params_hash = ? AND version = ?",
+            [
+                (entry.name, entry.params_hash, entry.version)
+                for entry in entries
+            ],
+        )
+
+
+def rekey_entry(
+    cache_dir: Path,
+    entry: CacheEntry,
+    params_hash: str,
+    params: Optional[str],
+    file_path: Path,
+) -> None:
+    """Move an entry to a new params hash, e.g. after the cache key changed.
+
+    An existing entry with the same new key and version is replaced.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        entry (CacheEntry): The entry to move.
+        params_hash (str): The new hash of the params.
+        params (str, optional): The new params as JSON.
+        file_path (Path): The new path of the archive.
+    """
+    with closing(_connect(cache_dir)) as conn, conn:
+        conn.execute(
+            "UPDATE OR REPLACE entries SET params_hash = ?, params = ?, path = ? "
+            "WHERE name = ? AND params_hash = ? AND version = ?",
+            (
+                params_hash,
+                params,
+                file_path.relative_to(cache_dir).as_posix(),
+                entry.name,
+                entry.params_hash,
+                entry.version,
+            ),
+        )
+
+
+def update_frames_size(cache_dir: Path, file_path: Path) -> None:
+    """Record the size of the parsed data that is cached next to a version on disk.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        file_path (Path): The path of the archive of the version.
+    """
+    with closing(_connect(cache_dir)) as conn, conn:
+        conn.execute(
+            "UPDATE entries SET frames_size = ? WHERE path = ?",
+            (
+                _get_frames_size(file_path),
+                file_path.relative_to(cache_dir).as_posix(),
+            ),
+        )
+
+
+def get_key_version(cache_dir: Path) -> int:
+    """Return the version of the cache keys the index was last migrated to.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+
+    Returns:
+        int: The version, 0 for indices that were never migrated.
+    """
+    with closing(_connect(cache_dir)) as conn:
+        version: int = conn.execute("PRAGMA user_version").fetchone()[0]
+
+    return version
+
+
+def set_key_version(cache_dir: Path, version: int) -> None:
+    """Record the version of the cache keys, see `get_key_version()`.
+
+    Args:
+        cache_dir (Path): The cash directory as configured in the config.
+        version (int): The version.
+    """
+    with closing(_connect(cache_dir)) as conn, conn:
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def _connect(cache_dir: Path) -> sqlite3.Connection:
+    """Open the index, it is created once per cache directory, see `_init_index()`."""
+    index_file = cache_dir / INDEX_FILE
+    # the index is removed together with the whole cache, see `pystatis.cache.clear_cache()`
+    if index_file not in _initialized or not index_file.exists():
+        _init_index(cache_dir)
+
+    return sqlite3.connect(index_file, timeout=30)
+
+
+def _init_index(cache_dir: Path) -> None:
+    """Create or migrate the schema of the index and index existing entries of new indices."""
+    index_file = cache_dir / INDEX_FILE
+
+    with _init_lock:
+        if index_file in _initialized and index_file.exists():
+            return
+
+        is_new = not index_file.exists()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        with closing(sqlite3.connect(index_file, timeout=30)) as conn:
+            conn.executescript(_SCHEMA)
+
+            columns = [
+                row[1] for row in conn.execute("PRAGMA table_info(entries)")
+            ]
+            if "frames_size" not in columns:
+                # indices created before the size of parsed data was recorded
+                with conn:
+                    conn.execute(
+                        "ALTER TABLE entries "
+                        "ADD COLUMN frames_size INTEGER NOT NULL DEFAULT 0"
+                    )
+
+            if is_new:
+                _index_existing_entries(cache_dir, conn)
+
+        _initialized.add(index_file)
+
+
+def _index_existing_entries(cache_dir: Path, conn: sqlite3.Connection) -> None:
+    """Add all archives on disk that were cached before the index existed."""
+    # layout: <cache_dir>/<name>/<params_hash>/<version>.zip
+    rows = []
+    for file_path in cache_dir.glob("*/*/*.zip"):
+        if file_path.parts[-3].startswith(".") or not file_path.stem.isdigit():
+            continue
+
+        stat = file_path.stat()
+        rows.append(
+            (
+                file_path.parts[-3],
+                file_path.parts[-2],
+                None,
+                file_path.stem,
+                file_path.relative_to(cache_dir).as_posix(),
+                stat.st_size,
+                _get_codec(file_path),
+                stat.st_mtime,
+                stat.st_mtime,
+                _get_frames_size(file_path),
+            )
+        )
+
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    if rows:
+        logger.info("Indexed %d existing cache entries.", len(rows))
+
+
+def _get_frames_size(file_path: Path) -> int:
+    """Return the total size of the parsed data cached next to an archive."""
+    # layout: <params_hash>/<version>-<variant>/<frame files>, skipping unfinished writes
+    return sum(
+        frame_path.stat().st_size
+        for frame_path in file_path.parent.glob(f"{file_path.stem}-*/*")
+        if frame_path.is_file() and frame_path.parent.suffix != ".part"
+    )
+
+
+def _get_codec(file_path: Path) -> str:
+    """Return the compression method of the first member of an archive."""
+    try:
+        with zipfile.ZipFile(file_path, "r") as myzip:
+            compress_type = myzip.infolist()[0].compress_type
+    except (OSError, IndexError, zipfile.BadZipFile):
+        return "unknown"
+
+    return CODECS.get(compress_type, "unknown")
@@ -146,7 +146,42 @@ def _create_default_config() -> ConfigParser:
     }
 
     config["DATA"] = {
-        "cache_dir": str(Path(settings["SETTINGS"]["config_dir"]) / "data")
+        "cache_dir": str(Path(settings["SETTINGS"]["config_dir"]) / "data"),
+        "compression": "deflate",
+        "compresslevel": "6",
+        "frame_cache": "auto",
+        "memory_cache_max_entries": "128",
+        "memory_cache_max_bytes": str(256 * 1024 * 1024),
+        "auto_prune": "true",
+        "max_cache_bytes": "0",
+        "max_age_days": "0",
+        "keep_versions": "0",
+        "revalidate": "false",
+        "dtypes": "default",
+        "downcast": "false",
+        "table_engine": "c",
+        "keep_raw_data": "true",
+    }
+
+    config["HTTP"] = {
+        "pool_connections": "10",
+        "pool_maxsize": "10",
+        "pool_block": "false",
+        "keep_alive": "true",
+        "max_concurrency": "10",
+        "stale_if_error": "true",
+        "offline": "false",
+    }
+
+    config["JOBS"] = {
+        "timeout": "60",
+        "poll_interval": "5",
+    }
+
+    config["TTL"] = {
+        "metadata": str(7 * 24 * 60 * 60),
+        "catalogue": str(24 * 60 * 60),
+        "find": str(24 * 60 * 60),
     }
 
     return config
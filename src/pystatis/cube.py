@@ -1,71 +1,438 @@
 """Module provides functionality to parse cubefile data provided by GENESIS."""
+import asyncio
 import copy
-from typing import List
+import csv
+from io import StringIO
+from typing import Iterator, List, Optional, TextIO, Tuple, Union
 
 import pandas as pd
 
-from pystatis.http_helper import load_data
+from pystatis import aio
+from pystatis.base import DataObject
+from pystatis.dtypes import (
+    DtypePolicy,
+    get_dtype_policy,
+    to_categorical,
+    to_float,
+    to_integer,
+)
+from pystatis.http_helper import Job, load_data, submit_data
 
+# identifies the parser of cached parsed data, increase when changing the parsed result
+FRAME_VARIANT = "cube-2"
+CUBE_ENGINES = ["c", "python"]
 
-class Cube:
+
+class Cube(DataObject):
     """A wrapper class holding all relevant data and metadata about a given cube.
 
     Args:
         name (str): The unique identifier of this cube.
         raw_data (str): The raw cubefile data as returned by the /data/cubfile endpoint.
-        data (pd.DataFrame): The parsed data as a pandas data frame.
-        cube (dict): Metadata as returned by the /data/cubefile endpoint.
-        metadata (dict): Metadata as returned by the /metadata/cube endpoint.
+        data (pd.DataFrame): The parsed data as a pandas data frame, downloaded on first access.
+        cube (dict): Metadata as returned by the /data/cubefile endpoint,
+            downloaded on first access.
+        metadata (dict): Metadata as returned by the /metadata/cube endpoint,
+            downloaded on first access.
+        stale (bool): True, if the data is an outdated cached version because the request failed.
+        keep_raw_data (bool, optional): If False, `raw_data` is not kept in memory after parsing,
+            but read from the cache again on access. Defaults to `keep_raw_data`
+            in the `[DATA]` section of the config.ini.
     """
 
-    def __init__(self, name: str):
-        self.name: str = name
-        self.raw_data = ""
-        self.data = pd.DataFrame()
-        self.cube: dict[str, pd.DataFrame] = {}
-        self.metadata: dict = {}
+    def __init__(self, name: str, keep_raw_data: Optional[bool] = None):
+        super().__init__(name, keep_raw_data)
+        self._cube: Optional[dict[str, pd.DataFrame]] = None
+
+    @property
+    def cube(self) -> dict[str, pd.DataFrame]:
+        """The blocks of the cubefile by header type, downloaded by `get_data()` on first access.
 
-    def get_data(self, area: str = "all", **kwargs):
-        """Downloads raw data and metadata from GENESIS-Online.
+        While a background job started with `wait=False` is pending, the dict is empty.
+        """
+        self._ensure_data()
+        return self._cube if self._cube is not None else {}
+
+    @cube.setter
+    def cube(self, cube: dict[str, pd.DataFrame]) -> None:
+        self._cube = cube
+
+    def get_data(
+        self,
+        area: str = "all",
+        wait: bool = True,
+        timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        stream: bool = False,
+        revalidate: Optional[bool] = None,
+        **kwargs,
+    ) -> Optional[Job]:
+        """Downloads raw data from GENESIS-Online.
+
+        Metadata is downloaded separately on first access of `metadata`, see `get_metadata()`.
 
         Additional keyword arguments are passed on to the GENESIS-Online GET request for cubefiles.
 
+        If the data is too big to be downloaded directly, GENESIS-Online prepares it in a background job.
+        With `wait=False` this method returns immediately with a handle for this job instead of blocking
+        until the job is finished. The data of this object is set as soon as the job handle is done.
+
+        With `stream=True` the data is written to the cache chunk by chunk and parsed from there,
+        so it is never held in memory as a whole and `raw_data` is not set.
+
+        Args:
+            area (str, optional): Area to search for the object in GENESIS-Online. Defaults to "all".
+            wait (bool, optional): If False, do not wait for background jobs and return a job handle.
+                Defaults to True.
+            timeout (float, optional): Maximum time in seconds to wait for a background job.
+                Defaults to `timeout` in the `[JOBS]` section of the config.ini.
+            poll_interval (float, optional): Time in seconds between two polls of a background job.
+                Defaults to `poll_interval` in the `[JOBS]` section of the config.ini.
+            stream (bool, optional): If True, stream the data to the cache and parse it from there.
+                Defaults to False.
+            revalidate (bool, optional): If True, cached data is only used if the object was not
+                updated in GENESIS-Online since it was cached. Defaults to `revalidate`
+                in the `[DATA]` section of the config.ini.
+
+        Raises:
+            JobTimeoutError: If `wait` is True and the background job is not finished in time.
+
+        Returns:
+            Job, optional: The job handle providing the raw data if `wait` is False, otherwise None.
+        """
+        params = self._build_params(area, **kwargs)
+
+        job = submit_data(
+            endpoint="data",
+            method="cubefile",
+            params=params,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            stream=stream,
+            revalidate=revalidate,
+            keep_in_memory=self._keep_raw_data(),
+        )
+        self._params = params
+
+        if not wait:
+            self._pending_job = job
+            job.add_done_callback(self._set_data_from_job)
+            return job
+
+        job.wait()
+        self._set_data_from_job(job)
+        return None
+
+    def iter_data(
+        self,
+        chunksize: int = 100_000,
+        area: str = "all",
+        timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        **kwargs,
+    ) -> Iterator[pd.DataFrame]:
+        """Iterate over the data of this cube in chunks of rows with bounded memory.
+
+        The cubefile is streamed to the cache, if it is not cached yet, and parsed from there
+        chunk by chunk, see `iter_cube()`. Neither `data` nor `raw_data` are set.
+
+        Additional keyword arguments are passed on to the GENESIS-Online GET request for cubefiles.
+
+        Args:
+            chunksize (int, optional): Maximum number of rows per chunk. Defaults to 100_000.
+            area (str, optional): Area to search for the object in GENESIS-Online. Defaults to "all".
+            timeout (float, optional): Maximum time in seconds to wait for a background job.
+                Defaults to `timeout` in the `[JOBS]` section of the config.ini.
+            poll_interval (float, optional): Time in seconds between two polls of a background job.
+                Defaults to `poll_interval` in the `[JOBS]` section of the config.ini.
+
+        Raises:
+            JobTimeoutError: If the background job is not finished in time.
+
+        Yields:
+            pd.DataFrame: The next chunk of rows with renamed axes and correct value types.
+        """
+        params = self._build_params(area, **kwargs)
+
+        job = submit_data(
+            endpoint="data",
+            method="cubefile",
+            params=params,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            stream=True,
+        )
+        job.wait()
+        self.stale = job.stale
+
+        with job.open() as file:
+            yield from iter_cube(file, chunksize=chunksize)
+
+    def get_metadata(self, area: str = "all", **kwargs) -> dict:
+        """Downloads metadata from GENESIS-Online without the data.
+
+        Metadata is cached for the time given by `metadata` in the `[TTL]` section of the config.ini.
+
+        Args:
+            area (str, optional): Area to search for the object in GENESIS-Online. Defaults to "all".
+
+        Returns:
+            dict: Metadata as returned by the /metadata/cube endpoint.
+        """
+        params = self._build_params(area, **kwargs)
+        self._params = params
+        self._load_metadata(params)
+
+        return self.metadata
+
+    async def get_data_async(self, area: str = "all", **kwargs):
+        """Downloads raw data and metadata from GENESIS-Online without blocking the event loop.
+
+        Asynchronous version of `get_data()`, data and metadata are requested concurrently.
+        Like `get_data()`, cached parsed data is used if available and `stale` is set.
+
         Args:
             area (str, optional): Area to search for the object in GENESIS-Online. Defaults to "all".
         """
+        params = self._build_params(area, **kwargs)
+        self._params = params
+
+        job, metadata = await asyncio.gather(
+            aio.submit_data(
+                endpoint="data",
+                method="cubefile",
+                params=params.copy(),
+                keep_in_memory=self._keep_raw_data(),
+            ),
+            aio.load_data(
+                endpoint="metadata",
+                method="cube",
+                params=params.copy(),
+                as_json=True,
+            ),
+        )
+        self._set_metadata(metadata)
+        # reading and parsing the data must not block the event loop
+        await asyncio.to_thread(self._set_data_from_job, job)
+
+    def _build_params(self, area: str, **kwargs) -> dict:
         params = {"name": self.name, "area": area}
 
         params |= kwargs
 
-        raw_data = load_data(
-            endpoint="data", method="cubefile", params=params, as_json=False
-        )
-        assert isinstance(raw_data, str)  # nosec assert_used
-        self.raw_data = raw_data
-        self.cube = assign_correct_types(rename_axes(parse_cube(raw_data)))
-        self.data = self.cube["QEI"]
+        return params
 
+    def _set_data_from_job(self, job: Job) -> None:
+        self._pending_job = None
+        self.stale = job.stale
+
+        policy = get_dtype_policy()
+        variant = f"{FRAME_VARIANT}-{policy.tag}"
+
+        frames = job.read_frames(variant)
+        if frames is not None:
+            if not job.stream:
+                # the raw data is only read on access, see `raw_data`
+                self._set_raw_data_from_job(job, lazy=True)
+            self.cube = frames
+            self.data = frames["QEI"]
+            return
+
+        if job.stream:
+            with job.open() as file:
+                self._set_data(file, policy)
+        else:
+            self._set_data(job.result(), policy)
+            self._set_raw_data_from_job(job)
+
+        job.cache_frames(self.cube, variant)
+
+    def _set_data(
+        self,
+        raw_data: Union[str, TextIO],
+        policy: Optional[DtypePolicy] = None,
+    ) -> None:
+        if isinstance(raw_data, str):
+            self.raw_data = raw_data
+        cube = process_cube(parse_cube(raw_data), inplace=True, policy=policy)
+        self.cube = cube
+        self.data = cube["QEI"]
+
+    def _load_metadata(self, params: dict) -> None:
         metadata = load_data(
             endpoint="metadata", method="cube", params=params, as_json=True
         )
-        assert isinstance(metadata, dict)  # nosec assert_used
-        self.metadata = metadata
+        self._set_metadata(metadata)
 
 
-def parse_cube(data: str) -> dict:
+def parse_cube(data: Union[str, TextIO], engine: str = "c") -> dict:
     """Main function for parsing a cubefile.
 
     Args:
-        data (str): The content of a cubefile as returned by GENESIS.
+        data (Union[str, TextIO]): The content of a cubefile as returned by GENESIS,
+            either as string or as text stream.
+        engine (str, optional): Either "c" to read each block with the C parser of pandas
+            or "python" to parse the cubefile line by line. Both return the same result,
+            but "c" is considerably faster and needs less memory for large cubes. Defaults to "c".
 
     Returns:
         dict: A dictionary with each header type as key and the corresponding header block as value.
     """
+    if engine == "c":
+        return _parse_cube_c(data)
+
+    if engine == "python":
+        return _parse_cube_python(data)
+
+    raise ValueError(
+        f"Unknown engine {engine!r}, must be one of {CUBE_ENGINES}."
+    )
+
+
+def iter_cube(
+    data: Union[str, TextIO], chunksize: int = 100_000
+) -> Iterator[pd.DataFrame]:
+    """Parse the QEI block of a cubefile in chunks of rows.
+
+    The metadata blocks are parsed up front, then the QEI block is read chunk by chunk,
+    so only a single chunk has to be held in memory. Each chunk has renamed axes
+    and correct value types, see `process_cube()`.
+    With the compact dtype policy, the categories of a column may differ between chunks.
+
+    Args:
+        data (Union[str, TextIO]): The content of a cubefile as returned by GENESIS,
+            either as string or as text stream.
+        chunksize (int, optional): Maximum number of rows per chunk. Defaults to 100_000.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows of the QEI block.
+    """
+    stream = StringIO(data) if isinstance(data, str) else data
+    metadata, header = _read_cube_metadata(stream)
+
+    if header is None:
+        return
+
+    policy = get_dtype_policy()
+    for chunk in _read_cube_block(stream, header, chunksize=chunksize):
+        # the chunk is not referenced elsewhere and the metadata blocks are not modified
+        cube = process_cube(
+            {**metadata, "QEI": chunk}, inplace=True, policy=policy
+        )
+        yield cube["QEI"]
+
+
+def _parse_cube_c(data: Union[str, TextIO]) -> dict:
+    """Parse a cubefile by handing each block as a whole to `pd.read_csv()`.
+
+    Only the short metadata blocks are collected line by line.
+    The QEI block, which holds the actual data, is always the last block,
+    so the remaining stream is read by `pd.read_csv()` directly.
+    """
+    stream = StringIO(data) if isinstance(data, str) else data
+    cube, header = _read_cube_metadata(stream)
+
+    if header is not None:
+        cube["QEI"] = next(_read_cube_block(stream, header))
+
+    return cube
+
+
+def _read_cube_metadata(stream: TextIO) -> Tuple[dict, Optional[List[str]]]:
+    """Read all blocks up to the QEI header of a cubefile.
+
+    Returns:
+        Tuple[dict, Optional[List[str]]]: The metadata blocks and the header of the QEI block,
+            the stream is positioned at the first data line of the QEI block.
+    """
+    cube = {}
+    header: Optional[List[str]] = None
+    header_type = ""
+    lines: List[str] = []
+
+    while True:
+        line = stream.readline()
+
+        if line and not _is_cube_metadata_header(line):
+            # skip all rows until first header
+            if header is not None:
+                lines.append(line)
+            continue
+
+        if header is not None and lines:
+            cube[header_type] = next(
+                _read_cube_block(StringIO("".join(lines)), header)
+            )
+
+        if not line:
+            return cube, None
+
+        header = _get_cube_metadata_header(
+            line.rstrip("\r\n"), rename_duplicates=True
+        )
+        header_type = _get_cube_metadata_header_type(line)
+        lines = []
+
+        if header_type == "QEI":
+            return cube, _get_value_columns_header(header, cube)
+
+
+def _read_cube_block(
+    block: TextIO, header: List[str], chunksize: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """Read the data lines of a cube block as strings, omitting the leading "D" column.
+
+    Without chunksize, the whole block is yielded as a single data frame.
+    """
+    try:
+        reader = pd.read_csv(
+            block,
+            sep=";",
+            header=None,
+            names=range(len(header) + 1),
+            usecols=range(1, len(header) + 1),
+            dtype=str,
+            na_filter=False,
+            quoting=csv.QUOTE_NONE,
+            engine="c",
+            chunksize=chunksize,
+        )
+    except pd.errors.EmptyDataError:
+        yield pd.DataFrame(columns=header)
+        return
+
+    if chunksize is None:
+        yield reader.set_axis(header, axis=1)
+        return
+
+    with reader:
+        for chunk in reader:
+            yield chunk.set_axis(header, axis=1)
+
+
+def _get_value_columns_header(header: List[str], cube: dict) -> List[str]:
+    """Repeat the last four columns of the QEI header for each variable in DQI."""
+    last_four_columns = header[-4:]
+    header = header[:-4]
+    for var in cube["DQI"]["NAME"]:
+        header.extend([f"{var}_{col}" for col in last_four_columns])
+
+    return header
+
+
+def _parse_cube_python(data: Union[str, TextIO]) -> dict:
+    """Parse a cubefile line by line."""
     cube = {}
     header = None
     data_block: List[List[str]] = []
 
-    for line in data.splitlines():
+    lines = (
+        data.splitlines()
+        if isinstance(data, str)
+        else (line.rstrip("\r\n") for line in data)
+    )
+
+    for line in lines:
         # skip all rows until first header
         if header is None and not _is_cube_metadata_header(line):
             continue
@@ -85,20 +452,43 @@ def parse_cube(data: str) -> dict:
     # the last data block has no header after it so we have to do it here
     # for cubes with more than one variable in DQI, we have to repeat the last four columns
     if header:
-        last_four_columns = header[-4:]
-        header = header[:-4]
-        for var in cube["DQI"]["NAME"]:
-            header.extend([f"{var}_{col}" for col in last_four_columns])
+        header = _get_value_columns_header(header, cube)
 
     cube[header_type] = pd.DataFrame(data_block, columns=header)
 
     return cube
 
 
+def process_cube(
+    cube: dict, inplace: bool = False, policy: Optional[DtypePolicy] = None
+) -> dict:
+    """Rename the axes and assign the correct value types of a parsed cubefile.
+
+    Same as `assign_correct_types(rename_axes(cube))`, but the cube is copied at most once.
+
+    Args:
+        cube (dict): A dictionary holding the cube data as returned by `parse_cube()`.
+        inplace (bool, optional): If True, modify the data frames of cube instead of a copy,
+            which avoids holding the data twice in memory. Defaults to False.
+        policy (DtypePolicy, optional): The dtype policy. Defaults to `dtypes` and `downcast`
+            in the `[DATA]` section of the config.ini.
+
+    Returns:
+        dict: Same dict as cube but with renamed axes and changed column types for QEI.
+    """
+    if not inplace:
+        cube = copy.deepcopy(cube)
+
+    return assign_correct_types(
+        rename_axes(cube, inplace=True), inplace=True, policy=policy
+    )
+
+
 def rename_axes(
     cube: dict,
     rename_classifying_variables: bool = True,
     rename_time_variable: bool = True,
+    inplace: bool = False,
 ) -> dict:
     """Rename the generic axes of a cubefile with the names found in the metadata.
 
@@ -108,11 +498,14 @@ def rename_axes(
             Defaults to True.
         rename_time_variable (bool, optional): If True, rename the time variable.
             Defaults to True.
+        inplace (bool, optional): If True, modify the data frames of cube instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: Same dict as cube but with renamed axes for QEI.
     """
-    cube = copy.deepcopy(cube)
+    if not inplace:
+        cube = copy.deepcopy(cube)
 
     old_cols = []
     new_cols = []
@@ -132,29 +525,49 @@ def rename_axes(
     return cube
 
 
-def assign_correct_types(cube: dict) -> dict:
-    """Assign correct value types to column 'WERT'.
+def assign_correct_types(
+    cube: dict, inplace: bool = False, policy: Optional[DtypePolicy] = None
+) -> dict:
+    """Assign correct value types to the columns 'WERT' and, depending on the policy, all other columns.
+
+    GENESIS special values like "." or "-" become missing values, see `pystatis.dtypes`.
 
     Args:
         cube (dict): A dictionary holding the cube data as returned by `parse_cube()`.
+        inplace (bool, optional): If True, modify the data frames of cube instead of a copy.
+            Defaults to False.
+        policy (DtypePolicy, optional): The dtype policy. Defaults to `dtypes` and `downcast`
+            in the `[DATA]` section of the config.ini.
 
     Returns:
         dict: Same dict as cube but with changed column types for QEI.
     """
-    cube = copy.deepcopy(cube)
+    if not inplace:
+        cube = copy.deepcopy(cube)
+
+    if policy is None:
+        policy = get_dtype_policy()
 
+    value_columns = []
     for var, dtype in zip(cube["DQI"]["NAME"], cube["DQI"]["DST"]):
+        column = f"{var}_WERT"
+        value_columns.append(column)
+
         if dtype == "GANZ":
-            cast_type = int  # type: ignore[assignment]
+            cube["QEI"][column] = to_integer(cube["QEI"][column], policy)
         elif dtype == "FEST":
-            cast_type = float  # type: ignore[assignment]
-        else:
-            cast_type = None  # type: ignore[assignment]
-
-        if cast_type is not None:
-            cube["QEI"][f"{var}_WERT"] = cube["QEI"][f"{var}_WERT"].astype(
-                cast_type
-            )
+            cube["QEI"][column] = to_float(cube["QEI"][column], policy)
+
+    # keys, time and quality flags repeat a few distinct values many times
+    to_categorical(
+        cube["QEI"],
+        [
+            column
+            for column in cube["QEI"].columns
+            if column not in value_columns
+        ],
+        policy,
+    )
 
     return cube
 
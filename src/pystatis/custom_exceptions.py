@@ -5,3 +5,15 @@ class DestatisStatusError(ValueError):
     """Raised when Destatis status code indicates an error ("Fehler")"""
 
     pass
+
+
+class JobTimeoutError(TimeoutError):
+    """Raised when a background job of Destatis is not finished in time"""
+
+    pass
+
+
+class OfflineError(ConnectionError):
+    """Raised when a request to Destatis is required, but offline mode is enabled"""
+
+    pass
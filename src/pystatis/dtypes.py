@@ -0,0 +1,173 @@
+"""Module provides the dtype policy for parsed cube and table data.
+
+The policy is configured in the `[DATA]` section of the config.ini.
+With `dtypes = default`, values are stored as numpy integers and floats and all other columns
+as strings, with `dtypes = compact`, key and time columns are stored as categoricals and values
+as nullable integers and floats. `downcast = true` additionally stores values with 32 instead
+of 64 bits, which loses precision for floats and is only applied to integers that fit.
+"""
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from pystatis.config import load_config
+
+DTYPE_POLICIES = ["default", "compact"]
+
+# special values used by GENESIS instead of a number, e.g. "." if a value is secret
+NA_VALUES = ["", "-", ".", "...", "/", "x"]
+
+
+class DtypePolicy(NamedTuple):
+    """The dtypes of parsed data.
+
+    Attributes:
+        compact (bool): If True, use categoricals for keys and nullable types for values.
+        downcast (bool): If True, use 32 bit types for values.
+    """
+
+    compact: bool = False
+    downcast: bool = False
+
+    @property
+    def tag(self) -> str:
+        """A short name of the policy, e.g. to tell apart cached parsed data."""
+        tag = "compact" if self.compact else "default"
+        return f"{tag}-32" if self.downcast else tag
+
+
+def get_dtype_policy() -> DtypePolicy:
+    """Return the dtype policy as configured in the config.ini.
+
+    Raises:
+        ValueError: If `dtypes` in the config.ini is unknown.
+
+    Returns:
+        DtypePolicy: The dtype policy.
+    """
+    config = load_config()
+    dtypes = config.get("DATA", "dtypes", fallback="default").lower()
+
+    if dtypes not in DTYPE_POLICIES:
+        raise ValueError(
+            f"Unknown dtypes {dtypes!r} in config.ini, "
+            f"must be one of {DTYPE_POLICIES}."
+        )
+
+    return DtypePolicy(
+        compact=dtypes == "compact",
+        downcast=config.getboolean("DATA", "downcast", fallback=False),
+    )
+
+
+def to_integer(values: pd.Series, policy: DtypePolicy) -> pd.Series:
+    """Convert values to integers, GENESIS special values become missing values.
+
+    Integers with missing values always use the nullable `Int64` type.
+
+    Args:
+        values (pd.Series): The values, either as strings or as numbers.
+        policy (DtypePolicy): The dtype policy.
+
+    Returns:
+        pd.Series: The converted values.
+    """
+    values = _to_number(values)
+    nullable = policy.compact or bool(values.isna().any())
+
+    if policy.downcast and _fits_int32(values):
+        return values.astype("Int32" if nullable else np.int32)
+
+    return values.astype("Int64" if nullable else np.int64)
+
+
+def to_float(values: pd.Series, policy: DtypePolicy) -> pd.Series:
+    """Convert values to floats, GENESIS special values become missing values.
+
+    Args:
+        values (pd.Series): The values, either as strings or as numbers.
+        policy (DtypePolicy): The dtype policy.
+
+    Returns:
+        pd.Series: The converted values.
+    """
+    values = _to_number(values)
+
+    if policy.compact:
+        return values.astype("Float32" if policy.downcast else "Float64")
+
+    return values.astype(np.float32 if policy.downcast else np.float64)
+
+
+def to_categorical(
+    frame: pd.DataFrame, columns: Iterable[str], policy: DtypePolicy
+) -> None:
+    """Convert the given columns of a data frame in place to categoricals.
+
+    Does nothing unless the policy is compact.
+
+    Args:
+        frame (pd.DataFrame): The data frame.
+        columns (Iterable[str]): The names of the columns.
+        policy (DtypePolicy): The dtype policy.
+    """
+    if not policy.compact:
+        return
+
+    for column in columns:
+        frame[column] = frame[column].astype("category")
+
+
+def compact_frame(
+    frame: pd.DataFrame,
+    policy: DtypePolicy,
+    columns: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """Apply the dtype policy in place to a data frame with inferred dtypes.
+
+    Integer and float columns are converted with `to_integer()` and `to_float()`,
+    string columns become categoricals if the policy is compact.
+
+    Args:
+        frame (pd.DataFrame): The data frame, e.g. as returned by `pd.read_csv()`.
+        policy (DtypePolicy): The dtype policy.
+        columns (Iterable[str], optional): The names of the columns to convert.
+            Defaults to all columns.
+
+    Returns:
+        pd.DataFrame: The same data frame.
+    """
+    for column in frame.columns if columns is None else columns:
+        dtype = frame[column].dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            frame[column] = to_integer(frame[column], policy)
+        elif pd.api.types.is_float_dtype(dtype):
+            frame[column] = to_float(frame[column], policy)
+        elif pd.api.types.is_object_dtype(dtype):
+            to_categorical(frame, [column], policy)
+
+    return frame
+
+
+def _to_number(values: pd.Series) -> pd.Series:
+    """Convert strings to numbers, special values become NaN."""
+    if not pd.api.types.is_object_dtype(values.dtype):
+        return values
+
+    try:
+        return pd.to_numeric(values)
+    except ValueError:
+        values = values.str.strip()
+        return pd.to_numeric(values.mask(values.isin(NA_VALUES)))
+
+
+def _fits_int32(values: pd.Series) -> bool:
+    """Check if all values can be represented as 32 bit integers."""
+    int32 = np.iinfo(np.int32)
+    return bool(
+        values.isna().all()
+        or (int32.min <= values.min() and values.max() <= int32.max)
+    )
@@ -1,4 +1,6 @@
 """Implements find endpoint to retrieve results based on query"""
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
 from pystatis.http_helper import load_data
@@ -209,10 +211,21 @@ class Find:
         self.is_run = False
 
     def run(self):
-        self.statistics = self._get_find_results("statistics")
-        self.variables = self._get_find_results("variables")
-        self.tables = self._get_find_results("tables")
-        self.cubes = self._get_find_results("cubes")
+        """Queries the API for all categories concurrently and prints summary."""
+        categories = ["statistics", "variables", "tables", "cubes"]
+
+        with ThreadPoolExecutor(max_workers=len(categories)) as executor:
+            results = dict(
+                zip(
+                    categories,
+                    executor.map(self._get_find_results, categories),
+                )
+            )
+
+        self.statistics = results["statistics"]
+        self.variables = results["variables"]
+        self.tables = results["tables"]
+        self.cubes = results["cubes"]
 
         self.is_run = True
 
@@ -1,9 +1,7 @@
 """Module provides wrapper for HelloWorld GENESIS REST-API functions."""
 
-import requests
-
 from pystatis.config import load_config
-from pystatis.http_helper import _check_invalid_status_code
+from pystatis.http_helper import _check_invalid_status_code, get_session
 
 
 def whoami() -> str:
@@ -17,7 +15,7 @@ def whoami() -> str:
     config = load_config()
     url = f"{config['GENESIS API']['base_url']}" + "helloworld/whoami"
 
-    response = requests.get(url, timeout=(1, 15))
+    response = get_session().get(url, timeout=(1, 15))
 
     _check_invalid_status_code(response)
 
@@ -40,7 +38,7 @@ def logincheck() -> str:
         "password": config["GENESIS API"]["password"],
     }
 
-    response = requests.get(url, params=params, timeout=(1, 15))
+    response = get_session().get(url, params=params, timeout=(1, 15))
 
     # NOTE: Cannot use get_data_from_endpoint due to colliding
     # and misleading usage of "Status" key in API response
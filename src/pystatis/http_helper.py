@@ -1,26 +1,596 @@
 """Wrapper module for the data endpoint."""
+import asyncio
 import json
 import logging
 import re
+import threading
 import time
+from datetime import datetime
+from io import StringIO
 from pathlib import Path
-from typing import Union
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 
 from pystatis.cache import (
     cache_data,
+    cache_data_stream,
+    cache_frames,
+    get_cache_time,
+    get_cached_version,
+    get_registered_job,
     hit_in_cash,
     normalize_name,
+    open_from_cache,
+    read_frames_from_cache,
     read_from_cache,
+    register_job,
+    unregister_job,
 )
 from pystatis.config import load_config
-from pystatis.custom_exceptions import DestatisStatusError
+from pystatis.custom_exceptions import (
+    DestatisStatusError,
+    JobTimeoutError,
+    OfflineError,
+)
 
 logger = logging.getLogger(__name__)
 
 JOB_ID_PATTERN = re.compile(r"\d+-\d+_\d+")
 JOB_TIMEOUT = 60
+JOB_POLL_INTERVAL = 5
+STREAM_CHUNK_SIZE = 1024 * 1024
+# metadata methods describing the data of the given data methods, see `_is_outdated()`
+METADATA_METHODS = {
+    "tablefile": "table",
+    "table": "table",
+    "cubefile": "cube",
+    "cube": "cube",
+}
+UPDATED_FORMAT = "%d.%m.%Y %H:%M:%S"
+UPDATED_TIMEZONE = "Europe/Berlin"
+# default time to live in seconds of cached responses per endpoint, 0 disables caching
+CACHE_TTLS = {
+    "metadata": 7 * 24 * 60 * 60,
+    "catalogue": 24 * 60 * 60,
+    "find": 24 * 60 * 60,
+}
+# methods whose responses change while jobs are running, so they are never cached
+UNCACHED_METHODS = {("catalogue", "jobs"), ("catalogue", "results")}
+
+# shared session so that all requests reuse pooled keep-alive connections
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class Job:
+    """A handle for data that is requested from GENESIS-Online.
+
+    Data that is too big to be downloaded directly is prepared by GENESIS-Online
+    in a background job. The handle can be polled, waited for or awaited until the
+    result of this job is available. Finished results are cached automatically.
+    For data that was available immediately (cache hit or direct download),
+    the handle is already done.
+
+    In streaming mode, the data is never held in memory as a whole. Instead, it is
+    written to the cache chunk by chunk and can be read back via `open()`.
+
+    Args:
+        job_id (str): The job ID generated by Destatis, empty if no job was started.
+        name (str, optional): The normalized unique identifier used for caching.
+        params (dict, optional): The params of the original data request used for caching.
+        data (str, optional): The raw data, if it is already available.
+        timeout (float, optional): Maximum time in seconds to wait for the job,
+            counted from the creation of the handle. Defaults to `timeout` in the
+            `[JOBS]` section of the config.ini.
+        poll_interval (float, optional): Time in seconds between two polls.
+            Defaults to `poll_interval` in the `[JOBS]` section of the config.ini.
+        stream (bool, optional): If True, the data is streamed to and read from the cache.
+            Defaults to False.
+        cached (bool, optional): If True, the data is already available in the cache.
+            Defaults to False.
+        stale (bool, optional): If True, the data is an outdated cached version that is used
+            because the request to GENESIS-Online failed. Defaults to False.
+        version (str, optional): The cached version to read, see `cached_version()`.
+            Defaults to the most recent version.
+        keep_in_memory (bool, optional): If True, data that is downloaded or read from
+            the cache is kept in the in-process memory cache. Defaults to True.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(
+        self,
+        job_id: str = "",
+        name: Optional[str] = None,
+        params: Optional[dict] = None,
+        data: Optional[str] = None,
+        timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        stream: bool = False,
+        cached: bool = False,
+        stale: bool = False,
+        version: Optional[str] = None,
+        keep_in_memory: bool = True,
+    ):
+        is_done = data is not None or cached
+
+        # settings are only relevant while the data is not available
+        if not is_done and (timeout is None or poll_interval is None):
+            config = load_config()
+            if timeout is None:
+                timeout = config.getfloat(
+                    "JOBS", "timeout", fallback=JOB_TIMEOUT
+                )
+            if poll_interval is None:
+                poll_interval = config.getfloat(
+                    "JOBS", "poll_interval", fallback=JOB_POLL_INTERVAL
+                )
+
+        self.job_id = job_id
+        self.name = name
+        self.params = params if params is not None else {}
+        self.timeout: float = timeout or 0.0
+        self.poll_interval: float = poll_interval or 0.0
+        # streaming needs a name to address the cache
+        self.stream = stream and name is not None
+        self.stale = stale
+        self.version = version
+        self.keep_in_memory = keep_in_memory
+        self._data = data
+        self._done = is_done
+        self._started = time.perf_counter()
+        self._callbacks: List[Callable[["Job"], None]] = []
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        state = "done" if self.done() else "pending"
+        return f"Job({self.job_id!r}, name={self.name!r}, {state})"
+
+    def __await__(self):
+        return self.result_async().__await__()
+
+    def done(self) -> bool:
+        """Return True, if the data is available."""
+        return self._done
+
+    def poll(self) -> bool:
+        """Check once if the job is finished and download its result if so.
+
+        Returns:
+            bool: True, if the data is available.
+        """
+        with self._lock:
+            if self.done():
+                return True
+
+            response = get_data_from_endpoint(
+                endpoint="catalogue",
+                method="jobs",
+                params=_get_jobs_params(self.job_id),
+            )
+            return self._update(_is_job_finished(response))
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the data is available.
+
+        Args:
+            timeout (float, optional): Maximum time in seconds to wait from now on.
+                Defaults to the remaining time of the handle's timeout.
+
+        Raises:
+            JobTimeoutError: If the job is not finished in time.
+        """
+        deadline = self._get_deadline(timeout)
+
+        while not self.poll():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self._raise_timeout()
+            time.sleep(min(self.poll_interval, remaining))
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """Block until the data is available and return it.
+
+        In streaming mode, the data is read from the cache, prefer `open()` instead.
+
+        Args:
+            timeout (float, optional): Maximum time in seconds to wait from now on.
+                Defaults to the remaining time of the handle's timeout.
+
+        Raises:
+            JobTimeoutError: If the job is not finished in time.
+
+        Returns:
+            str: The raw data as returned by Destatis.
+        """
+        self.wait(timeout)
+
+        return self._get_data()
+
+    def open(self, timeout: Optional[float] = None) -> TextIO:
+        """Block until the data is available and return a file-like object to read it.
+
+        In streaming mode, the data is read incrementally from the cache.
+
+        Args:
+            timeout (float, optional): Maximum time in seconds to wait from now on.
+                Defaults to the remaining time of the handle's timeout.
+
+        Raises:
+            JobTimeoutError: If the job is not finished in time.
+
+        Returns:
+            TextIO: A text stream holding the raw data as returned by Destatis.
+        """
+        self.wait(timeout)
+
+        if self._data is not None:
+            return StringIO(self._data)
+
+        return open_from_cache(self._get_cache_dir(), self.name, self.params)
+
+    def read_frames(self, variant: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """Return parsed data of this job's data that was cached by `cache_frames()`.
+
+        Args:
+            variant (str): Identifies the parser, see `pystatis.cache.cache_frames()`.
+
+        Returns:
+            Dict[str, pd.DataFrame], optional: The parsed data frames by key,
+                None if the data was not parsed and cached before.
+        """
+        if self.name is None or not self.done():
+            return None
+
+        return read_frames_from_cache(
+            self._get_cache_dir(), self.name, self.params, variant
+        )
+
+    def cache_frames(
+        self, frames: Dict[str, pd.DataFrame], variant: str
+    ) -> None:
+        """Cache parsed data of this job's data next to the cached raw data.
+
+        Args:
+            frames (Dict[str, pd.DataFrame]): The parsed data frames by key.
+            variant (str): Identifies the parser, see `pystatis.cache.cache_frames()`.
+        """
+        if self.name is None or not self.done():
+            return
+
+        cache_frames(
+            self._get_cache_dir(), self.name, self.params, frames, variant
+        )
+
+    async def wait_async(
+        self,
+        timeout: Optional[float] = None,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        """Wait for the data without blocking the event loop.
+
+        Asynchronous version of `wait()`.
+
+        Args:
+            timeout (float, optional): Maximum time in seconds to wait from now on.
+                Defaults to the remaining time of the handle's timeout.
+            limiter (asyncio.Semaphore, optional): Semaphore that is held during each
+                poll and download, e.g. to bound the concurrent requests to Destatis.
+
+        Raises:
+            JobTimeoutError: If the job is not finished in time.
+        """
+        deadline = self._get_deadline(timeout)
+
+        while not await self._poll_async(limiter):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self._raise_timeout()
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+    async def result_async(
+        self,
+        timeout: Optional[float] = None,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ) -> str:
+        """Wait for the data without blocking the event loop and return it.
+
+        Asynchronous version of `result()`, awaiting the handle itself is equivalent.
+
+        Args:
+            timeout (float, optional): Maximum time in seconds to wait from now on.
+                Defaults to the remaining time of the handle's timeout.
+            limiter (asyncio.Semaphore, optional): Semaphore that is held during each
+                poll and download, e.g. to bound the concurrent requests to Destatis.
+
+        Raises:
+            JobTimeoutError: If the job is not finished in time.
+
+        Returns:
+            str: The raw data as returned by Destatis.
+        """
+        await self.wait_async(timeout, limiter)
+
+        # cached data is read from disk, which must not block the event loop
+        return await asyncio.to_thread(self._get_data)
+
+    async def _poll_async(self, limiter: Optional[asyncio.Semaphore]) -> bool:
+        """Poll the job in a worker thread, holding the limiter if given."""
+        if limiter is None:
+            return await asyncio.to_thread(self.poll)
+
+        async with limiter:
+            return await asyncio.to_thread(self.poll)
+
+    def cached_version(self) -> Optional[str]:
+        """Return the version of the data in the cache, None if it is not cached.
+
+        Pass it as `version` to a new handle to keep reading exactly this data,
+        even if a newer version is cached later.
+        """
+        if self.version is not None:
+            return self.version
+
+        return get_cached_version(self._get_cache_dir(), self.name, self.params)
+
+    def add_done_callback(self, fn: Callable[["Job"], None]) -> None:
+        """Register a function that is called with this handle once the data is available.
+
+        If the data is already available, the function is called immediately.
+
+        Args:
+            fn (Callable[[Job], None]): The function to call with the finished handle.
+        """
+        with self._lock:
+            if not self.done():
+                self._callbacks.append(fn)
+                return
+
+        fn(self)
+
+    def _update(self, finished: bool) -> bool:
+        """Download the result if the job is reported as finished."""
+        with self._lock:
+            if finished and not self.done():
+                self._download_result()
+
+            return self.done()
+
+    def _set_result(self, data: Optional[str]) -> None:
+        with self._lock:
+            self._data = data
+            self._done = True
+            callbacks, self._callbacks = self._callbacks, []
+
+        for fn in callbacks:
+            fn(self)
+
+    def _get_data(self) -> str:
+        if self._data is not None:
+            return self._data
+
+        return read_from_cache(
+            self._get_cache_dir(),
+            self.name,
+            self.params,
+            version=self.version,
+            keep_in_memory=self.keep_in_memory,
+        )
+
+    def _download_result(self) -> None:
+        response = get_data_from_endpoint(
+            endpoint="data",
+            method="resultfile",
+            params=_get_resultfile_params(self.job_id),
+            stream=self.stream,
+        )
+
+        if self.name is None:
+            self._set_result(str(response.text))
+            return
+
+        cache_dir = self._get_cache_dir()
+
+        if self.stream and not _is_json_response(response):
+            _cache_response_stream(cache_dir, self.name, self.params, response)
+            data = None
+        else:
+            data = str(response.text)
+            cache_data(
+                cache_dir,
+                self.name,
+                self.params,
+                data,
+                keep_in_memory=self.keep_in_memory,
+            )
+
+        unregister_job(cache_dir, self.name, self.params)
+        self._set_result(data)
+
+    @staticmethod
+    def _get_cache_dir() -> Path:
+        return Path(load_config()["DATA"]["cache_dir"])
+
+    def _get_deadline(self, timeout: Optional[float]) -> float:
+        if timeout is None:
+            return self._started + self.timeout
+
+        return time.perf_counter() + timeout
+
+    def _raise_timeout(self) -> None:
+        raise JobTimeoutError(
+            f"Job {self.job_id} is not finished yet. "
+            "Poll or wait for the job handle again later to get the data."
+        )
+
+
+class JobTracker:
+    """Track many background jobs and poll them collectively.
+
+    Instead of polling each job on its own, the tracker lists all jobs of the user
+    with a single call to the catalogue/jobs endpoint per polling round and downloads
+    the result of each job as soon as its state becomes "Fertig".
+
+    Args:
+        jobs (Iterable[Job], optional): Job handles to track from the start.
+        poll_interval (float, optional): Time in seconds between two polling rounds.
+            Defaults to `poll_interval` in the `[JOBS]` section of the config.ini.
+    """
+
+    def __init__(
+        self,
+        jobs: Iterable[Job] = (),
+        poll_interval: Optional[float] = None,
+    ):
+        if poll_interval is None:
+            poll_interval = load_config().getfloat(
+                "JOBS", "poll_interval", fallback=JOB_POLL_INTERVAL
+            )
+
+        self.poll_interval: float = poll_interval
+        self.jobs: List[Job] = list(jobs)
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    @property
+    def pending(self) -> List[Job]:
+        """All tracked jobs whose data is not available yet."""
+        return [job for job in self.jobs if not job.done()]
+
+    def add(self, job: Job) -> Job:
+        """Track a job handle.
+
+        Args:
+            job (Job): The job handle to track.
+
+        Returns:
+            Job: The same job handle.
+        """
+        self.jobs.append(job)
+        return job
+
+    def submit(
+        self,
+        endpoint: str,
+        method: str,
+        params: dict,
+        timeout: Optional[float] = None,
+    ) -> Job:
+        """Request data via `submit_data()` and track the returned job handle.
+
+        Args:
+            endpoint (str): The endpoint for this data request.
+            method (str): The method for this data request.
+            params (dict): The dictionary holding the params for this data request.
+            timeout (float, optional): Maximum time in seconds to wait for a background job.
+
+        Returns:
+            Job: A handle holding or eventually providing the raw data.
+        """
+        job = submit_data(
+            endpoint,
+            method,
+            params,
+            timeout=timeout,
+            poll_interval=self.poll_interval,
+        )
+        return self.add(job)
+
+    def poll(self) -> List[Job]:
+        """Check all pending jobs with a single request and download finished results.
+
+        Returns:
+            List[Job]: The jobs that were finished within this polling round.
+        """
+        pending = self.pending
+        if not pending:
+            return []
+
+        response = get_data_from_endpoint(
+            endpoint="catalogue", method="jobs", params=_get_jobs_params("")
+        )
+        finished_codes = _get_finished_job_codes(response)
+
+        return [
+            job
+            for job in pending
+            if job._update(  # pylint: disable=protected-access
+                any(_is_job_code(code, job.job_id) for code in finished_codes)
+            )
+        ]
+
+    def as_completed(self, timeout: Optional[float] = None) -> Iterator[Job]:
+        """Yield the tracked jobs as soon as their data is available.
+
+        Args:
+            timeout (float, optional): Maximum time in seconds to wait from now on.
+                Defaults to the latest timeout of all tracked jobs.
+
+        Raises:
+            JobTimeoutError: If not all jobs are finished in time.
+
+        Yields:
+            Job: The job handles in order of completion.
+        """
+        if timeout is None:
+            deadline = max(
+                (
+                    job._get_deadline(None)  # pylint: disable=protected-access
+                    for job in self.pending
+                ),
+                default=time.perf_counter(),
+            )
+        else:
+            deadline = time.perf_counter() + timeout
+
+        yield from (job for job in self.jobs if job.done())
+
+        while self.pending:
+            yield from self.poll()
+
+            if not self.pending:
+                break
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                job_ids = ", ".join(job.job_id for job in self.pending)
+                raise JobTimeoutError(
+                    f"Jobs {job_ids} are not finished yet. "
+                    "Poll or wait for the tracker again later to get the data."
+                )
+            time.sleep(min(self.poll_interval, remaining))
+
+    def wait(self, timeout: Optional[float] = None) -> List[str]:
+        """Block until the data of all tracked jobs is available.
+
+        Args:
+            timeout (float, optional): Maximum time in seconds to wait from now on.
+                Defaults to the latest timeout of all tracked jobs.
+
+        Raises:
+            JobTimeoutError: If not all jobs are finished in time.
+
+        Returns:
+            List[str]: The raw data of all jobs in the order they were added.
+        """
+        for _ in self.as_completed(timeout):
+            pass
+
+        return [job.result() for job in self.jobs]
 
 
 def load_data(
@@ -29,6 +599,7 @@ def load_data(
     """Load data identified by endpoint, method and params.
 
     Either load data from cache (previous download) or from Destatis.
+    If Destatis has to prepare the data in a background job, wait for it.
 
     Args:
         endpoint (str): The endpoint for this data request.
@@ -36,38 +607,16 @@ def load_data(
         params (dict): The dictionary holding the params for this data request.
         as_json (bool, optional): If True, result will be parsed as JSON. Defaults to False.
 
+    Raises:
+        JobTimeoutError: If the background job is not finished in time.
+
     Returns:
         Union[str, dict]: The data as raw text or JSON dict.
     """
-    config = load_config()
-    cache_dir = Path(config["DATA"]["cache_dir"])
-    name = params.get("name")
-
-    if name is not None:
-        name = normalize_name(name)
-
     if endpoint == "data":
-        if hit_in_cash(cache_dir, name, params):
-            data = read_from_cache(cache_dir, name, params)
-        else:
-            response = get_data_from_endpoint(endpoint, method, params)
-            data = response.text
-
-            # status code 98 means that the table is too big
-            # we have to start a job and wait for it to be ready
-            response_status_code = 200
-            try:
-                # test for job-relevant status code
-                response_status_code = response.json().get("Status").get("Code")
-            except json.decoder.JSONDecodeError:
-                pass
-
-            if response_status_code == 98:
-                job_response = start_job(endpoint, method, params)
-                job_id = get_job_id_from_response(job_response)
-                data = get_data_from_resultfile(job_id)
-
-            cache_data(cache_dir, name, params, data)
+        data = submit_data(endpoint, method, params).result()
+    elif _get_cache_ttl(endpoint, method) > 0:
+        data = _load_cached_response(endpoint, method, params)
     else:
         response = get_data_from_endpoint(endpoint, method, params)
         data = response.text
@@ -79,8 +628,325 @@ def load_data(
         return data
 
 
-def get_data_from_endpoint(
+def _get_cache_ttl(endpoint: str, method: str) -> float:
+    """Return the time to live of cached responses for the given endpoint and method.
+
+    The TTLs are configured in seconds in the `[TTL]` section of the config.ini,
+    endpoints without a default TTL (e.g. profile) and the methods in `UNCACHED_METHODS`
+    (e.g. catalogue/jobs) are never cached.
+    """
+    if endpoint not in CACHE_TTLS or (endpoint, method) in UNCACHED_METHODS:
+        return 0
+
+    return load_config().getfloat(
+        "TTL", endpoint, fallback=CACHE_TTLS[endpoint]
+    )
+
+
+def _load_cached_response(
+    endpoint: str, method: str, params: dict, refresh: bool = False
+) -> str:
+    """Load the response of a non-data endpoint from cache, if it is not older than its TTL.
+
+    With `refresh=True` the response is always downloaded and the cached response is replaced.
+    """
+    config = load_config()
+    cache_dir = Path(config["DATA"]["cache_dir"])
+    name, cache_params = _build_response_cache_key(endpoint, method, params)
+    ttl = _get_cache_ttl(endpoint, method)
+
+    # in offline mode, any cached response is used regardless of its age
+    max_age = None if _is_offline() else ttl
+    if not refresh and hit_in_cash(
+        cache_dir, name, cache_params, max_age=max_age
+    ):
+        return read_from_cache(cache_dir, name, cache_params)
+
+    try:
+        data = get_data_from_endpoint(endpoint, method, params).text
+    except (requests.exceptions.RequestException, OfflineError) as e:
+        if not _use_stale(cache_dir, name, cache_params, e):
+            raise
+        return read_from_cache(cache_dir, name, cache_params)
+
+    if ttl > 0:
+        cache_data(cache_dir, name, cache_params, data)
+
+    return data
+
+
+def _is_offline() -> bool:
+    """Return True, if offline mode is enabled in the `[HTTP]` section of the config.ini."""
+    return load_config().getboolean("HTTP", "offline", fallback=False)
+
+
+def _use_stale(
+    cache_dir: Path, name: Optional[str], params: dict, error: Exception
+) -> bool:
+    """Check if an outdated cached version can be used instead of a failed request.
+
+    This is the case if `stale_if_error` is enabled in the `[HTTP]` section
+    of the config.ini and any version is cached.
+    """
+    if not load_config().getboolean("HTTP", "stale_if_error", fallback=True):
+        return False
+
+    if not hit_in_cash(cache_dir, name, params):
+        return False
+
+    logger.warning(
+        "Request for %s failed, using the latest cached version instead. Reason: %s",
+        name,
+        error,
+    )
+    return True
+
+
+def _build_response_cache_key(
     endpoint: str, method: str, params: dict
+) -> Tuple[str, dict]:
+    """Return the name and params a response of a non-data endpoint is cached under.
+
+    Metadata only depends on the object, so it is shared across all data params
+    (e.g. area or startyear). Responses without an object name (e.g. find)
+    are cached under the name of the endpoint.
+    """
+    if endpoint == "metadata" and "name" in params:
+        name = normalize_name(params["name"])
+        cache_params = {"endpoint": endpoint, "method": method, "name": name}
+        if "language" in params:
+            cache_params["language"] = params["language"]
+        return name, cache_params
+
+    name = normalize_name(params["name"]) if "name" in params else endpoint
+
+    return name, {"endpoint": endpoint, "method": method, **params}
+
+
+def submit_data(
+    endpoint: str,
+    method: str,
+    params: dict,
+    timeout: Optional[float] = None,
+    poll_interval: Optional[float] = None,
+    stream: bool = False,
+    revalidate: Optional[bool] = None,
+    keep_in_memory: bool = True,
+) -> Job:
+    """Request data identified by endpoint, method and params without waiting for background jobs.
+
+    Either load data from cache (previous download) or from Destatis.
+    If the data is too big, a background job is started and a pending handle is returned.
+
+    Args:
+        endpoint (str): The endpoint for this data request.
+        method (str): The method for this data request.
+        params (dict): The dictionary holding the params for this data request.
+        timeout (float, optional): Maximum time in seconds to wait for a background job.
+        poll_interval (float, optional): Time in seconds between two polls of a background job.
+        stream (bool, optional): If True, the response body is written to the cache chunk by chunk
+            instead of being held in memory. Use `Job.open()` to read it. Defaults to False.
+        revalidate (bool, optional): If True, cached data is only used if the object was not updated
+            in GENESIS-Online since it was cached. Defaults to `revalidate` in the `[DATA]` section
+            of the config.ini.
+        keep_in_memory (bool, optional): If True, the raw data is kept in the in-process
+            memory cache. Defaults to True.
+
+    If a request fails and `stale_if_error` is enabled in the `[HTTP]` section of the config.ini,
+    the most recent cached version is returned instead and marked as stale.
+    With `offline` enabled, only cached data is returned and no request is sent.
+
+    Raises:
+        OfflineError: If offline mode is enabled and the data is not cached.
+
+    Returns:
+        Job: A handle holding or eventually providing the raw data.
+    """
+    # pylint: disable=too-many-arguments
+    config = load_config()
+    cache_dir = Path(config["DATA"]["cache_dir"])
+    name = params.get("name")
+
+    if name is not None:
+        name = normalize_name(name)
+
+    if revalidate is None:
+        revalidate = config.getboolean("DATA", "revalidate", fallback=False)
+
+    is_cached = hit_in_cash(cache_dir, name, params)
+
+    try:
+        # in offline mode, cached data is never revalidated
+        if is_cached and not (
+            revalidate
+            and not _is_offline()
+            and _is_outdated(cache_dir, name, method, params)
+        ):
+            return _get_cached_job(name, params, stream, keep_in_memory)
+
+        return _request_data(
+            endpoint,
+            method,
+            params,
+            timeout,
+            poll_interval,
+            stream,
+            keep_in_memory,
+        )
+    except (requests.exceptions.RequestException, OfflineError) as e:
+        if not is_cached or not _use_stale(cache_dir, name, params, e):
+            raise
+        return _get_cached_job(name, params, stream, keep_in_memory, stale=True)
+
+
+def _get_cached_job(
+    name: Optional[str],
+    params: dict,
+    stream: bool,
+    keep_in_memory: bool,
+    stale: bool = False,
+) -> Job:
+    """Return a finished job for the most recent cached version of the data.
+
+    The data is read from the cache on first access, so it is not read at all
+    if the parsed data is cached, too.
+    """
+    return Job(
+        name=name,
+        params=params,
+        stream=stream,
+        cached=True,
+        stale=stale,
+        keep_in_memory=keep_in_memory,
+    )
+
+
+def _request_data(
+    endpoint: str,
+    method: str,
+    params: dict,
+    timeout: Optional[float],
+    poll_interval: Optional[float],
+    stream: bool,
+    keep_in_memory: bool,
+) -> Job:
+    """Download data from Destatis or start a background job, see `submit_data()`."""
+    # pylint: disable=too-many-arguments
+    cache_dir = Path(load_config()["DATA"]["cache_dir"])
+    name = params.get("name")
+
+    if name is not None:
+        name = normalize_name(name)
+
+    # resume a job that was started by a previous process instead of starting a new one
+    job_id = get_registered_job(cache_dir, name, params)
+    if job_id is not None:
+        if _job_exists(job_id):
+            logger.info("Resuming background job %s.", job_id)
+            return Job(
+                job_id,
+                name=name,
+                params=params,
+                timeout=timeout,
+                poll_interval=poll_interval,
+                stream=stream,
+                keep_in_memory=keep_in_memory,
+            )
+
+        unregister_job(cache_dir, name, params)
+
+    response = get_data_from_endpoint(endpoint, method, params, stream=stream)
+
+    if stream and name is not None and not _is_json_response(response):
+        _cache_response_stream(cache_dir, name, params, response)
+        return Job(name=name, params=params, stream=True, cached=True)
+
+    # status code 98 means that the table is too big
+    # we have to start a job and wait for it to be ready
+    if _is_job_required(response):
+        job_response = start_job(endpoint, method, params)
+        job_id = get_job_id_from_response(job_response)
+        if not job_id:
+            raise DestatisStatusError(
+                "Could not find the job ID in the response of Destatis "
+                f"after starting a job for {name}."
+            )
+        register_job(cache_dir, name, params, job_id)
+        return Job(
+            job_id,
+            name=name,
+            params=params,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            stream=stream,
+            keep_in_memory=keep_in_memory,
+        )
+
+    data = response.text
+    cache_data(cache_dir, name, params, data, keep_in_memory=keep_in_memory)
+
+    return Job(name=name, params=params, data=data)
+
+
+def _is_outdated(
+    cache_dir: Path, name: Optional[str], method: str, params: dict
+) -> bool:
+    """Check if the object was updated in GENESIS-Online since its data was cached.
+
+    The "Updated" timestamp is taken from freshly downloaded metadata, which also
+    replaces the cached metadata. If the timestamp is missing, the cached data is
+    considered outdated.
+    """
+    metadata_method = METADATA_METHODS.get(method)
+    cached = get_cache_time(cache_dir, name, params)
+
+    if metadata_method is None or name is None or cached is None:
+        return False
+
+    metadata_params = {"name": name, "area": params.get("area", "all")}
+    if "language" in params:
+        metadata_params["language"] = params["language"]
+
+    metadata = json.loads(
+        _load_cached_response(
+            "metadata", metadata_method, metadata_params, refresh=True
+        )
+    )
+    updated = _parse_updated(metadata)
+
+    if updated is None:
+        logger.warning(
+            "Could not determine the last update of %s, downloading it again.",
+            name,
+        )
+        return True
+
+    if updated.timestamp() <= cached:
+        logger.info("Cached data of %s is up to date.", name)
+        return False
+
+    logger.info("%s was updated on %s, downloading it again.", name, updated)
+    return True
+
+
+def _parse_updated(metadata: dict) -> Optional[datetime]:
+    """Return the "Updated" timestamp of an object from its metadata, if there is any."""
+    try:
+        # e.g. "14.12.2022 08:00:12h"
+        updated = metadata["Object"]["Updated"].rstrip("h").strip()
+        timestamp = datetime.strptime(updated, UPDATED_FORMAT)
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
+
+    # timestamps are given in German local time, fall back to local time without tz database
+    try:
+        return timestamp.replace(tzinfo=ZoneInfo(UPDATED_TIMEZONE))
+    except ZoneInfoNotFoundError:
+        return timestamp
+
+
+def get_data_from_endpoint(
+    endpoint: str, method: str, params: dict, stream: bool = False
 ) -> requests.Response:
     """
     Wrapper method which constructs an url for querying data from Destatis and
@@ -90,11 +956,23 @@ def get_data_from_endpoint(
         endpoint (str): Destatis endpoint (eg. data, catalogue, ..)
         method (str): Destatis method (eg. cube, tablefile, ...)
         params (dict): dictionary of query parameters
+        stream (bool, optional): If True, the response body is not downloaded immediately
+            unless it is a JSON status response. Defaults to False.
+
+    Raises:
+        OfflineError: If offline mode is enabled in the `[HTTP]` section of the config.ini.
 
     Returns:
         requests.Response: the response object holding the response from calling the Destatis endpoint.
     """
     config = load_config()
+
+    if config.getboolean("HTTP", "offline", fallback=False):
+        raise OfflineError(
+            f"Offline mode is enabled, {endpoint}/{method} is not requested. "
+            f"Name: {params.get('name')}."
+        )
+
     url = f"{config['GENESIS API']['base_url']}{endpoint}/{method}"
 
     # params is used to calculate hash for caching so don't alter params dict here!
@@ -106,15 +984,115 @@ def get_data_from_endpoint(
         }
     )
 
-    response = requests.get(url, params=params_, timeout=(5, 15))
+    response = get_session().get(
+        url, params=params_, timeout=(5, 15), stream=stream
+    )
 
     response.encoding = "UTF-8"
     _check_invalid_status_code(response)
-    _check_invalid_destatis_status_code(response)
+
+    # checking the Destatis status would download the whole body of a streamed data response
+    if not stream or _is_json_response(response):
+        _check_invalid_destatis_status_code(response)
 
     return response
 
 
+def create_session(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    pool_block: Optional[bool] = None,
+    keep_alive: Optional[bool] = None,
+) -> requests.Session:
+    """Create a new session with a connection pool for GENESIS-Online.
+
+    Arguments that are not given are read from the `[HTTP]` section of the config.ini.
+
+    Args:
+        pool_connections (int, optional): Number of host pools to keep. Defaults to 10.
+        pool_maxsize (int, optional): Maximum number of connections kept per host. Defaults to 10.
+        pool_block (bool, optional): If True, block when all connections of a host are in use
+            instead of opening additional, non-pooled connections. Defaults to False.
+        keep_alive (bool, optional): If False, connections are closed after each request.
+            Defaults to True.
+
+    Returns:
+        requests.Session: The new session.
+    """
+    config = load_config()
+
+    if pool_connections is None:
+        pool_connections = config.getint(
+            "HTTP", "pool_connections", fallback=10
+        )
+    if pool_maxsize is None:
+        pool_maxsize = config.getint("HTTP", "pool_maxsize", fallback=10)
+    if pool_block is None:
+        pool_block = config.getboolean("HTTP", "pool_block", fallback=False)
+    if keep_alive is None:
+        keep_alive = config.getboolean("HTTP", "keep_alive", fallback=True)
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared session used for all requests to GENESIS-Online.
+
+    The session is created on first use with the settings from the config.ini.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session  # pylint: disable=global-statement
+
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+
+        return _session
+
+
+def set_session(session: Optional[requests.Session]) -> None:
+    """Replace the shared session, e.g. with a custom configured one.
+
+    The previous session is not closed. Passing None resets the shared session,
+    so a new one is created from the config.ini on next use.
+
+    Args:
+        session (requests.Session, optional): The session to use for all further requests.
+    """
+    global _session  # pylint: disable=global-statement
+
+    with _session_lock:
+        _session = session
+
+
+def close_session() -> None:
+    """Close the shared session and release all pooled connections.
+
+    A new session is created automatically on the next request.
+    """
+    global _session  # pylint: disable=global-statement
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
 def start_job(endpoint: str, method: str, params: dict) -> requests.Response:
     """Small helper function to start a job in the background.
 
@@ -129,7 +1107,8 @@ def start_job(endpoint: str, method: str, params: dict) -> requests.Response:
     logger.warning(
         "Die Tabelle ist zu groß, um direkt abgerufen zu werden. Es wird eine Verarbeitung im Hintergrund gestartet."
     )
-    params["job"] = "true"
+    # the params of the caller are kept as they are, e.g. for later requests of the object
+    params = {**params, "job": "true"}
 
     # starting a job
     response = get_data_from_endpoint(
@@ -161,47 +1140,119 @@ def get_job_id_from_response(response: requests.Response) -> str:
     return job_id
 
 
-def get_data_from_resultfile(job_id: str) -> str:
-    """Get data from a job once it is finished or when the timeout is reached.
+def get_data_from_resultfile(
+    job_id: str,
+    timeout: Optional[float] = None,
+    poll_interval: Optional[float] = None,
+) -> str:
+    """Get data from a job once it is finished.
 
     Args:
         job_id (str): Job ID generated by Destatis API.
+        timeout (float, optional): Maximum time in seconds to wait for the job.
+            Defaults to `timeout` in the `[JOBS]` section of the config.ini.
+        poll_interval (float, optional): Time in seconds between two polls.
+            Defaults to `poll_interval` in the `[JOBS]` section of the config.ini.
+
+    Raises:
+        JobTimeoutError: If the job is not finished in time.
 
     Returns:
         str: The raw data of the table file as returned by Destatis.
     """
-    params = {
+    return Job(job_id, timeout=timeout, poll_interval=poll_interval).result()
+
+
+def _is_json_response(response: requests.Response) -> bool:
+    """Check if the response body is JSON, e.g. a Destatis status, and not raw data."""
+    return "json" in response.headers.get("Content-Type", "")
+
+
+def _cache_response_stream(
+    cache_dir: Path, name: str, params: dict, response: requests.Response
+) -> None:
+    """Write the body of a streamed response to the cache chunk by chunk."""
+    with response:
+        cache_data_stream(
+            cache_dir,
+            name,
+            params,
+            response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+        )
+
+
+def _is_job_required(response: requests.Response) -> bool:
+    """Check if Destatis asks to start a background job (status code 98).
+
+    Args:
+        response (requests.Response): The response object from the request
+
+    Returns:
+        bool: True, if the data is too big and has to be requested via a job.
+    """
+    response_status_code = 200
+    try:
+        # test for job-relevant status code
+        response_status_code = response.json().get("Status").get("Code")
+    except json.decoder.JSONDecodeError:
+        pass
+
+    return bool(response_status_code == 98)
+
+
+def _get_jobs_params(job_id: str) -> dict:
+    """Return the params to look up a job via the catalogue/jobs endpoint.
+
+    An empty job ID results in a wildcard selection that lists all jobs of the user.
+    """
+    return {
         "selection": "*" + job_id,
         "searchcriterion": "code",
         "sortcriterion": "code",
         "type": "all",
+        "pagelength": "2500",
     }
 
-    time_ = time.perf_counter()
 
-    while (time.perf_counter() - time_) < JOB_TIMEOUT:
+def _job_exists(job_id: str) -> bool:
+    """Check if Destatis still knows a job, no matter if it is finished or not."""
+    try:
         response = get_data_from_endpoint(
-            endpoint="catalogue", method="jobs", params=params
+            endpoint="catalogue", method="jobs", params=_get_jobs_params(job_id)
         )
+        jobs = response.json().get("List") or []
+    except (DestatisStatusError, ValueError):
+        return False
 
-        jobs = response.json().get("List")
-        if len(jobs) > 0 and jobs[0].get("State") == "Fertig":
-            break
+    return len(jobs) > 0
+
+
+def _get_finished_job_codes(response: requests.Response) -> List[str]:
+    """Return the codes of all jobs in a catalogue/jobs response that are finished ("Fertig")."""
+    jobs = response.json().get("List") or []
+    return [job.get("Code", "") for job in jobs if job.get("State") == "Fertig"]
 
-        time.sleep(5)
-    else:
-        return ""
 
-    params = {
+def _is_job_code(code: str, job_id: str) -> bool:
+    """Check if a code in a catalogue/jobs response belongs to the given job."""
+    # codes may carry a prefix, but an empty job ID must not match any job
+    return bool(job_id) and code.endswith(job_id)
+
+
+def _get_resultfile_params(job_id: str) -> dict:
+    """Return the params to download the result of a job via the data/resultfile endpoint."""
+    return {
         "name": job_id,
         "area": "all",
         "compress": "false",
         "format": "ffcsv",
     }
-    response = get_data_from_endpoint(
-        endpoint="data", method="resultfile", params=params
-    )
-    return str(response.text)
+
+
+def _is_job_finished(response: requests.Response) -> bool:
+    """Check if the catalogue/jobs response reports the job as finished ("Fertig")."""
+    jobs = response.json().get("List")
+    return bool(len(jobs) > 0 and jobs[0].get("State") == "Fertig")
 
 
 def _check_invalid_status_code(response: requests.Response) -> None:
@@ -0,0 +1,193 @@
+"""Module provides a bounded in-process LRU cache in front of the disk cache.
+
+Repeated reads of the same cached data within one process are served from memory,
+so the archive does not have to be read and inflated again.
+Entries are keyed by the cache directory of the data, i.e. `<cache_dir>/<name>/<hash(params)>`,
+so they are addressed exactly like the disk cache.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+from pystatis.config import load_config
+
+MAX_ENTRIES = 128
+MAX_BYTES = 256 * 1024 * 1024
+
+
+class MemoryCacheInfo(NamedTuple):
+    """Statistics of the memory cache.
+
+    Attributes:
+        hits (int): Number of reads served from memory.
+        misses (int): Number of reads not found in memory.
+        evictions (int): Number of entries dropped to stay within the limits.
+        entries (int): Current number of entries.
+        size (int): Current size of all entries in bytes.
+        max_entries (int): Maximum number of entries.
+        max_bytes (int): Maximum size of all entries in bytes.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+    max_entries: int
+    max_bytes: int
+
+
+class MemoryCache:
+    """A thread-safe LRU cache for raw data bounded by number of entries and total size.
+
+    Args:
+        max_entries (int): Maximum number of entries, 0 disables the cache.
+        max_bytes (int): Maximum size of all entries in bytes, 0 disables the cache.
+    """
+
+    def __init__(
+        self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Path, Tuple[str, int]]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Path) -> bool:
+        return key in self._entries
+
+    def get(self, key: Path) -> Optional[str]:
+        """Return the data for the given key and mark it as recently used.
+
+        Args:
+            key (Path): The cache directory of the data.
+
+        Returns:
+            str, optional: The data, if it is cached.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key: Path, data: str) -> None:
+        """Add or replace the data for the given key and evict least recently used entries.
+
+        Data that is larger than the maximum size is not cached at all.
+
+        Args:
+            key (Path): The cache directory of the data.
+            data (str): The raw data.
+        """
+        size = sys.getsizeof(data)
+
+        with self._lock:
+            self._remove(key)
+
+            if size > self.max_bytes or self.max_entries < 1:
+                return
+
+            self._entries[key] = (data, size)
+            self._size += size
+
+            while (
+                len(self._entries) > self.max_entries
+                or self._size > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def discard(self, key: Path) -> None:
+        """Remove the data for the given key, if it is cached.
+
+        Args:
+            key (Path): The cache directory of the data.
+        """
+        with self._lock:
+            self._remove(key)
+
+    def invalidate(self, parent: Optional[Path] = None) -> None:
+        """Remove all entries, or only the entries below a given directory.
+
+        Args:
+            parent (Path, optional): The directory, e.g. `<cache_dir>/<name>`.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if parent is None or parent in key.parents:
+                    self._remove(key)
+
+    def info(self) -> MemoryCacheInfo:
+        """Return hit/miss counters and the current usage of the cache."""
+        with self._lock:
+            return MemoryCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size=self._size,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+            )
+
+    def _remove(self, key: Path) -> None:
+        if key in self._entries:
+            _, size = self._entries.pop(key)
+            self._size -= size
+
+
+_memory_cache: Optional[MemoryCache] = None
+_memory_cache_lock = threading.Lock()
+
+
+def get_memory_cache() -> MemoryCache:
+    """Return the memory cache of this process.
+
+    The cache is created on first use with the limits from the `[DATA]` section
+    of the config.ini (`memory_cache_max_entries` and `memory_cache_max_bytes`).
+
+    Returns:
+        MemoryCache: The shared memory cache.
+    """
+    global _memory_cache  # pylint: disable=global-statement
+
+    with _memory_cache_lock:
+        if _memory_cache is None:
+            config = load_config()
+            _memory_cache = MemoryCache(
+                max_entries=config.getint(
+                    "DATA", "memory_cache_max_entries", fallback=MAX_ENTRIES
+                ),
+                max_bytes=config.getint(
+                    "DATA", "memory_cache_max_bytes", fallback=MAX_BYTES
+                ),
+            )
+
+        return _memory_cache
+
+
+def set_memory_cache(memory_cache: Optional[MemoryCache]) -> None:
+    """Replace the memory cache of this process, e.g. to change its limits.
+
+    Passing None resets the memory cache, so a new one is created from the config.ini on next use.
+
+    Args:
+        memory_cache (MemoryCache, optional): The memory cache to use from now on.
+    """
+    global _memory_cache  # pylint: disable=global-statement
+
+    with _memory_cache_lock:
+        _memory_cache = memory_cache
@@ -1,49 +1,429 @@
 """Module contains business logic related to destatis tables."""
+import asyncio
+import csv
+import logging
+import re
 from io import StringIO
+from typing import List, NamedTuple, Optional, TextIO, Union
 
+import numpy as np
 import pandas as pd
 
-from pystatis.http_helper import load_data
+from pystatis import aio
+from pystatis.base import DataObject
+from pystatis.config import load_config
+from pystatis.dtypes import (
+    NA_VALUES,
+    DtypePolicy,
+    compact_frame,
+    get_dtype_policy,
+    to_categorical,
+    to_float,
+    to_integer,
+)
+from pystatis.http_helper import Job, load_data, submit_data
 
+logger = logging.getLogger(__name__)
 
-class Table:
+# identifies the parser of cached parsed data, increase when changing the parsed result
+FRAME_VARIANT = "table-2"
+TABLE_ENGINES = ["c", "pyarrow"]
+
+# ffcsv columns identifying a value, e.g. "Zeit_Code", "1_Merkmal_Label" or "2_variable_attribute_code"
+KEY_COLUMN = re.compile(
+    r"(statistik|statistics|zeit|time)(_code|_label)?"
+    r"|\d+_(merkmal|auspraegung|variable|variable_attribute)_(code|label)",
+    re.IGNORECASE,
+)
+
+
+class Table(DataObject):
     """A wrapper class holding all relevant data and metadata about a given table.
 
     Args:
         name (str): The unique identifier of this table.
         raw_data (str): The raw tablefile data as returned by the /data/table endpoint.
-        data (pd.DataFrame): The parsed data as a pandas data frame.
-        metadata (dict): Metadata as returned by the /metadata/table endpoint.
+        data (pd.DataFrame): The parsed data as a pandas data frame, downloaded on first access.
+        metadata (dict): Metadata as returned by the /metadata/table endpoint,
+            downloaded on first access.
+        stale (bool): True, if the data is an outdated cached version because the request failed.
+        keep_raw_data (bool, optional): If False, `raw_data` is not kept in memory after parsing,
+            but read from the cache again on access. Defaults to `keep_raw_data`
+            in the `[DATA]` section of the config.ini.
     """
 
-    def __init__(self, name: str):
-        self.name: str = name
-        self.raw_data = ""
-        self.data = pd.DataFrame()
-        self.metadata: dict = {}
+    def get_data(
+        self,
+        area: str = "all",
+        wait: bool = True,
+        timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        stream: bool = False,
+        revalidate: Optional[bool] = None,
+        **kwargs,
+    ) -> Optional[Job]:
+        """Downloads raw data from GENESIS-Online.
 
-    def get_data(self, area: str = "all", **kwargs):
-        """Downloads raw data and metadata from GENESIS-Online.
+        Metadata is downloaded separately on first access of `metadata`, see `get_metadata()`.
 
         Additional keyword arguments are passed on to the GENESIS-Online GET request for tablefile.
 
+        If the data is too big to be downloaded directly, GENESIS-Online prepares it in a background job.
+        With `wait=False` this method returns immediately with a handle for this job instead of blocking
+        until the job is finished. The data of this object is set as soon as the job handle is done.
+
+        With `stream=True` the data is written to the cache chunk by chunk and parsed from there,
+        so it is never held in memory as a whole and `raw_data` is not set.
+
+        Args:
+            area (str, optional): Area to search for the object in GENESIS-Online. Defaults to "all".
+            wait (bool, optional): If False, do not wait for background jobs and return a job handle.
+                Defaults to True.
+            timeout (float, optional): Maximum time in seconds to wait for a background job.
+                Defaults to `timeout` in the `[JOBS]` section of the config.ini.
+            poll_interval (float, optional): Time in seconds between two polls of a background job.
+                Defaults to `poll_interval` in the `[JOBS]` section of the config.ini.
+            stream (bool, optional): If True, stream the data to the cache and parse it from there.
+                Defaults to False.
+            revalidate (bool, optional): If True, cached data is only used if the object was not
+                updated in GENESIS-Online since it was cached. Defaults to `revalidate`
+                in the `[DATA]` section of the config.ini.
+
+        Raises:
+            JobTimeoutError: If `wait` is True and the background job is not finished in time.
+
+        Returns:
+            Job, optional: The job handle providing the raw data if `wait` is False, otherwise None.
+        """
+        params = self._build_params(area, **kwargs)
+
+        job = submit_data(
+            endpoint="data",
+            method="tablefile",
+            params=params,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            stream=stream,
+            revalidate=revalidate,
+            keep_in_memory=self._keep_raw_data(),
+        )
+        self._params = params
+
+        if not wait:
+            self._pending_job = job
+            job.add_done_callback(self._set_data_from_job)
+            return job
+
+        job.wait()
+        self._set_data_from_job(job)
+        return None
+
+    def get_metadata(self, area: str = "all", **kwargs) -> dict:
+        """Downloads metadata from GENESIS-Online without the data.
+
+        Metadata is cached for the time given by `metadata` in the `[TTL]` section of the config.ini.
+
+        Args:
+            area (str, optional): Area to search for the object in GENESIS-Online. Defaults to "all".
+
+        Returns:
+            dict: Metadata as returned by the /metadata/table endpoint.
+        """
+        params = self._build_params(area, **kwargs)
+        self._params = params
+        self._load_metadata(params)
+
+        return self.metadata
+
+    async def get_data_async(self, area: str = "all", **kwargs):
+        """Downloads raw data and metadata from GENESIS-Online without blocking the event loop.
+
+        Asynchronous version of `get_data()`, data and metadata are requested concurrently.
+        Like `get_data()`, cached parsed data is used if available and `stale` is set.
+
         Args:
             area (str, optional): Area to search for the object in GENESIS-Online. Defaults to "all".
         """
+        params = self._build_params(area, **kwargs)
+        self._params = params
+
+        job, metadata = await asyncio.gather(
+            aio.submit_data(
+                endpoint="data",
+                method="tablefile",
+                params=params.copy(),
+                keep_in_memory=self._keep_raw_data(),
+            ),
+            aio.load_data(
+                endpoint="metadata",
+                method="table",
+                params=params.copy(),
+                as_json=True,
+            ),
+        )
+        self._set_metadata(metadata)
+        # reading and parsing the data must not block the event loop
+        await asyncio.to_thread(self._set_data_from_job, job)
+
+    def _build_params(self, area: str, **kwargs) -> dict:
         params = {"name": self.name, "area": area, "format": "ffcsv"}
 
         params |= kwargs
 
-        raw_data = load_data(
-            endpoint="data", method="tablefile", params=params, as_json=False
-        )
-        assert isinstance(raw_data, str)  # nosec assert_used
-        self.raw_data = raw_data
-        data_str = StringIO(raw_data)
-        self.data = pd.read_csv(data_str, sep=";")
+        return params
+
+    def _set_data_from_job(self, job: Job) -> None:
+        self._pending_job = None
+        self.stale = job.stale
 
+        policy = get_dtype_policy()
+        variant = f"{FRAME_VARIANT}-{policy.tag}"
+
+        frames = job.read_frames(variant)
+        if frames is not None:
+            if not job.stream:
+                # the raw data is only read on access, see `raw_data`
+                self._set_raw_data_from_job(job, lazy=True)
+            self.data = frames["data"]
+            return
+
+        if job.stream:
+            with job.open() as file:
+                self._set_data(file, policy)
+        else:
+            self._set_data(job.result(), policy)
+            self._set_raw_data_from_job(job)
+
+        job.cache_frames({"data": self._data}, variant)
+
+    def _set_data(
+        self,
+        raw_data: Union[str, TextIO],
+        policy: Optional[DtypePolicy] = None,
+    ) -> None:
+        if isinstance(raw_data, str):
+            self.raw_data = raw_data
+
+        engine = load_config().get("DATA", "table_engine", fallback="c")
+        self.data = parse_table(raw_data, engine=engine.lower(), policy=policy)
+
+    def _load_metadata(self, params: dict) -> None:
         metadata = load_data(
             endpoint="metadata", method="table", params=params, as_json=True
         )
-        assert isinstance(metadata, dict)  # nosec assert_used
-        self.metadata = metadata
+        self._set_metadata(metadata)
+
+
+class TableSchema(NamedTuple):
+    """The column types of a tablefile in ffcsv format.
+
+    Attributes:
+        key_columns (List[str]): The codes and labels of the statistic, the time and the variables.
+        value_columns (List[str]): The values, named `<code>__<label>__<unit>`.
+        decimal (str): The decimal separator of the values.
+    """
+
+    key_columns: List[str]
+    value_columns: List[str]
+    decimal: str
+
+
+def build_table_schema(header: List[str]) -> TableSchema:
+    """Build the column types of a tablefile from its header.
+
+    The key and value columns are identified by the naming conventions of the ffcsv format.
+    Values use a decimal comma if the table was requested in German, which is given by
+    the language of the header, e.g. "Statistik_Code" instead of "statistics_code".
+
+    Args:
+        header (List[str]): The column names of the tablefile.
+
+    Returns:
+        TableSchema: The column types.
+    """
+    language = "de" if header and header[0] == "Statistik_Code" else "en"
+
+    return TableSchema(
+        key_columns=[name for name in header if KEY_COLUMN.fullmatch(name)],
+        value_columns=[
+            name
+            for name in header
+            if "__" in name and not name.lower().endswith("__q")
+        ],
+        decimal="," if language == "de" else ".",
+    )
+
+
+def parse_table(
+    data: Union[str, TextIO],
+    engine: str = "c",
+    policy: Optional[DtypePolicy] = None,
+) -> pd.DataFrame:
+    """Parse a tablefile in ffcsv format with explicit column types.
+
+    Keys are read as strings, so codes keep their leading zeros, and values as numbers,
+    where GENESIS special values like "." or "-" become missing values, see `build_table_schema()`.
+    If a value column holds anything else, the values are converted column by column
+    and columns that are not numeric are kept as strings.
+
+    Args:
+        data (Union[str, TextIO]): The content of a tablefile as returned by GENESIS,
+            either as string or as text stream.
+        engine (str, optional): Either "c" to read the data with the C parser of pandas
+            or "pyarrow" to read it with the multithreaded CSV reader of pyarrow,
+            which is faster for large tables but needs the whole text in memory. Defaults to "c".
+        policy (DtypePolicy, optional): The dtype policy. Defaults to `dtypes` and `downcast`
+            in the `[DATA]` section of the config.ini.
+
+    Returns:
+        pd.DataFrame: The parsed data.
+    """
+    if engine not in TABLE_ENGINES:
+        raise ValueError(
+            f"Unknown engine {engine!r}, must be one of {TABLE_ENGINES}."
+        )
+
+    if policy is None:
+        policy = get_dtype_policy()
+
+    stream = StringIO(data) if isinstance(data, str) else data
+    header_line = stream.readline().rstrip("\r\n")
+    if not header_line:
+        return pd.DataFrame()
+
+    header = next(csv.reader([header_line], delimiter=";"))
+    schema = build_table_schema(header)
+    read_table = _read_table_c if engine == "c" else _read_table_pyarrow
+
+    start = stream.tell()
+    try:
+        frame = read_table(
+            stream, header, schema, typed=True, categorical=policy.compact
+        )
+    except ValueError as e:
+        if not stream.seekable():
+            raise
+
+        logger.warning(
+            "Values of the table are not numeric, converting them column by column. "
+            "Reason: %s",
+            e,
+        )
+        stream.seek(start)
+        frame = read_table(
+            stream, header, schema, typed=False, categorical=policy.compact
+        )
+
+    _convert_values(frame, schema, policy)
+    to_categorical(frame, schema.key_columns, policy)
+    compact_frame(
+        frame,
+        policy,
+        columns=[
+            name
+            for name in header
+            if name not in schema.key_columns
+            and name not in schema.value_columns
+        ],
+    )
+
+    return frame
+
+
+def _read_table_c(
+    stream: TextIO,
+    header: List[str],
+    schema: TableSchema,
+    typed: bool,
+    categorical: bool = False,
+) -> pd.DataFrame:
+    """Read the rows of a tablefile with the C parser of pandas."""
+    dtype = {
+        name: "category" if categorical else str for name in schema.key_columns
+    }
+    na_values = {name: [""] for name in header}
+    for name in schema.value_columns:
+        dtype[name] = np.float64 if typed else str
+        na_values[name] = NA_VALUES if typed else [""]
+
+    return pd.read_csv(
+        stream,
+        sep=";",
+        header=None,
+        names=header,
+        dtype=dtype,
+        na_values=na_values,
+        keep_default_na=False,
+        decimal=schema.decimal,
+        engine="c",
+    )
+
+
+def _read_table_pyarrow(
+    stream: TextIO,
+    header: List[str],
+    schema: TableSchema,
+    typed: bool,
+    categorical: bool = False,
+) -> pd.DataFrame:
+    """Read the rows of a tablefile with the CSV reader of pyarrow."""
+    # pylint: disable=import-outside-toplevel
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+
+    column_types = {name: pa.string() for name in schema.key_columns}
+    for name in schema.value_columns:
+        column_types[name] = pa.float64() if typed else pa.string()
+
+    table = pa_csv.read_csv(
+        pa.py_buffer(stream.read().encode("utf-8")),
+        read_options=pa_csv.ReadOptions(column_names=header),
+        parse_options=pa_csv.ParseOptions(delimiter=";"),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            null_values=NA_VALUES,
+            strings_can_be_null=False,
+            decimal_point=schema.decimal,
+        ),
+    )
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_string(column.type):
+            # like the C parser, only empty strings are missing values in string columns
+            column = pc.if_else(
+                pc.equal(column, ""), pa.scalar(None, column.type), column
+            )
+            if categorical and name in schema.key_columns:
+                # avoids creating a Python string per row
+                column = column.dictionary_encode()
+        columns.append(column)
+
+    return pa.table(columns, names=table.column_names).to_pandas()
+
+
+def _convert_values(
+    frame: pd.DataFrame, schema: TableSchema, policy: DtypePolicy
+) -> None:
+    """Convert the value columns in place to integers or floats as given by the dtype policy."""
+    for name in schema.value_columns:
+        values = frame[name]
+
+        if pd.api.types.is_object_dtype(values.dtype):
+            try:
+                values = to_float(
+                    values.str.replace(schema.decimal, ".", regex=False),
+                    DtypePolicy(),
+                )
+            except ValueError:
+                logger.warning(
+                    "Column %s of the table is not numeric, keeping it as text.",
+                    name,
+                )
+                continue
+
+        # the metadata does not tell integers from floats, so check the values
+        if np.array_equal(values.dropna(), np.round(values.dropna())):
+            frame[name] = to_integer(values, policy)
+        else:
+            frame[name] = to_float(values, policy)
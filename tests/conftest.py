@@ -0,0 +1,77 @@
+"""Fixtures and helpers shared by the tests."""
+import json
+from configparser import ConfigParser
+
+import pytest
+import requests
+
+
+@pytest.fixture()
+def config(tmp_path, mocker):
+    """A config with the cache in a temporary directory.
+
+    It is returned by `load_config()` of `pystatis.http_helper`, which also provides
+    the cache directory to tables, cubes and `pystatis.aio`.
+    """
+    config = ConfigParser()
+    config["DATA"] = {"cache_dir": str(tmp_path)}
+    mocker.patch("pystatis.http_helper.load_config", return_value=config)
+    return config
+
+
+def _generic_request_status(
+    status_response: bool = True,
+    status_code: int = 200,
+    code: int = 0,
+    status_type: str = "Information",
+    status_content: str = "Erfolg/ Success/ Some Issue",
+) -> requests.Response:
+    """
+    Helper method which allows to create a generic request.Response that covers all Destatis answers
+
+    Returns:
+        requests.Response: the response from Destatis
+    """
+    # define possible status dict and texts
+    status_dict = {
+        "Ident": {
+            "Service": "A DESTATIS service",
+            "Method": "A DESTATIS method",
+        },
+        "Status": {
+            "Code": code,
+            "Content": status_content,
+            "Type": status_type,
+        },
+    }
+
+    response_text = "Some text for a successful response without status..."
+
+    # set up generic requests.Response
+    request_status = requests.Response()
+    request_status.status_code = status_code  # success
+
+    # Define UTF-8 encoding as requests guesses otherwise
+    if status_response:
+        request_status._content = json.dumps(status_dict).encode("UTF-8")
+    else:
+        request_status._content = response_text.encode("UTF-8")
+
+    return request_status
+
+
+def _jobs_response(state: str, *codes: str) -> requests.Response:
+    jobs = [{"Code": code, "State": state} for code in codes or [""]]
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(
+        {"Status": {"Code": 0}, "List": jobs}
+    ).encode("UTF-8")
+    return response
+
+
+def _text_response(text: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = text.encode("UTF-8")
+    return response
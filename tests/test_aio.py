@@ -0,0 +1,219 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pystatis import aio
+from pystatis.cube import Cube
+from pystatis.http_helper import Job
+from pystatis.table import Table
+from tests.conftest import (
+    _generic_request_status,
+    _jobs_response,
+    _text_response,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_max_concurrency():
+    yield
+    aio.set_max_concurrency(None)
+
+
+def test_load_data_is_cached(mocker, config):
+    response = _generic_request_status(status_response=False)
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint", return_value=response
+    )
+    params = {"name": "12345-0001", "area": "all"}
+
+    first = asyncio.run(aio.load_data("data", "tablefile", params))
+    second = asyncio.run(aio.load_data("data", "tablefile", params))
+
+    assert first == second == response.text
+    get_data.assert_called_once()
+
+
+def test_submit_data_does_not_read_data(mocker, config):
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_generic_request_status(status_response=False),
+    )
+    params = {"name": "12345-0001", "area": "all"}
+    asyncio.run(aio.load_data("data", "tablefile", params))
+    read = mocker.patch("pystatis.http_helper.read_from_cache")
+
+    job = asyncio.run(aio.submit_data("data", "tablefile", params))
+
+    assert job.done()
+    read.assert_not_called()
+
+
+def test_load_data_as_json(mocker, config):
+    mocker.patch("pystatis.aio.load_config", return_value=config)
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_generic_request_status(),
+    )
+
+    data = asyncio.run(
+        aio.load_data("metadata", "table", {"name": "1"}, as_json=True)
+    )
+
+    assert data == _generic_request_status().json()
+
+
+def test_max_concurrency(mocker):
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def fake_get_data_from_endpoint(endpoint, method, params):
+        nonlocal active, max_active
+        with lock:
+            active += 1
+            max_active = max(max_active, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return _generic_request_status()
+
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=fake_get_data_from_endpoint,
+    )
+    aio.set_max_concurrency(2)
+
+    async def main():
+        await asyncio.gather(
+            *[aio.get_data_from_endpoint("find", "find", {}) for _ in range(6)]
+        )
+
+    asyncio.run(main())
+
+    assert max_active == 2
+
+
+def test_max_concurrency_bounds_job_polls(mocker):
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def fake_get_data_from_endpoint(endpoint, method, params, **kwargs):
+        nonlocal active, max_active
+        with lock:
+            active += 1
+            max_active = max(max_active, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        if endpoint == "catalogue":
+            return _jobs_response("Fertig")
+        return _text_response("result")
+
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=fake_get_data_from_endpoint,
+    )
+    aio.set_max_concurrency(2)
+
+    async def main():
+        return await asyncio.gather(
+            *[
+                aio.get_data_from_resultfile(
+                    f"12345-000{i}_12345678{i}", timeout=1, poll_interval=0
+                )
+                for i in range(6)
+            ]
+        )
+
+    assert asyncio.run(main()) == ["result"] * 6
+    assert max_active == 2
+
+
+def test_set_max_concurrency_invalid():
+    with pytest.raises(ValueError):
+        aio.set_max_concurrency(0)
+
+
+def test_table_get_data_async(mocker, config):
+    metadata = {"Status": {"Code": 0}}
+
+    async def fake_submit_data(endpoint, method, params, **kwargs):
+        return Job(
+            name="12345-0001", params=params, data="a;b\n1;2\n", stale=True
+        )
+
+    async def fake_load_data(endpoint, method, params, as_json=False):
+        return metadata
+
+    submit_data = mocker.patch(
+        "pystatis.aio.submit_data", side_effect=fake_submit_data
+    )
+    mocker.patch("pystatis.aio.load_data", side_effect=fake_load_data)
+
+    table = Table("12345-0001")
+    asyncio.run(table.get_data_async())
+
+    assert submit_data.call_args.kwargs["method"] == "tablefile"
+    assert table.raw_data == "a;b\n1;2\n"
+    assert table.data.shape == (1, 2)
+    assert table.metadata == metadata
+    assert table.stale
+
+
+def test_cube_get_data_async(mocker, config):
+    parsed_cube = {"QEI": "parsed"}
+
+    async def fake_submit_data(endpoint, method, params, **kwargs):
+        return Job(name="12345BJ001", params=params, data="raw")
+
+    async def fake_load_data(endpoint, method, params, as_json=False):
+        return {}
+
+    mocker.patch("pystatis.aio.submit_data", side_effect=fake_submit_data)
+    mocker.patch("pystatis.aio.load_data", side_effect=fake_load_data)
+    mocker.patch("pystatis.cube.parse_cube")
+    mocker.patch("pystatis.cube.rename_axes")
+    mocker.patch("pystatis.cube.assign_correct_types", return_value=parsed_cube)
+
+    cube = Cube("12345BJ001")
+    asyncio.run(cube.get_data_async())
+
+    assert cube.raw_data == "raw"
+    assert cube.data == "parsed"
+    assert cube.metadata == {}
+    assert not cube.stale
+
+
+def test_await_job(mocker):
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=[_jobs_response("Fertig"), _text_response("result")],
+    )
+
+    job = Job("12345-0001_123456789", timeout=1, poll_interval=0)
+
+    assert asyncio.run(_await(job)) == "result"
+
+
+async def _await(job):
+    return await job
+
+
+def test_await_cached_job_reads_in_thread(mocker, config):
+    threads = []
+
+    def fake_read_from_cache(cache_dir, name, params, **kwargs):
+        threads.append(threading.current_thread())
+        return "cached"
+
+    mocker.patch(
+        "pystatis.http_helper.read_from_cache", side_effect=fake_read_from_cache
+    )
+
+    job = Job(name="12345-0001", params={}, cached=True)
+
+    assert asyncio.run(_await(job)) == "cached"
+    assert threads and threads[0] is not threading.main_thread()
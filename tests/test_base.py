@@ -0,0 +1,61 @@
+from configparser import ConfigParser
+
+import pandas as pd
+import pytest
+
+from pystatis.base import DataObject
+from pystatis.cube import Cube
+from pystatis.http_helper import Job
+from pystatis.table import Table
+
+
+class _Object(DataObject):
+    def __init__(self, name, keep_raw_data=None):
+        super().__init__(name, keep_raw_data)
+        self.requests = []
+
+    def get_data(self, area="all", **kwargs):
+        self.requests.append({"area": area, **kwargs})
+        self._set_raw_data_from_job(Job(data="raw"))
+        self.data = pd.DataFrame({"a": [1]})
+
+    def _build_params(self, area, **kwargs):
+        return {"name": self.name, "area": area, **kwargs}
+
+    def _load_metadata(self, params):
+        self.metadata = {"params": params}
+
+
+@pytest.mark.parametrize("cls", [Table, Cube])
+def test_data_objects_share_base(cls):
+    assert issubclass(cls, DataObject)
+
+
+def test_data_object_is_abstract():
+    with pytest.raises(TypeError):
+        DataObject("12345-0001")
+
+
+def test_data_is_loaded_with_last_params(config):
+    data_object = _Object("12345-0001", keep_raw_data=False)
+    data_object._params = data_object._build_params("de", startyear="2020")
+
+    assert data_object.data.shape == (1, 1)
+    assert data_object.data.shape == (1, 1)
+    assert data_object.requests == [{"area": "de", "startyear": "2020"}]
+    # data without a name cannot be read from the cache again, so it is kept
+    assert data_object.raw_data == "raw"
+
+
+@pytest.mark.parametrize(
+    "keep_raw_data, config_value, expected",
+    [(None, "false", False), (None, "true", True), (True, "false", True)],
+)
+def test_keep_raw_data(mocker, keep_raw_data, config_value, expected):
+    config = ConfigParser()
+    config["DATA"] = {"keep_raw_data": config_value}
+    mocker.patch("pystatis.base.load_config", return_value=config)
+
+    data_object = _Object("12345-0001", keep_raw_data=keep_raw_data)
+
+    assert data_object._keep_raw_data() is expected
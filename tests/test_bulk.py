@@ -0,0 +1,44 @@
+import pytest
+
+from pystatis import download_many
+from pystatis.cube import Cube
+from pystatis.table import Table
+
+
+def test_download_many(mocker):
+    def fake_get_data(self, area="all", **kwargs):
+        if self.name == "broken":
+            raise ValueError("download failed")
+        self.raw_data = f"{self.name}-{kwargs['startyear']}"
+
+    mocker.patch.object(Table, "get_data", fake_get_data)
+
+    results = {
+        result.name: result
+        for result in download_many(
+            ["11111-0001", "broken", "22222-0001"],
+            max_workers=2,
+            startyear=2020,
+        )
+    }
+
+    assert set(results) == {"11111-0001", "broken", "22222-0001"}
+    assert results["11111-0001"].ok
+    assert results["11111-0001"].obj.raw_data == "11111-0001-2020"
+    assert not results["broken"].ok
+    assert results["broken"].obj is None
+    assert isinstance(results["broken"].error, ValueError)
+
+
+def test_download_many_cubes(mocker):
+    get_data = mocker.patch.object(Cube, "get_data")
+
+    results = list(download_many(["11111BJ001"], kind="cube"))
+
+    assert isinstance(results[0].obj, Cube)
+    get_data.assert_called_once_with(area="all")
+
+
+def test_download_many_unknown_kind():
+    with pytest.raises(ValueError):
+        list(download_many(["11111-0001"], kind="statistic"))
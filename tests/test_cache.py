@@ -1,23 +1,50 @@
+import hashlib
+import json
 import re
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
 
 from pystatis.cache import (
     _build_file_path,
+    build_cache_key,
     cache_data,
+    cache_data_stream,
+    cache_frames,
     clear_cache,
+    get_cached_version,
+    get_registered_job,
     hit_in_cash,
+    migrate_cache,
     normalize_name,
+    open_from_cache,
+    prune_cache,
+    read_frames_from_cache,
     read_from_cache,
+    register_job,
+    unregister_job,
+)
+from pystatis.cache_index import (
+    add_entry,
+    get_key_version,
+    list_entries,
+    set_key_version,
 )
 from pystatis.config import (
     DEFAULT_SETTINGS_FILE,
     _write_config,
+    get_config_path_from_settings,
     init_config,
     load_config,
     load_settings,
 )
+from pystatis.memory_cache import MemoryCache, set_memory_cache
 
 
 @pytest.fixture()
@@ -114,6 +141,102 @@ def test_ignore_jobs_in_params(cache_dir, params):
     assert hit_in_cash(cache_dir, name, params_)
 
 
+def test_build_cache_key():
+    key = build_cache_key(
+        {
+            "name": "12345-0001_123456789",
+            "endyear": 2020,
+            "startyear": "2010 ",
+            "area": "all",
+            "compress": False,
+            "job": True,
+            "password": "secret",
+            "regionalkey": "",
+        }
+    )
+
+    assert key == {"endyear": "2020", "name": "12345-0001", "startyear": "2010"}
+    assert list(key) == sorted(key)
+
+
+def test_canonical_params_share_cache(cache_dir):
+    name = "test-canonical-params"
+    cache_data(
+        cache_dir,
+        name,
+        {"name": name, "startyear": 2010, "endyear": 2020},
+        "test",
+    )
+
+    assert hit_in_cash(
+        cache_dir,
+        name,
+        {"endyear": "2020", "name": name, "startyear": "2010", "area": "all"},
+    )
+
+
+def test_migrate_cache(cache_dir, params):
+    name = "test-migrate-cache"
+    old_params = {"name": name, "area": "all", "startyear": "2010"}
+    old_file_path = cache_dir / name / "oldhash" / "20220101.zip"
+    old_file_path.parent.mkdir(parents=True)
+    with zipfile.ZipFile(old_file_path, "w") as myzip:
+        myzip.writestr("20220101.txt", "migrated")
+    add_entry(cache_dir, name, "oldhash", json.dumps(old_params), old_file_path)
+    set_key_version(cache_dir, 0)
+
+    assert migrate_cache(cache_dir) == 1
+    assert get_key_version(cache_dir) > 0
+    assert not old_file_path.parent.exists()
+    assert read_from_cache(
+        cache_dir, name, {"startyear": 2010, "name": name}
+    ) == ("migrated")
+    assert migrate_cache(cache_dir) == 0
+
+
+def _legacy_hash(params):
+    params_hash = hashlib.blake2s(digest_size=10, usedforsecurity=False)
+    params_hash.update(json.dumps(params).encode("UTF-8"))
+    return params_hash.hexdigest()
+
+
+def test_migrate_legacy_key_on_lookup(cache_dir):
+    name = "test-migrate-legacy"
+    params = {"name": name, "area": "all", "startyear": "2010"}
+    legacy_file_path = cache_dir / name / _legacy_hash(params) / "20220101.zip"
+    legacy_file_path.parent.mkdir(parents=True)
+    with zipfile.ZipFile(legacy_file_path, "w") as myzip:
+        myzip.writestr("20220101.txt", "legacy")
+    # indexed from disk, so the params are unknown to migrate_cache()
+    add_entry(cache_dir, name, _legacy_hash(params), None, legacy_file_path)
+
+    assert hit_in_cash(cache_dir, name, params)
+    assert not legacy_file_path.parent.exists()
+    assert read_from_cache(cache_dir, name, {"startyear": 2010, "name": name})
+    assert [entry.params_hash for entry in list_entries(cache_dir, name)] == [
+        _build_file_path(cache_dir, name, params).name
+    ]
+
+
+def test_migrate_legacy_job_on_lookup(cache_dir):
+    name = "test-migrate-legacy-job"
+    params = {"name": name, "area": "all", "job": "true"}
+    legacy_file_path = (
+        cache_dir
+        / ".jobs"
+        / name
+        / f"{_legacy_hash({'name': name, 'area': 'all'})}.json"
+    )
+    legacy_file_path.parent.mkdir(parents=True)
+    legacy_file_path.write_text(
+        json.dumps({"job_id": "12345-0001_123456789"}), encoding="utf-8"
+    )
+
+    assert get_registered_job(cache_dir, name, params) == "12345-0001_123456789"
+    assert not legacy_file_path.exists()
+    assert get_registered_job(cache_dir, name, params) == "12345-0001_123456789"
+
+
 def test_clean_cache(cache_dir, params):
     name = "test-clean-cache"
     cache_data(cache_dir, name, params, "test")
@@ -126,3 +249,369 @@ def test_clean_cache(cache_dir, params):
     clear_cache(name=name)
 
     assert not cached_data_file.exists() and not cached_data_file.is_file()
+
+
+def test_register_job(cache_dir, params):
+    name = "test-register-job"
+    assert get_registered_job(cache_dir, name, params) is None
+
+    register_job(cache_dir, name, params, "12345-0001_123456789")
+
+    params_ = params.copy()
+    params_.update({"job": "true"})
+    assert (
+        get_registered_job(cache_dir, name, params_) == "12345-0001_123456789"
+    )
+    # the job registry must not be mistaken for cached data
+    assert not hit_in_cash(cache_dir, name, params)
+
+    unregister_job(cache_dir, name, params)
+    assert get_registered_job(cache_dir, name, params) is None
+
+
+def test_clean_cache_removes_registered_jobs(cache_dir, params):
+    name = "test-clean-cache-jobs"
+    register_job(cache_dir, name, params, "12345-0001_123456789")
+
+    clear_cache(name=name)
+
+    assert get_registered_job(cache_dir, name, params) is None
+
+
+def test_cache_data_stream(cache_dir, params):
+    name = "test-cache-data-stream"
+    chunks = ["äöü;1\n".encode(), "x;2\n".encode()]
+
+    cache_data_stream(cache_dir, name, params, iter(chunks))
+
+    data_dir = _build_file_path(cache_dir, name, params)
+    assert len(list(data_dir.glob("*.zip"))) == 1
+    assert not list(data_dir.parent.glob("*.part"))
+    assert read_from_cache(cache_dir, name, params) == "äöü;1\nx;2\n"
+
+    with open_from_cache(cache_dir, name, params) as file:
+        assert file.readlines() == ["äöü;1\n", "x;2\n"]
+
+
+def test_cache_data_stream_interrupted(cache_dir, params):
+    name = "test-cache-data-stream-interrupted"
+
+    def chunks():
+        yield b"first chunk"
+        raise ConnectionError("connection lost")
+
+    with pytest.raises(ConnectionError):
+        cache_data_stream(cache_dir, name, params, chunks())
+
+    data_dir = _build_file_path(cache_dir, name, params)
+    assert not hit_in_cash(cache_dir, name, params)
+    assert not list(data_dir.parent.glob("*.part"))
+
+
+def test_cache_data_stream_concurrent_writers(cache_dir, params):
+    name = "test-cache-data-stream-concurrent"
+
+    def chunks(i):
+        yield f"{i}".encode()
+        # keep the writers busy, so they overlap
+        time.sleep(0.01)
+        yield b"\n"
+
+    def write(i):
+        for _ in range(5):
+            cache_data_stream(cache_dir, name, params, chunks(i))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        # raises the first exception of any writer
+        list(executor.map(write, range(4)))
+
+    data_dir = _build_file_path(cache_dir, name, params)
+    assert read_from_cache(cache_dir, name, params) in {
+        "0\n",
+        "1\n",
+        "2\n",
+        "3\n",
+    }
+    assert not list(data_dir.parent.glob("*.part"))
+
+
+@pytest.mark.parametrize(
+    "compression, compresslevel, expected_type",
+    [
+        ("deflate", "1", zipfile.ZIP_DEFLATED),
+        ("bzip2", "9", zipfile.ZIP_BZIP2),
+        ("lzma", "9", zipfile.ZIP_LZMA),
+        ("stored", "9", zipfile.ZIP_STORED),
+    ],
+)
+def test_cache_data_compression(
+    cache_dir, params, compression, compresslevel, expected_type
+):
+    config = load_config()
+    config["DATA"]["compression"] = compression
+    config["DATA"]["compresslevel"] = compresslevel
+    _write_config(config, get_config_path_from_settings())
+
+    name = f"test-cache-data-{compression}"
+    cache_data(cache_dir, name, params, "test compression")
+
+    data_dir = _build_file_path(cache_dir, name, params)
+    with zipfile.ZipFile(list(data_dir.glob("*.zip"))[0]) as myzip:
+        assert myzip.infolist()[0].compress_type == expected_type
+
+    assert read_from_cache(cache_dir, name, params) == "test compression"
+
+
+def test_cache_data_unknown_compression(cache_dir, params):
+    config = load_config()
+    config["DATA"]["compression"] = "zstd"
+    _write_config(config, get_config_path_from_settings())
+
+    with pytest.raises(ValueError):
+        cache_data(cache_dir, "test-unknown-compression", params, "test")
+
+
+def test_read_from_cache_uses_memory_cache(cache_dir, params, mocker):
+    set_memory_cache(MemoryCache())
+    try:
+        cache_data(cache_dir, "test-memory-cache", params, "memory")
+        zip_open = mocker.spy(zipfile, "ZipFile")
+
+        assert (
+            read_from_cache(cache_dir, "test-memory-cache", params) == "memory"
+        )
+        assert open_from_cache(
+            cache_dir, "test-memory-cache", params
+        ).read() == ("memory")
+        assert zip_open.call_count == 0
+
+        clear_cache("test-memory-cache")
+
+        assert not hit_in_cash(cache_dir, "test-memory-cache", params)
+    finally:
+        set_memory_cache(None)
+
+
+def test_cache_data_without_memory_cache(cache_dir, params):
+    memory_cache = MemoryCache()
+    set_memory_cache(memory_cache)
+    try:
+        cache_data(
+            cache_dir, "test-no-memory", params, "data", keep_in_memory=False
+        )
+        data_dir = _build_file_path(cache_dir, "test-no-memory", params)
+
+        assert data_dir not in memory_cache
+        assert (
+            read_from_cache(
+                cache_dir, "test-no-memory", params, keep_in_memory=False
+            )
+            == "data"
+        )
+        assert data_dir not in memory_cache
+    finally:
+        set_memory_cache(None)
+
+
+def test_read_from_cache_version(cache_dir, params, mocker):
+    mocked_date = mocker.patch("pystatis.cache.date")
+    mocked_date.today.return_value = date(2022, 1, 1)
+    cache_data(cache_dir, "test-version", params, "old")
+    version = get_cached_version(cache_dir, "test-version", params)
+    mocked_date.today.return_value = date(2022, 1, 2)
+    cache_data(cache_dir, "test-version", params, "new")
+
+    assert version == "20220101"
+    assert get_cached_version(cache_dir, "test-version", params) == "20220102"
+    assert read_from_cache(cache_dir, "test-version", params) == "new"
+    assert (
+        read_from_cache(cache_dir, "test-version", params, version=version)
+        == "old"
+    )
+
+    with pytest.raises(FileNotFoundError):
+        read_from_cache(cache_dir, "test-version", params, version="20210101")
+
+
+def _cache_version(mocker, cache_dir, name, params, version, created=None):
+    mocked_date = mocker.patch("pystatis.cache.date")
+    mocked_date.today.return_value = version
+    if created is not None:
+        mocker.patch("pystatis.cache_index.time.time", return_value=created)
+
+    cache_data(cache_dir, name, params, "x" * 1000)
+    mocker.stopall()
+
+
+def test_prune_cache_keep_versions(cache_dir, params, mocker):
+    for day in range(1, 4):
+        _cache_version(
+            mocker, cache_dir, "test-prune", params, date(2022, 1, day)
+        )
+
+    assert len(list_entries(cache_dir, "test-prune")) == 3
+
+    evicted = prune_cache(keep_versions=1)
+
+    assert [entry.version for entry in evicted] == ["20220102", "20220101"]
+    data_dir = _build_file_path(cache_dir, "test-prune", params)
+    assert [path.name for path in data_dir.glob("*.zip")] == ["20220103.zip"]
+    assert len(list_entries(cache_dir, "test-prune")) == 1
+
+
+def test_prune_cache_max_age(cache_dir, params, mocker):
+    old = time.time() - 10 * 24 * 60 * 60
+    _cache_version(
+        mocker, cache_dir, "test-prune-old", params, date(2022, 1, 1), old
+    )
+    _cache_version(
+        mocker, cache_dir, "test-prune-new", params, date(2022, 1, 1)
+    )
+
+    evicted = prune_cache(max_age_days=5)
+
+    assert [entry.name for entry in evicted] == ["test-prune-old"]
+    assert not (cache_dir / "test-prune-old").exists()
+    assert hit_in_cash(cache_dir, "test-prune-new", params)
+
+
+def test_prune_cache_max_bytes_lru(cache_dir, params, mocker):
+    for i, name in enumerate(["test-lru-a", "test-lru-b", "test-lru-c"]):
+        _cache_version(
+            mocker, cache_dir, name, params, date(2022, 1, 1), 1000.0 + i
+        )
+
+    # reading updates the time of the last access
+    mocker.patch("pystatis.cache_index.time.time", return_value=2000.0)
+    set_memory_cache(MemoryCache(max_entries=0))
+    try:
+        read_from_cache(cache_dir, "test-lru-a", params)
+    finally:
+        set_memory_cache(None)
+    mocker.stopall()
+
+    size = list_entries(cache_dir, "test-lru-a")[0].size
+    evicted = prune_cache(max_bytes=2 * size)
+
+    assert [entry.name for entry in evicted] == ["test-lru-b"]
+
+
+def test_auto_prune_after_write(cache_dir, params, mocker):
+    config = load_config()
+    config["DATA"]["keep_versions"] = "1"
+    mocker.patch("pystatis.cache.load_config", return_value=config)
+
+    for day in range(1, 3):
+        mocked_date = mocker.patch("pystatis.cache.date")
+        mocked_date.today.return_value = date(2022, 1, day)
+        cache_data(cache_dir, "test-auto-prune", params, "data")
+
+    entries = list_entries(cache_dir, "test-auto-prune")
+
+    assert [entry.version for entry in entries] == ["20220102"]
+
+
+def test_auto_prune_keeps_new_entry(cache_dir, params, mocker):
+    config = load_config()
+    config["DATA"]["max_cache_bytes"] = "1"
+    mocker.patch("pystatis.cache.load_config", return_value=config)
+
+    cache_data(cache_dir, "test-auto-prune-a", params, "data")
+    cache_data(cache_dir, "test-auto-prune-b", params, "data")
+
+    assert not hit_in_cash(cache_dir, "test-auto-prune-a", params)
+    assert hit_in_cash(cache_dir, "test-auto-prune-b", params)
+
+
+@pytest.mark.parametrize("frame_cache", ["parquet", "feather", "arrow"])
+def test_cache_frames(cache_dir, params, mocker, frame_cache):
+    pytest.importorskip("pyarrow")
+    config = load_config()
+    config["DATA"]["frame_cache"] = frame_cache
+    mocker.patch("pystatis.cache.load_config", return_value=config)
+    name = "test-cache-frames"
+    frames = {
+        "QEI": pd.DataFrame(
+            {
+                "a": ["x", "y"],
+                "b": [1.5, 2.0],
+                "c": pd.Series(["x", "x"], dtype="category"),
+                "d": pd.Series([1, 2], dtype="Int32"),
+            }
+        ),
+        "DQ": pd.DataFrame({"c": [1]}),
+    }
+
+    assert read_frames_from_cache(cache_dir, name, params, "test-1") is None
+
+    cache_data(cache_dir, name, params, "raw")
+    cache_frames(cache_dir, name, params, frames, "test-1")
+    cached_frames = read_frames_from_cache(cache_dir, name, params, "test-1")
+
+    assert list(cached_frames) == ["QEI", "DQ"]
+    pd.testing.assert_frame_equal(cached_frames["QEI"], frames["QEI"])
+    assert read_frames_from_cache(cache_dir, name, params, "test-2") is None
+
+    # a new version of the raw data invalidates the parsed data
+    cache_data(cache_dir, name, params, "new raw")
+    assert read_frames_from_cache(cache_dir, name, params, "test-1") is None
+
+
+def test_cache_frames_disabled(cache_dir, params, mocker):
+    config = load_config()
+    config["DATA"]["frame_cache"] = "none"
+    mocker.patch("pystatis.cache.load_config", return_value=config)
+    name = "test-cache-frames-disabled"
+
+    cache_data(cache_dir, name, params, "raw")
+    cache_frames(cache_dir, name, params, {"data": pd.DataFrame()}, "test-1")
+
+    assert read_frames_from_cache(cache_dir, name, params, "test-1") is None
+    data_dir = _build_file_path(cache_dir, name, params)
+    assert [path.suffix for path in data_dir.iterdir()] == [".zip"]
+
+
+def test_cache_frames_arrow_memory_map(cache_dir, params, mocker):
+    pa = pytest.importorskip("pyarrow")
+    config = load_config()
+    config["DATA"]["frame_cache"] = "arrow"
+    mocker.patch("pystatis.cache.load_config", return_value=config)
+    name = "test-cache-frames-arrow"
+    frame = pd.DataFrame(
+        {"value": np.arange(100_000, dtype="float64"), "code": "DG"}
+    )
+
+    cache_data(cache_dir, name, params, "raw")
+    cache_frames(cache_dir, name, params, {"QEI": frame}, "test-1")
+
+    allocated = pa.total_allocated_bytes()
+    cached_frame = read_frames_from_cache(cache_dir, name, params, "test-1")[
+        "QEI"
+    ]
+
+    pd.testing.assert_frame_equal(cached_frame, frame)
+    # numeric columns are read-only views into the memory mapped file
+    assert not cached_frame["value"].to_numpy().flags.writeable
+    assert pa.total_allocated_bytes() - allocated < frame["value"].nbytes
+
+
+def test_prune_cache_counts_frames(cache_dir, params, mocker):
+    pytest.importorskip("pyarrow")
+    config = load_config()
+    config["DATA"]["frame_cache"] = "arrow"
+    config["DATA"]["auto_prune"] = "false"
+    mocker.patch("pystatis.cache.load_config", return_value=config)
+    frame = pd.DataFrame({"value": np.arange(10_000, dtype="float64")})
+
+    for name in ["test-prune-frames-old", "test-prune-frames-new"]:
+        cache_data(cache_dir, name, params, "raw")
+        cache_frames(cache_dir, name, params, {"QEI": frame}, "test-1")
+
+    old, new = sorted(list_entries(cache_dir), key=lambda entry: entry.name)
+    assert new.frames_size > frame["value"].nbytes
+
+    evicted = prune_cache(max_bytes=new.size + new.frames_size)
+
+    assert [entry.name for entry in evicted] == ["test-prune-frames-old"]
+    assert not hit_in_cash(cache_dir, "test-prune-frames-old", params)
+    assert hit_in_cash(cache_dir, "test-prune-frames-new", params)
@@ -0,0 +1,155 @@
+import sqlite3
+import zipfile
+from contextlib import closing
+
+from pystatis import cache_index
+from pystatis.cache_index import (
+    INDEX_FILE,
+    add_entry,
+    get_latest_entry,
+    list_entries,
+    remove_entries,
+    update_frames_size,
+)
+
+
+def _write_archive(cache_dir, name, params_hash, version, data="test"):
+    file_path = cache_dir / name / params_hash / f"{version}.zip"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(
+        file_path, "w", compression=zipfile.ZIP_DEFLATED
+    ) as myzip:
+        myzip.writestr(f"{version}.txt", data)
+    return file_path
+
+
+def test_add_and_get_latest_entry(tmp_path):
+    older = _write_archive(tmp_path, "name", "hash", "20220101")
+    newer = _write_archive(tmp_path, "name", "hash", "20230101")
+
+    add_entry(tmp_path, "name", "hash", '{"area": "all"}', newer)
+    add_entry(tmp_path, "name", "hash", '{"area": "all"}', older)
+
+    entry = get_latest_entry(tmp_path, "name", "hash")
+
+    assert entry.version == "20230101"
+    assert entry.path == "name/hash/20230101.zip"
+    assert entry.params == '{"area": "all"}'
+    assert entry.size == newer.stat().st_size
+    assert entry.codec == "deflate"
+    assert get_latest_entry(tmp_path, "name", "other-hash") is None
+
+
+def test_get_latest_entry_touch(tmp_path):
+    file_path = _write_archive(tmp_path, "name", "hash", "20220101")
+    entry = add_entry(tmp_path, "name", "hash", None, file_path)
+
+    touched = get_latest_entry(tmp_path, "name", "hash", touch=True)
+
+    assert touched.last_access >= entry.last_access
+    assert get_latest_entry(tmp_path, "name", "hash") == touched
+
+
+def test_missing_file_is_removed_from_index(tmp_path):
+    file_path = _write_archive(tmp_path, "name", "hash", "20220101")
+    add_entry(tmp_path, "name", "hash", None, file_path)
+
+    file_path.unlink()
+
+    assert get_latest_entry(tmp_path, "name", "hash") is None
+    assert list_entries(tmp_path) == []
+
+
+def test_missing_file_falls_back_to_older_version(tmp_path):
+    older = _write_archive(tmp_path, "name", "hash", "20220101")
+    newer = _write_archive(tmp_path, "name", "hash", "20230101")
+    add_entry(tmp_path, "name", "hash", None, older)
+    add_entry(tmp_path, "name", "hash", None, newer)
+
+    newer.unlink()
+
+    assert get_latest_entry(tmp_path, "name", "hash").version == "20220101"
+    assert [entry.version for entry in list_entries(tmp_path)] == ["20220101"]
+
+
+def test_existing_entries_are_indexed(tmp_path):
+    _write_archive(tmp_path, "first", "hash", "20220101")
+    _write_archive(tmp_path, "second", "hash", "20220101")
+    (tmp_path / ".jobs" / "first").mkdir(parents=True)
+    (tmp_path / "first" / "hash.part").write_text("partial")
+
+    assert not (tmp_path / INDEX_FILE).exists()
+
+    entries = list_entries(tmp_path)
+
+    assert [entry.name for entry in entries] == ["first", "second"]
+    assert all(entry.params is None for entry in entries)
+
+
+def test_remove_entries(tmp_path):
+    for name in ["first", "second"]:
+        file_path = _write_archive(tmp_path, name, "hash", "20220101")
+        add_entry(tmp_path, name, "hash", None, file_path)
+
+    remove_entries(tmp_path, "first")
+    assert [entry.name for entry in list_entries(tmp_path)] == ["second"]
+
+    remove_entries(tmp_path)
+    assert list_entries(tmp_path) == []
+
+
+def test_update_frames_size(tmp_path):
+    file_path = _write_archive(tmp_path, "name", "hash", "20220101")
+    add_entry(tmp_path, "name", "hash", None, file_path)
+    frames_dir = file_path.parent / "20220101-test-1"
+    frames_dir.mkdir()
+    (frames_dir / "000_data.arrow").write_bytes(b"x" * 100)
+    (file_path.parent / "20220101-test-1.abc.part").mkdir()
+    (
+        file_path.parent / "20220101-test-1.abc.part" / "000_data.arrow"
+    ).write_bytes(b"x" * 50)
+
+    update_frames_size(tmp_path, file_path)
+
+    assert get_latest_entry(tmp_path, "name", "hash").frames_size == 100
+
+
+def test_index_without_frames_size_is_migrated(tmp_path):
+    file_path = _write_archive(tmp_path, "name", "hash", "20220101")
+    with closing(sqlite3.connect(tmp_path / INDEX_FILE)) as conn, conn:
+        conn.execute(
+            "CREATE TABLE entries (name TEXT NOT NULL, params_hash TEXT NOT NULL, "
+            "params TEXT, version TEXT NOT NULL, path TEXT NOT NULL, "
+            "size INTEGER NOT NULL, codec TEXT NOT NULL, created REAL NOT NULL, "
+            "last_access REAL NOT NULL, PRIMARY KEY (name, params_hash, version))"
+        )
+        conn.execute(
+            "INSERT INTO entries VALUES "
+            "('name', 'hash', NULL, '20220101', 'name/hash/20220101.zip', "
+            "1, 'deflate', 0, 0)"
+        )
+
+    entry = get_latest_entry(tmp_path, "name", "hash")
+
+    assert entry.path == "name/hash/20220101.zip"
+    assert entry.frames_size == 0
+    # new entries can be added after the migration
+    assert add_entry(
+        tmp_path, "name", "hash", None, file_path
+    ) == get_latest_entry(tmp_path, "name", "hash")
+
+
+def test_schema_is_created_once(tmp_path, mocker):
+    file_path = _write_archive(tmp_path, "name", "hash", "20220101")
+    add_entry(tmp_path, "name", "hash", None, file_path)
+    init_index = mocker.spy(cache_index, "_init_index")
+
+    get_latest_entry(tmp_path, "name", "hash")
+    list_entries(tmp_path)
+    init_index.assert_not_called()
+
+    # e.g. after the whole cache was cleared
+    (tmp_path / INDEX_FILE).unlink()
+
+    assert [entry.name for entry in list_entries(tmp_path)] == ["name"]
+    init_index.assert_called_once_with(tmp_path)
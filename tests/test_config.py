@@ -98,7 +98,23 @@ def test_load_config(config_dir):
         "password",
         "doku",
     ]
-    assert config.options("DATA") == ["cache_dir"]
+    assert config.options("DATA") == [
+        "cache_dir",
+        "compression",
+        "compresslevel",
+        "frame_cache",
+        "memory_cache_max_entries",
+        "memory_cache_max_bytes",
+        "auto_prune",
+        "max_cache_bytes",
+        "max_age_days",
+        "keep_versions",
+        "revalidate",
+        "dtypes",
+        "downcast",
+        "table_engine",
+        "keep_raw_data",
+    ]
 
     assert config["GENESIS API"]["username"] == "myuser"
     assert config["GENESIS API"]["password"] == "mypw123!"
@@ -1,10 +1,24 @@
+import tracemalloc
 import zipfile
+from io import StringIO
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
 import pytest
 
-from pystatis.cube import assign_correct_types, parse_cube, rename_axes
+import pystatis.cube
+from pystatis.cache import cache_data
+from pystatis.cube import (
+    Cube,
+    assign_correct_types,
+    iter_cube,
+    parse_cube,
+    process_cube,
+    rename_axes,
+)
+from pystatis.dtypes import DtypePolicy
+from pystatis.http_helper import Job
 
 
 @pytest.fixture
@@ -164,3 +178,163 @@ def test_rename_axes(cube, test_cols, test_types):
 
     for col, expected_type in zip(test_cols, test_types):
         assert issubclass(cube["QEI"][col].dtype.type, expected_type)
+
+
+@pytest.mark.parametrize(
+    "raw_data", ["easy_cube", "hard_cube"], indirect=["raw_data"]
+)
+def test_parse_cube_from_stream(raw_data):
+    expected = parse_cube(raw_data)
+    cube = parse_cube(StringIO(raw_data))
+
+    assert cube.keys() == expected.keys()
+    for key in cube:
+        pd.testing.assert_frame_equal(cube[key], expected[key])
+
+
+@pytest.mark.parametrize(
+    "raw_data", ["easy_cube", "hard_cube"], indirect=["raw_data"]
+)
+def test_parse_cube_engines(raw_data):
+    expected = parse_cube(raw_data, engine="python")
+    cube = parse_cube(raw_data, engine="c")
+
+    assert list(cube) == list(expected)
+    for key in cube:
+        pd.testing.assert_frame_equal(cube[key], expected[key])
+
+
+def test_parse_cube_unknown_engine(easy_raw_data):
+    with pytest.raises(ValueError):
+        parse_cube(easy_raw_data, engine="unknown")
+
+
+@pytest.mark.parametrize(
+    "raw_data", ["easy_cube", "hard_cube"], indirect=["raw_data"]
+)
+def test_iter_cube(raw_data):
+    expected = assign_correct_types(rename_axes(parse_cube(raw_data)))["QEI"]
+    chunks = list(iter_cube(StringIO(raw_data), chunksize=5000))
+
+    assert all(len(chunk) <= 5000 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+
+
+def test_process_cube(easy_cube):
+    expected = assign_correct_types(rename_axes(easy_cube))
+
+    pure = process_cube(easy_cube)
+    assert "ZI-WERT" in easy_cube["QEI"]
+    for key in expected:
+        pd.testing.assert_frame_equal(pure[key], expected[key])
+
+    inplace = process_cube(easy_cube, inplace=True)
+    assert inplace is easy_cube
+    for key in expected:
+        pd.testing.assert_frame_equal(inplace[key], expected[key])
+
+
+def test_process_cube_compact(hard_cube):
+    default = process_cube(hard_cube)["QEI"]
+    compact = process_cube(
+        hard_cube, policy=DtypePolicy(compact=True, downcast=True)
+    )["QEI"]
+
+    assert isinstance(compact["KREISE"].dtype, pd.CategoricalDtype)
+    assert compact["ELG002_WERT"].dtype == "Int32"
+    assert (
+        compact.memory_usage(deep=True).sum()
+        < default.memory_usage(deep=True).sum() / 5
+    )
+    pd.testing.assert_frame_equal(
+        compact.astype(default.dtypes.to_dict()), default
+    )
+
+
+def test_assign_correct_types_special_values(easy_cube):
+    easy_cube["QEI"].loc[0, "BEVSTD_WERT"] = "."
+
+    cube = assign_correct_types(rename_axes(easy_cube))
+
+    assert cube["QEI"]["BEVSTD_WERT"].dtype == "Int64"
+    assert cube["QEI"]["BEVSTD_WERT"].isna().sum() == 1
+
+
+def _peak_memory(func, *args, **kwargs) -> int:
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_process_cube_inplace_peak_memory(easy_raw_data):
+    pure_peak = _peak_memory(
+        lambda cube: assign_correct_types(rename_axes(cube)),
+        parse_cube(easy_raw_data),
+    )
+    inplace_peak = _peak_memory(
+        process_cube, parse_cube(easy_raw_data), inplace=True
+    )
+
+    # the pure pipeline copies QEI twice, the in-place one not at all
+    assert inplace_peak < 0.7 * pure_peak
+
+
+def test_cube_iter_data(mocker, easy_raw_data):
+    job = Job(name="12411BJ001", stream=True, cached=True)
+    mocker.patch("pystatis.cube.submit_data", return_value=job)
+    mocker.patch.object(job, "open", return_value=StringIO(easy_raw_data))
+
+    cube = Cube("12411BJ001")
+    n_rows = sum(len(chunk) for chunk in cube.iter_data(chunksize=10_000))
+
+    assert n_rows == 42403
+    assert cube._data is None
+
+
+def test_cube_get_data_uses_cached_frames(
+    mocker, tmp_path, config, easy_raw_data
+):
+    # all formats of the frame cache require the optional arrow extra
+    pytest.importorskip("pyarrow")
+    mocker.patch("pystatis.cube.load_data", return_value={})
+    params = {"name": "12411BJ001", "area": "all"}
+    cache_data(tmp_path, "12411BJ001", params, easy_raw_data)
+    mocker.patch(
+        "pystatis.cube.submit_data",
+        side_effect=lambda **kwargs: Job(
+            name="12411BJ001", params=params, cached=True
+        ),
+    )
+    parse = mocker.spy(pystatis.cube, "parse_cube")
+
+    first = Cube("12411BJ001")
+    first.get_data()
+    read = mocker.spy(pystatis.http_helper, "read_from_cache")
+    second = Cube("12411BJ001")
+    second.get_data()
+
+    assert parse.call_count == 1
+    assert list(second.cube) == list(first.cube)
+    pd.testing.assert_frame_equal(second.data, first.data)
+    # the raw data is not read on a hit of the parsed data, but on access
+    assert read.call_count == 0
+    assert second.raw_data == easy_raw_data
+    assert second.raw_data == easy_raw_data
+    assert read.call_count == 1
+
+
+def test_cube_lazy_cube(mocker, easy_raw_data):
+    submit_data = mocker.patch(
+        "pystatis.cube.submit_data", return_value=Job(data=easy_raw_data)
+    )
+    load_data = mocker.patch("pystatis.cube.load_data", return_value={})
+
+    cube = Cube("12411BJ001")
+
+    assert list(cube.cube) == ["DQ", "DQ-ERH", "DQA", "DQZ", "DQI", "QEI"]
+    assert cube.data is cube.cube["QEI"]
+    submit_data.assert_called_once()
+    load_data.assert_not_called()
@@ -0,0 +1,112 @@
+from configparser import ConfigParser
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pystatis.dtypes import (
+    DtypePolicy,
+    compact_frame,
+    get_dtype_policy,
+    to_categorical,
+    to_float,
+    to_integer,
+)
+
+
+@pytest.mark.parametrize(
+    "dtypes, downcast, expected",
+    [
+        ("default", "false", DtypePolicy(False, False)),
+        ("Compact", "false", DtypePolicy(True, False)),
+        ("compact", "true", DtypePolicy(True, True)),
+    ],
+)
+def test_get_dtype_policy(mocker, dtypes, downcast, expected):
+    config = ConfigParser()
+    config["DATA"] = {"dtypes": dtypes, "downcast": downcast}
+    mocker.patch("pystatis.dtypes.load_config", return_value=config)
+
+    assert get_dtype_policy() == expected
+
+
+def test_get_dtype_policy_unknown(mocker):
+    config = ConfigParser()
+    config["DATA"] = {"dtypes": "tiny"}
+    mocker.patch("pystatis.dtypes.load_config", return_value=config)
+
+    with pytest.raises(ValueError):
+        get_dtype_policy()
+
+
+@pytest.mark.parametrize(
+    "policy, expected_dtype",
+    [
+        (DtypePolicy(), np.int64),
+        (DtypePolicy(downcast=True), np.int32),
+        (DtypePolicy(compact=True), "Int64"),
+        (DtypePolicy(compact=True, downcast=True), "Int32"),
+    ],
+)
+def test_to_integer(policy, expected_dtype):
+    values = to_integer(pd.Series(["1", "20", "300"]), policy)
+
+    pd.testing.assert_series_equal(
+        values, pd.Series([1, 20, 300], dtype=expected_dtype)
+    )
+
+
+def test_to_integer_special_values():
+    values = to_integer(
+        pd.Series(["1", ".", "-", "...", "x", "/"]), DtypePolicy()
+    )
+
+    assert values.dtype == "Int64"
+    assert values.isna().sum() == 5
+
+
+def test_to_integer_does_not_downcast_large_values():
+    values = to_integer(
+        pd.Series(["1", str(2**40)]), DtypePolicy(downcast=True)
+    )
+
+    assert values.dtype == np.int64
+
+
+@pytest.mark.parametrize(
+    "policy, expected_dtype",
+    [
+        (DtypePolicy(), np.float64),
+        (DtypePolicy(downcast=True), np.float32),
+        (DtypePolicy(compact=True), "Float64"),
+        (DtypePolicy(compact=True, downcast=True), "Float32"),
+    ],
+)
+def test_to_float(policy, expected_dtype):
+    values = to_float(pd.Series(["1.5", "."]), policy)
+
+    assert values.dtype == expected_dtype
+    assert values.isna().tolist() == [False, True]
+
+
+def test_to_categorical():
+    frame = pd.DataFrame({"a": ["x", "y", "x"], "b": ["1", "2", "3"]})
+
+    to_categorical(frame, ["a"], DtypePolicy())
+    assert frame["a"].dtype == object
+
+    to_categorical(frame, ["a"], DtypePolicy(compact=True))
+    assert isinstance(frame["a"].dtype, pd.CategoricalDtype)
+    assert frame["b"].dtype == object
+
+
+def test_compact_frame():
+    frame = pd.DataFrame(
+        {"time": ["2020", "2021"], "value": [1, 2], "share": [0.5, np.nan]}
+    )
+
+    compact_frame(frame, DtypePolicy(compact=True, downcast=True))
+
+    assert isinstance(frame["time"].dtype, pd.CategoricalDtype)
+    assert frame["value"].dtype == "Int32"
+    assert frame["share"].dtype == "Float32"
@@ -0,0 +1,28 @@
+import threading
+
+import pandas as pd
+
+from pystatis.find import Find
+
+
+def test_run_queries_categories_concurrently(mocker):
+    barrier = threading.Barrier(4, timeout=5)
+
+    def fake_load_data(endpoint, method, params, as_json=False):
+        # every request blocks until all four categories are requested at once
+        barrier.wait()
+        category = params["category"]
+        return {category.capitalize(): [{"Code": f"{category}-1"}]}
+
+    mocker.patch("pystatis.find.load_data", side_effect=fake_load_data)
+
+    find = Find("Rohöl")
+    find.run()
+
+    assert find.is_run
+    for category in ["statistics", "variables", "tables", "cubes"]:
+        results = getattr(find, category)
+        assert results.category == category
+        pd.testing.assert_frame_equal(
+            results.df, pd.DataFrame([{"Code": f"{category}-1"}])
+        )
@@ -1,5 +1,5 @@
 from pystatis import logincheck, whoami
-from tests.test_http_helper import _generic_request_status
+from tests.conftest import _generic_request_status
 
 
 def test_whoami(mocker):
@@ -14,10 +14,8 @@ def test_whoami(mocker):
         },
     )
 
-    mocker.patch(
-        "pystatis.helloworld.requests.get",
-        return_value=_generic_request_status(),
-    )
+    session = mocker.patch("pystatis.helloworld.get_session")
+    session.return_value.get.return_value = _generic_request_status()
 
     response = whoami()
 
@@ -35,10 +33,8 @@ def test_logincheck(mocker):
             }
         },
     )
-    mocker.patch(
-        "pystatis.helloworld.requests.get",
-        return_value=_generic_request_status(),
-    )
+    session = mocker.patch("pystatis.helloworld.get_session")
+    session.return_value.get.return_value = _generic_request_status()
 
     response = logincheck()
 
@@ -1,79 +1,81 @@
+import io
 import json
 import logging
+import time
 
 import pytest
 import requests
 
-from pystatis.custom_exceptions import DestatisStatusError
+from pystatis.custom_exceptions import (
+    DestatisStatusError,
+    JobTimeoutError,
+    OfflineError,
+)
 from pystatis.http_helper import (
+    Job,
+    JobTracker,
     _check_invalid_destatis_status_code,
     _check_invalid_status_code,
+    close_session,
+    create_session,
     get_data_from_endpoint,
     get_job_id_from_response,
+    get_session,
+    load_data,
+    set_session,
+    start_job,
+    submit_data,
+)
+from tests.conftest import (
+    _generic_request_status,
+    _jobs_response,
+    _text_response,
 )
 
 
-def _generic_request_status(
-    status_response: bool = True,
-    status_code: int = 200,
-    code: int = 0,
-    status_type: str = "Information",
-    status_content: str = "Erfolg/ Success/ Some Issue",
-) -> requests.Response:
+def test_get_response_from_endpoint(mocker, config):
     """
-    Helper method which allows to create a generic request.Response that covers all Destatis answers
-
-    Returns:
-        requests.Response: the response from Destatis
+    Test once with generic API response, more detailed tests
+    of subfunctions and specific cases below.
     """
-    # define possible status dict and texts
-    status_dict = {
-        "Ident": {
-            "Service": "A DESTATIS service",
-            "Method": "A DESTATIS method",
-        },
-        "Status": {
-            "Code": code,
-            "Content": status_content,
-            "Type": status_type,
-        },
+    session = mocker.patch("pystatis.http_helper.get_session")
+    session.return_value.get.return_value = _generic_request_status()
+    config["GENESIS API"] = {
+        "base_url": "mocked_url",
+        "username": "JaneDoe",
+        "password": "password",
     }
 
-    response_text = "Some text for a successful response without status..."
+    get_data_from_endpoint(endpoint="endpoint", method="method", params={})
 
-    # set up generic requests.Response
-    request_status = requests.Response()
-    request_status.status_code = status_code  # success
+    session.return_value.get.assert_called_once()
 
-    # Define UTF-8 encoding as requests guesses otherwise
-    if status_response:
-        request_status._content = json.dumps(status_dict).encode("UTF-8")
-    else:
-        request_status._content = response_text.encode("UTF-8")
 
-    return request_status
+def test_create_session(config):
+    config["HTTP"] = {"pool_maxsize": "4", "keep_alive": "false"}
 
+    session = create_session(pool_connections=2)
+    adapter = session.get_adapter("https://www-genesis.destatis.de")
 
-def test_get_response_from_endpoint(mocker):
-    """
-    Test once with generic API response, more detailed tests
-    of subfunctions and specific cases below.
-    """
-    mocker.patch(
-        "pystatis.http_helper.requests", return_value=_generic_request_status()
-    )
-    mocker.patch(
-        "pystatis.http_helper.load_config",
-        return_value={
-            "GENESIS API": {
-                "base_url": "mocked_url",
-                "username": "JaneDoe",
-                "password": "password",
-            }
-        },
-    )
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 4
+    assert adapter._pool_block is False
+    assert session.headers["Connection"] == "close"
 
-    get_data_from_endpoint(endpoint="endpoint", method="method", params={})
+
+def test_shared_session(config):
+    close_session()
+
+    session = get_session()
+    assert get_session() is session
+
+    custom_session = requests.Session()
+    set_session(custom_session)
+    assert get_session() is custom_session
+
+    close_session()
+    assert get_session() is not custom_session
+    close_session()
 
 
 def test_check_invalid_status_code_with_error():
@@ -192,3 +194,404 @@ def test_get_job_id_from_response_with_no_json():
     response._content = "Der Bearbeitungsauftrag wurde erstellt. Die Tabelle kann in Kürze als Ergebnis mit folgendem Namen abgerufen werden: 42153-0001_001597503 (Mindestens ein Parameter enthält ungültige Werte. Er wurde angepasst, um den Service starten zu können.: stand".encode()
     job_id = get_job_id_from_response(response)
     assert job_id == ""
+
+
+@pytest.fixture()
+def job_config(config):
+    config["JOBS"] = {"timeout": "10", "poll_interval": "0"}
+    return config
+
+
+def test_job_is_done_with_data():
+    job = Job(data="data")
+
+    assert job.done()
+    assert job.poll()
+    assert job.result() == "data"
+
+
+def test_job_poll_downloads_and_caches_result(mocker, job_config):
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=[
+            _jobs_response("Läuft"),
+            _jobs_response("Fertig"),
+            _text_response("result"),
+        ],
+    )
+    cache_data = mocker.patch("pystatis.http_helper.cache_data")
+    callback = mocker.Mock()
+
+    job = Job("12345-0001_123456789", name="12345-0001", params={"a": 1})
+    job.add_done_callback(callback)
+
+    assert job.timeout == 10
+    assert not job.poll()
+    assert job.result() == "result"
+    assert get_data.call_count == 3
+    cache_data.assert_called_once()
+    callback.assert_called_once_with(job)
+
+
+def test_job_result_timeout(mocker, job_config):
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_jobs_response("Läuft"),
+    )
+
+    job = Job("12345-0001_123456789", timeout=0.01)
+
+    with pytest.raises(JobTimeoutError):
+        job.result()
+
+    assert not job.done()
+
+
+def test_submit_data_returns_pending_job(mocker, job_config):
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_generic_request_status(code=98),
+    )
+    mocker.patch(
+        "pystatis.http_helper.start_job",
+        return_value=_generic_request_status(
+            status_content="Name: 12345-0001_123456789"
+        ),
+    )
+
+    job = submit_data("data", "tablefile", {"name": "12345-0001"})
+
+    assert not job.done()
+    assert job.job_id == "12345-0001_123456789"
+    assert job.name == "12345-0001"
+
+
+def test_start_job_keeps_params(mocker, job_config):
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_generic_request_status(),
+    )
+    params = {"name": "12345-0001", "area": "all"}
+
+    start_job("data", "tablefile", params)
+
+    assert params == {"name": "12345-0001", "area": "all"}
+    assert get_data.call_args.kwargs["params"]["job"] == "true"
+
+
+def test_job_tracker_polls_jobs_collectively(mocker, job_config):
+    first_id = "11111-0001_000000001"
+    second_id = "22222-0001_000000002"
+    responses = {
+        first_id: _text_response("first"),
+        second_id: _text_response("second"),
+    }
+    jobs_responses = iter(
+        [
+            _jobs_response("Fertig", f"11111-0001_{first_id}"),
+            _jobs_response("Fertig", first_id, second_id),
+        ]
+    )
+
+    def fake_get_data_from_endpoint(endpoint, method, params, stream=False):
+        if endpoint == "catalogue":
+            assert params["selection"] == "*"
+            return next(jobs_responses)
+        return responses[params["name"]]
+
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=fake_get_data_from_endpoint,
+    )
+    mocker.patch("pystatis.http_helper.cache_data")
+
+    tracker = JobTracker(
+        [Job(first_id), Job(second_id), Job(data="cached")], poll_interval=0
+    )
+
+    completed = [job.job_id for job in tracker.as_completed()]
+
+    assert completed == ["", first_id, second_id]
+    assert tracker.wait() == ["first", "second", "cached"]
+    # two polling rounds for all jobs and one download per job
+    assert get_data.call_count == 4
+
+
+def test_job_tracker_ignores_jobs_without_id(mocker, job_config):
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_jobs_response("Fertig", "11111-0001_000000001"),
+    )
+
+    tracker = JobTracker([Job("")], poll_interval=0)
+
+    assert tracker.poll() == []
+    get_data.assert_called_once()
+
+
+def test_submit_data_without_job_id(mocker, job_config):
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_generic_request_status(code=98),
+    )
+    mocker.patch(
+        "pystatis.http_helper.start_job",
+        return_value=_generic_request_status(status_content="no job"),
+    )
+
+    with pytest.raises(DestatisStatusError):
+        submit_data("data", "tablefile", {"name": "12345-0001"})
+
+
+def test_job_tracker_timeout(mocker, job_config):
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_jobs_response("Läuft", "11111-0001_000000001"),
+    )
+
+    tracker = JobTracker(poll_interval=0)
+    tracker.add(Job("11111-0001_000000001"))
+
+    with pytest.raises(JobTimeoutError):
+        tracker.wait(timeout=0.01)
+
+    assert len(tracker.pending) == 1
+
+
+def test_submit_data_registers_and_resumes_job(mocker, job_config):
+    job_id = "12345-0001_123456789"
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_generic_request_status(code=98),
+    )
+    start_job = mocker.patch(
+        "pystatis.http_helper.start_job",
+        return_value=_generic_request_status(status_content=f"Name: {job_id}"),
+    )
+    params = {"name": "12345-0001", "area": "all"}
+
+    submit_data("data", "tablefile", params.copy())
+
+    # a restarted process finds the job and does not start a new one
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=[
+            _jobs_response("Läuft", job_id),
+            _jobs_response("Fertig", job_id),
+            _text_response("result"),
+        ],
+    )
+    job = submit_data("data", "tablefile", params.copy())
+
+    assert job.job_id == job_id
+    assert job.result() == "result"
+    assert get_data.call_count == 3
+    start_job.assert_called_once()
+
+    # the finished job is removed from the registry and the result is cached
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=AssertionError("no request expected"),
+    )
+    assert submit_data("data", "tablefile", params.copy()).result() == "result"
+
+
+def test_submit_data_starts_new_job_for_unknown_job(mocker, job_config):
+    params = {"name": "12345-0001", "area": "all"}
+    mocker.patch(
+        "pystatis.http_helper.get_registered_job",
+        return_value="12345-0001_123456789",
+    )
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=[
+            DestatisStatusError("Kein passendes Objekt"),
+            _text_response("data"),
+        ],
+    )
+    unregister_job = mocker.patch("pystatis.http_helper.unregister_job")
+
+    job = submit_data("data", "tablefile", params)
+
+    assert job.result() == "data"
+    unregister_job.assert_called_once()
+
+
+def test_submit_data_stream(mocker, job_config):
+    response = _text_response("a;b\n1;2\n")
+    response.headers["Content-Type"] = "text/csv"
+    response.raw = io.BytesIO(response._content)
+    response._content_consumed = False
+    response._content = False
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint", return_value=response
+    )
+    params = {"name": "12345-0001", "area": "all"}
+
+    job = submit_data("data", "tablefile", params, stream=True)
+
+    get_data.assert_called_once_with("data", "tablefile", params, stream=True)
+    assert job.done() and job.stream
+    with job.open() as file:
+        assert file.read() == "a;b\n1;2\n"
+
+    # a cache hit is not loaded into memory either
+    job = submit_data("data", "tablefile", params, stream=True)
+    assert job._data is None
+    assert job.result() == "a;b\n1;2\n"
+
+
+def test_load_data_caches_metadata_by_name(mocker, job_config):
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_generic_request_status(),
+    )
+
+    first = load_data(
+        "metadata", "table", {"name": "12345-0001", "area": "all"}, True
+    )
+    second = load_data(
+        "metadata",
+        "table",
+        {"name": "12345-0001", "area": "public", "startyear": "2000"},
+        True,
+    )
+
+    assert first == second == _generic_request_status().json()
+    get_data.assert_called_once()
+
+
+def test_load_data_refetches_expired_response(mocker, job_config):
+    job_config["TTL"] = {"find": "60", "profile": "60"}
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_text_response("response"),
+    )
+    params = {"term": "bevoelkerung", "category": "tables"}
+
+    load_data("find", "find", params)
+    load_data("find", "find", params)
+    assert get_data.call_count == 1
+
+    # the age of cached responses is checked against a mocked clock, not by sleeping
+    now = time.time()
+    mocked_time = mocker.patch("pystatis.cache.time")
+    mocked_time.time.return_value = now + 30
+    load_data("find", "find", params)
+    assert get_data.call_count == 1
+
+    mocked_time.time.return_value = now + 120
+    load_data("find", "find", params)
+    assert get_data.call_count == 2
+
+    # endpoints without a default TTL are never cached
+    load_data("profile", "password", {"new": "password"})
+    load_data("profile", "password", {"new": "password"})
+    assert get_data.call_count == 4
+
+
+@pytest.mark.parametrize("method", ["jobs", "results"])
+def test_load_data_does_not_cache_volatile_catalogue(
+    mocker, job_config, method
+):
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_text_response("response"),
+    )
+
+    load_data("catalogue", method, {"selection": "*"})
+    load_data("catalogue", method, {"selection": "*"})
+    load_data("catalogue", "tables", {"selection": "*"})
+    load_data("catalogue", "tables", {"selection": "*"})
+
+    assert get_data.call_count == 3
+
+
+def _metadata_response(updated: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(
+        {"Status": {"Code": 0}, "Object": {"Updated": updated}}
+    ).encode("UTF-8")
+    return response
+
+
+@pytest.mark.parametrize(
+    "updated, downloads",
+    [("01.01.2000 08:00:00h", 1), ("01.01.2100 08:00:00h", 2)],
+)
+def test_submit_data_revalidate(mocker, job_config, updated, downloads):
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=lambda endpoint, *args, **kwargs: (
+            _metadata_response(updated)
+            if endpoint == "metadata"
+            else _text_response("data")
+        ),
+    )
+    params = {"name": "12345-0001", "area": "all"}
+
+    submit_data("data", "tablefile", params.copy())
+    job = submit_data("data", "tablefile", params.copy(), revalidate=True)
+
+    assert job.result() == "data"
+    endpoints = [call.args[0] for call in get_data.call_args_list]
+    assert endpoints.count("metadata") == 1
+    assert endpoints.count("data") == downloads
+
+    # the metadata downloaded for revalidation is cached as well
+    load_data("metadata", "table", params.copy())
+    assert get_data.call_count == 1 + downloads
+
+
+def test_submit_data_stale_if_error(mocker, job_config):
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        side_effect=[
+            _text_response("data"),
+            requests.exceptions.ConnectTimeout("timeout"),
+        ],
+    )
+    params = {"name": "12345-0001", "area": "all"}
+
+    assert not submit_data("data", "tablefile", params.copy()).stale
+
+    job = submit_data("data", "tablefile", params.copy(), revalidate=True)
+
+    assert job.stale
+    assert job.result() == "data"
+    assert get_data.call_count == 2
+
+    job_config["HTTP"] = {"stale_if_error": "false"}
+    get_data.side_effect = requests.exceptions.ConnectTimeout("timeout")
+
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        submit_data("data", "tablefile", params.copy(), revalidate=True)
+
+
+def test_offline_mode(mocker, job_config):
+    job_config["HTTP"] = {"offline": "true"}
+    session = mocker.patch("pystatis.http_helper.get_session")
+    params = {"name": "12345-0001", "area": "all"}
+
+    with pytest.raises(OfflineError):
+        submit_data("data", "tablefile", params.copy())
+
+    with pytest.raises(OfflineError):
+        load_data("metadata", "table", params.copy())
+
+    job_config["HTTP"] = {"offline": "false"}
+    session.return_value.get.return_value = _text_response("data")
+    job_config["GENESIS API"] = {
+        "base_url": "mocked_url",
+        "username": "JaneDoe",
+        "password": "password",
+    }
+    submit_data("data", "tablefile", params.copy())
+
+    job_config["HTTP"] = {"offline": "true"}
+    job = submit_data("data", "tablefile", params.copy(), revalidate=True)
+
+    assert job.result() == "data"
+    assert not job.stale
+    session.return_value.get.assert_called_once()
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+from pystatis.memory_cache import (
+    MemoryCache,
+    get_memory_cache,
+    set_memory_cache,
+)
+
+
+@pytest.fixture()
+def memory_cache():
+    return MemoryCache(max_entries=2, max_bytes=10_000)
+
+
+def test_get_and_put(memory_cache):
+    key = Path("cache") / "name" / "hash"
+
+    assert memory_cache.get(key) is None
+
+    memory_cache.put(key, "data")
+
+    assert memory_cache.get(key) == "data"
+    assert key in memory_cache
+
+    info = memory_cache.info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.entries == 1
+    assert info.size > 0
+
+
+def test_evicts_least_recently_used(memory_cache):
+    first, second, third = (Path("cache") / "name" / str(i) for i in range(3))
+
+    memory_cache.put(first, "first")
+    memory_cache.put(second, "second")
+    memory_cache.get(first)
+    memory_cache.put(third, "third")
+
+    assert first in memory_cache
+    assert second not in memory_cache
+    assert third in memory_cache
+    assert memory_cache.info().evictions == 1
+
+
+def test_max_bytes(memory_cache):
+    key = Path("cache") / "name" / "hash"
+
+    memory_cache.put(key, "x" * 20_000)
+
+    assert len(memory_cache) == 0
+
+    memory_cache.put(key, "x" * 6_000)
+    memory_cache.put(Path("cache") / "other", "y" * 6_000)
+
+    assert key not in memory_cache
+    assert memory_cache.info().size <= 10_000
+
+
+def test_invalidate(memory_cache):
+    memory_cache.put(Path("cache") / "a" / "hash", "a")
+    memory_cache.put(Path("cache") / "b" / "hash", "b")
+
+    memory_cache.invalidate(Path("cache") / "a")
+
+    assert len(memory_cache) == 1
+    assert Path("cache") / "b" / "hash" in memory_cache
+
+    memory_cache.invalidate()
+
+    assert len(memory_cache) == 0
+
+
+def test_set_memory_cache(memory_cache):
+    old_memory_cache = get_memory_cache()
+    try:
+        set_memory_cache(memory_cache)
+        assert get_memory_cache() is memory_cache
+
+        set_memory_cache(None)
+        assert get_memory_cache() is not memory_cache
+    finally:
+        set_memory_cache(old_memory_cache)
@@ -5,7 +5,7 @@ from pathlib import Path
 import pytest
 
 from pystatis.profile import change_password, remove_result
-from tests.test_http_helper import _generic_request_status
+from tests.conftest import _generic_request_status
 
 
 @pytest.fixture()
@@ -0,0 +1,201 @@
+from datetime import date
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+import pystatis.http_helper
+from pystatis.cache import cache_data
+from pystatis.dtypes import DtypePolicy
+from pystatis.http_helper import Job
+from pystatis.table import Table, build_table_schema, parse_table
+
+FFCSV = (
+    "Statistik_Code;Statistik_Label;Zeit_Code;Zeit_Label;Zeit;"
+    "1_Merkmal_Code;1_Merkmal_Label;1_Auspraegung_Code;1_Auspraegung_Label;"
+    "BEV001__Bevoelkerung__Anzahl;BEV002__Anteil__Prozent\n"
+    "12411;Bevoelkerung;STAG;Stichtag;31.12.2020;"
+    "KREISE;Kreise;01001;Flensburg;90164;1,5\n"
+    "12411;Bevoelkerung;STAG;Stichtag;31.12.2020;"
+    "KREISE;Kreise;01002;Kiel;.;-\n"
+    "12411;Bevoelkerung;STAG;Stichtag;31.12.2020;"
+    "KREISE;Kreise;;Insgesamt;246601;2\n"
+)
+
+
+def test_table_get_data_without_wait(mocker):
+    job = Job("12345-0001_123456789", timeout=1, poll_interval=0)
+    mocker.patch("pystatis.table.submit_data", return_value=job)
+    mocker.patch("pystatis.table.load_data", return_value={})
+
+    table = Table("12345-0001")
+    handle = table.get_data(wait=False)
+
+    assert handle is job
+    assert table.data.empty
+
+    job._set_result("a;b\n1;2\n")
+
+    assert table.raw_data == "a;b\n1;2\n"
+    assert table.data.shape == (1, 2)
+
+
+def test_table_get_data_stream(mocker, config):
+    job = Job(name="12345-0001", stream=True, cached=True)
+    mocker.patch("pystatis.table.submit_data", return_value=job)
+    mocker.patch("pystatis.table.load_data", return_value={})
+    mocker.patch.object(job, "open", return_value=StringIO("a;b\n1;2\n"))
+
+    table = Table("12345-0001")
+    table.get_data(stream=True)
+
+    assert table.raw_data == ""
+    assert table.data.shape == (1, 2)
+
+
+def test_table_get_data_stale(mocker):
+    job = Job(data="a;b\n1;2\n", stale=True)
+    mocker.patch("pystatis.table.submit_data", return_value=job)
+    mocker.patch("pystatis.table.load_data", return_value={})
+
+    table = Table("12345-0001")
+    table.get_data()
+
+    assert table.stale
+    assert table.data.shape == (1, 2)
+
+
+def test_table_get_data_does_not_depend_on_metadata(mocker):
+    job = Job(data="statistics_code;time;BEV002__Share__Percent\n1;2020;1.5\n")
+    mocker.patch("pystatis.table.submit_data", return_value=job)
+    load_data = mocker.patch("pystatis.table.load_data")
+
+    table = Table("12345-0001")
+    table.get_data()
+
+    assert table.data["BEV002__Share__Percent"].tolist() == [1.5]
+    load_data.assert_not_called()
+
+
+def test_build_table_schema():
+    header = FFCSV.split("\n", 1)[0].split(";")
+
+    schema = build_table_schema(header)
+
+    assert schema.key_columns == header[:9]
+    assert schema.value_columns == header[9:]
+    assert schema.decimal == ","
+    assert build_table_schema(["statistics_code", "time"]).decimal == "."
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_parse_table(engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+
+    data = parse_table(FFCSV, engine=engine, policy=DtypePolicy())
+
+    assert data["1_Auspraegung_Code"].tolist()[:2] == ["01001", "01002"]
+    assert pd.isna(data["1_Auspraegung_Code"][2])
+    assert data["Statistik_Code"].tolist() == ["12411"] * 3
+    assert data["BEV001__Bevoelkerung__Anzahl"].dtype == "Int64"
+    assert data["BEV001__Bevoelkerung__Anzahl"].isna().tolist() == [
+        False,
+        True,
+        False,
+    ]
+    assert data["BEV002__Anteil__Prozent"].dtype == "float64"
+    assert data["BEV002__Anteil__Prozent"][0] == 1.5
+
+
+def test_parse_table_non_numeric_values():
+    data = parse_table(
+        "Zeit;BEV001__Bevoelkerung__Anzahl;BEV002__Code__\n"
+        "2020;1;a\n2021;2;b\n",
+        policy=DtypePolicy(),
+    )
+
+    assert data["BEV001__Bevoelkerung__Anzahl"].dtype == "int64"
+    assert data["BEV002__Code__"].tolist() == ["a", "b"]
+
+
+def test_parse_table_unknown_engine():
+    with pytest.raises(ValueError):
+        parse_table(FFCSV, engine="unknown")
+
+
+def test_table_get_data_without_raw_data(mocker, tmp_path, config):
+    mocker.patch("pystatis.table.load_data", return_value={})
+    params = {"name": "12345-0001", "area": "all", "format": "ffcsv"}
+    cache_data(tmp_path, "12345-0001", params, "a;b\n1;2\n")
+    mocker.patch(
+        "pystatis.table.submit_data",
+        return_value=Job(name="12345-0001", params=params, data="a;b\n1;2\n"),
+    )
+    read = mocker.spy(pystatis.http_helper, "read_from_cache")
+
+    table = Table("12345-0001", keep_raw_data=False)
+    table.get_data()
+
+    assert table._raw_data == ""
+    assert table.data.shape == (1, 2)
+    assert read.call_count == 0
+    assert table.raw_data == "a;b\n1;2\n"
+    assert read.call_count == 1
+
+
+def test_table_raw_data_is_pinned_to_parsed_version(mocker, tmp_path, config):
+    config["DATA"]["auto_prune"] = "false"
+    mocker.patch("pystatis.cache.load_config", return_value=config)
+    mocker.patch("pystatis.table.load_data", return_value={})
+    mocked_date = mocker.patch("pystatis.cache.date")
+    mocked_date.today.return_value = date(2022, 1, 1)
+    params = {"name": "12345-0001", "area": "all", "format": "ffcsv"}
+    cache_data(tmp_path, "12345-0001", params, "a;b\n1;2\n")
+    mocker.patch(
+        "pystatis.table.submit_data",
+        return_value=Job(name="12345-0001", params=params, cached=True),
+    )
+
+    table = Table("12345-0001", keep_raw_data=False)
+    table.get_data()
+    mocked_date.today.return_value = date(2022, 1, 2)
+    cache_data(tmp_path, "12345-0001", params, "a;b\n3;4\n")
+
+    assert table.raw_data == "a;b\n1;2\n"
+
+    # the parsed version was evicted
+    next(tmp_path.glob("12345-0001/*/20220101.zip")).unlink()
+
+    with pytest.raises(FileNotFoundError):
+        table.raw_data
+
+
+def test_table_lazy_metadata(mocker):
+    submit_data = mocker.patch("pystatis.table.submit_data")
+    load_data = mocker.patch(
+        "pystatis.table.load_data", return_value={"Object": {}}
+    )
+
+    table = Table("12345-0001")
+
+    assert table.metadata == {"Object": {}}
+    assert table.metadata == {"Object": {}}
+    load_data.assert_called_once()
+    submit_data.assert_not_called()
+
+
+def test_table_lazy_data(mocker):
+    submit_data = mocker.patch(
+        "pystatis.table.submit_data", return_value=Job(data="a;b\n1;2\n")
+    )
+    load_data = mocker.patch("pystatis.table.load_data", return_value={})
+
+    table = Table("12345-0001")
+    table.get_metadata(area="public")
+
+    assert table.data.shape == (1, 2)
+    assert table.data.shape == (1, 2)
+    submit_data.assert_called_once()
+    assert submit_data.call_args.kwargs["params"]["area"] == "public"
+    load_data.assert_called_once()